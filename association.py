@@ -0,0 +1,68 @@
+import numpy as np
+
+# Pairs are packed into one int64 key: first element in the high 32 bits
+KEY_SHIFT = 32
+KEY_MASK = (1 << KEY_SHIFT) - 1
+
+
+def pair_keys(first, second):
+    """Pack two integer arrays into int64 pair keys."""
+    return np.asarray(first, dtype=np.int64) << KEY_SHIFT | np.asarray(second, dtype=np.int64)
+
+
+def split_keys(keys):
+    """Unpack int64 pair keys into (first, second) arrays."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys >> KEY_SHIFT, keys & KEY_MASK
+
+
+class AssociationSet:
+    """A set of integer (first, second) pairs kept as a sorted, duplicate-free int64 key array.
+
+    `replace` swaps in a freshly computed set and reports only what changed,
+    so recomputing the same associations is a no-op for memory and for
+    whoever draws them.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, pair):
+        key = int(pair_keys(*pair))
+        i = np.searchsorted(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def pairs(self):
+        return split_keys(self.keys)
+
+    def replace(self, first, second):
+        """Replace the set with the given pairs and return the (added, removed) keys."""
+        return self.replace_keys(pair_keys(first, second))
+
+    def replace_keys(self, keys):
+        """Like replace, for already packed keys."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(keys) > 1 and not np.all(keys[1:] > keys[:-1]):
+            keys = np.unique(keys)
+        added = np.setdiff1d(keys, self.keys, assume_unique=True)
+        removed = np.setdiff1d(self.keys, keys, assume_unique=True)
+        self.keys = keys
+        return added, removed
+
+    def discard(self, value, either=False):
+        """Remove every pair whose first element (or either element) is `value`, and return their keys."""
+        first, second = split_keys(self.keys)
+        hit = first == value
+        if either:
+            hit |= second == value
+        removed = self.keys[hit]
+        self.keys = self.keys[~hit]
+        return removed
+
+    def clear(self):
+        removed = self.keys
+        self.keys = np.empty(0, dtype=np.int64)
+        return removed
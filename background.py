@@ -0,0 +1,148 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import ERROR, event_type, log
+
+TASK_FAILED = event_type("background_task_failed", ERROR, "Background task failed: {0!r}")
+
+
+class Cancelled(Exception):
+    """Raised inside a background computation once its job has been cancelled or superseded."""
+
+
+class Job:
+    """Handle given to a background computation for cancellation checks and progress reports."""
+
+    def __init__(self, key):
+        self.key = key
+        self.cancelled = False
+        self.progress = None  # Fraction done in [0, 1], or None if unknown
+        self.future = None
+
+    def check(self):
+        """Raise Cancelled if the job is no longer wanted."""
+        if self.cancelled:
+            raise Cancelled()
+
+    def report(self, fraction):
+        """Record progress and stop early if the job was cancelled."""
+        self.progress = fraction
+        self.check()
+
+
+class BackgroundRunner:
+    """Runs computations off the Tk thread and delivers their results back on it.
+
+    `submit` runs `compute(job, *args)` on a worker thread. The result goes
+    through a queue that the Tk loop drains with `after()`, and
+    `on_done(result)` runs on the Tk thread. Submitting a job with the same
+    key as a pending one supersedes it: the old job is dropped if it has not
+    started, told to stop through `job.check()`/`job.report()` if it has,
+    and its result is discarded either way. Computations must not touch Tk
+    and should work on copies of the data they need.
+    """
+
+    def __init__(self, widget, workers=1, poll_ms=30, progressbar=None):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.progressbar = progressbar  # Optional ttk.Progressbar
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="background")
+        self.results = queue.Queue()
+        self.pending = {}  # key -> latest job for that key
+        self.active = set()  # Jobs whose result has not been delivered yet
+        self.polling = False
+        self.progress_mode = None
+
+    def submit(self, key, compute, on_done, *args, on_error=None):
+        """Run compute(job, *args) in the background; a key of None never supersedes anything."""
+        if key is not None:
+            self.cancel(key)
+        job = Job(key)
+        job.future = self.executor.submit(self._run, job, compute, on_done, on_error, args)
+        if key is not None:
+            self.pending[key] = job
+        self.active.add(job)
+        self._start_polling()
+        return job
+
+    def cancel(self, key):
+        """Cancel the pending job for a key, if any."""
+        job = self.pending.pop(key, None)
+        if job is None:
+            return
+        job.cancelled = True
+        if job.future.cancel():
+            self.active.discard(job)  # Never started, so nothing will be queued for it
+
+    def busy(self, key=None):
+        """Return True if any job (or the job for `key`) is still running."""
+        if key is None:
+            return bool(self.active)
+        return key in self.pending
+
+    def shutdown(self):
+        for key in list(self.pending):
+            self.cancel(key)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, compute, on_done, on_error, args):
+        # Runs on a worker thread: only the queue is shared with the Tk side
+        try:
+            job.check()
+            self.results.put((job, on_done, compute(job, *args)))
+        except Cancelled:
+            self.results.put((job, None, None))
+        except Exception as e:
+            self.results.put((job, on_error or self._report_error, e))
+
+    def _start_polling(self):
+        self._update_progress()
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                job, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.active.discard(job)
+            if self.pending.get(job.key) is job:
+                del self.pending[job.key]
+            if job.cancelled or callback is None:
+                continue
+            callback(value)
+
+        self._update_progress()
+        if self.active:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self.polling = False
+
+    def _update_progress(self):
+        bar = self.progressbar
+        if bar is None:
+            return
+        known = [job.progress for job in self.active if job.progress is not None]
+        if not self.active:
+            mode = None
+        elif known:
+            mode = "determinate"
+        else:
+            mode = "indeterminate"
+
+        if mode != self.progress_mode:
+            bar.stop()
+            if mode is not None:
+                bar.configure(mode=mode)
+            if mode == "indeterminate":
+                bar.start(15)
+            self.progress_mode = mode
+        if mode == "determinate":
+            bar["value"] = 100 * min(known)
+        elif mode is None:
+            bar["value"] = 0
+
+    def _report_error(self, error):
+        log.record(TASK_FAILED, error)
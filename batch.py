@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bridging import plan_drones
+from city import CITY_BORDER
+from connectivity import AntennaNetwork
+from coverage import CoverageEngine
+from entities import AntennaStore, DeviceStore
+from scenario import SUFFIX, Scenario
+
+METRICS = [
+    "devices",
+    "antennas_failed",
+    "coverage_before",
+    "coverage_after",
+    "clusters_after",
+    "largest_cluster_after",
+    "drones_needed",
+]
+
+
+class ScenarioConfig:
+    """Parameters of a randomized disaster scenario."""
+
+    def __init__(self, num_clusters=10, devices_per_cluster=10, cluster_spread=20,
+                 num_antennas=20, antenna_range=100, antenna_to_antenna_range=200,
+                 failure_rate=0.3, border=None):
+        self.num_clusters = num_clusters
+        self.devices_per_cluster = devices_per_cluster
+        self.cluster_spread = cluster_spread
+        self.num_antennas = num_antennas
+        self.antenna_range = antenna_range
+        self.antenna_to_antenna_range = antenna_to_antenna_range
+        self.failure_rate = failure_rate
+        self.border = dict(border or CITY_BORDER)
+
+
+def generate_devices(config, rng):
+    """Random device clusters, generated the same way as populate_space_with_clusters."""
+    border = config.border
+    centers_x = rng.integers(border["x_min"] + 30, border["x_max"] - 30, size=config.num_clusters, endpoint=True)
+    centers_y = rng.integers(border["y_min"] + 30, border["y_max"] - 30, size=config.num_clusters, endpoint=True)
+    spread = config.cluster_spread
+    shape = (config.num_clusters, config.devices_per_cluster)
+    xs = centers_x[:, None] + rng.integers(-spread, spread, size=shape, endpoint=True)
+    ys = centers_y[:, None] + rng.integers(-spread, spread, size=shape, endpoint=True)
+    positions = np.column_stack([xs.ravel(), ys.ravel()]).astype(np.float64)
+    inside = (
+        (positions[:, 0] >= border["x_min"]) & (positions[:, 0] <= border["x_max"])
+        & (positions[:, 1] >= border["y_min"]) & (positions[:, 1] <= border["y_max"])
+    )
+    return positions[inside]
+
+
+def generate_antennas(config, rng):
+    """Antenna positions placed uniformly inside the city border."""
+    border = config.border
+    xs = rng.integers(border["x_min"], border["x_max"], size=config.num_antennas, endpoint=True)
+    ys = rng.integers(border["y_min"], border["y_max"], size=config.num_antennas, endpoint=True)
+    return np.column_stack([xs, ys]).astype(np.float64)
+
+
+def seed_meta(seed):
+    """A SeedSequence as JSON-friendly metadata; seed_from_meta reverses it."""
+    return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+
+
+def seed_from_meta(meta):
+    return np.random.SeedSequence(meta["entropy"], spawn_key=meta["spawn_key"])
+
+
+def build_scenario(config, seed):
+    """Generate one scenario (devices, antennas and which antennas fail) without evaluating it.
+
+    The result holds the same stores as a GUI save, plus an `antennas/alive`
+    mask, the config and the seed, so a saved run can be replayed exactly or
+    opened in main.py.
+    """
+    rng = np.random.default_rng(seed)
+    device_xy = generate_devices(config, rng)
+    antenna_xy = generate_antennas(config, rng)
+    alive = rng.random(len(antenna_xy)) >= config.failure_rate
+
+    antennas = AntennaStore()
+    for i, position in enumerate(antenna_xy.tolist()):
+        antennas.add(f"Antenna-{i + 1}", position, config.antenna_range, config.antenna_to_antenna_range)
+    devices = DeviceStore(antennas)
+    devices.add_many(device_xy)
+    scenario = Scenario(meta={"config": vars(config), "seed": seed_meta(seed)})
+    scenario.put_stores(antennas, devices)
+    scenario["antennas/alive"] = alive
+    return scenario
+
+
+def run_scenario(config, seed, save_path=None):
+    """Run one scenario and return its metrics as a dict, saving the scenario first if `save_path` is given."""
+    scenario = build_scenario(config, seed)
+    if save_path:
+        scenario.save(save_path)
+    return evaluate_scenario(scenario)
+
+
+def evaluate_scenario(scenario):
+    """Coverage and connectivity metrics of a built or loaded scenario.
+
+    GUI saves carry no config or failure mask: the ranges then come from the
+    stored antennas and every antenna counts as alive.
+    """
+    devices = scenario["devices/xy"]
+    antennas = scenario["antennas/xy"]
+    range_radius = scenario["antennas/range_radius"]
+    antenna_range = scenario["antennas/antenna_range"]
+    if "config" in scenario.meta:
+        config = ScenarioConfig(**scenario.meta["config"])
+    else:
+        config = ScenarioConfig(num_antennas=len(antennas), failure_rate=0.0)
+        if len(antennas):
+            config.antenna_range = float(range_radius.max())
+            config.antenna_to_antenna_range = float(antenna_range.max())
+    if "antennas/alive" in scenario:
+        alive = np.asarray(scenario["antennas/alive"], dtype=bool)
+    else:
+        alive = np.ones(len(antennas), dtype=bool)
+
+    engine = CoverageEngine()
+    engine.set_devices(devices)
+
+    engine.set_antennas(antennas, range_radius, antenna_range)
+    covered_before = int((engine.nearest_antenna() >= 0).sum())
+
+    engine.set_antennas(antennas[alive], range_radius[alive], antenna_range[alive])
+    covered_after = int((engine.nearest_antenna() >= 0).sum())
+
+    network = AntennaNetwork(config.antenna_to_antenna_range)
+    for (x, y), link_range in zip(antennas[alive].tolist(), antenna_range[alive].tolist()):
+        network.add({'x': x, 'y': y, 'range': link_range})
+    clusters = network.cluster_list()
+    plan = plan_drones(clusters, config.antenna_to_antenna_range * 1.5)
+
+    num_devices = len(devices)
+    num_alive = int(alive.sum())
+    return {
+        "devices": num_devices,
+        "antennas_failed": len(antennas) - num_alive,
+        "coverage_before": covered_before / num_devices if num_devices else 0.0,
+        "coverage_after": covered_after / num_devices if num_devices else 0.0,
+        "clusters_after": len(clusters),
+        "largest_cluster_after": max((len(c) for c in clusters), default=0) / num_alive if num_alive else 0.0,
+        "drones_needed": sum(len(drones) for _, _, drones in plan),
+    }
+
+
+def _run_chunk(args):
+    config, seeds, save_paths = args
+    return [run_scenario(config, seed, path) for seed, path in zip(seeds, save_paths)]
+
+
+def scenario_seeds(seed, runs):
+    """Independent per-scenario seeds derived from one master seed.
+
+    Each scenario gets its own seed, so results do not depend on how the
+    runs are split across workers.
+    """
+    return np.random.SeedSequence(seed).spawn(runs)
+
+
+def run_batch(config, runs, seed=0, workers=None, chunk_size=None, save_dir=None):
+    """Run `runs` scenarios across a process pool and return their metrics in order.
+
+    With `save_dir` every scenario is also saved there as run-NNNNN.scn.
+    """
+    seeds = scenario_seeds(seed, runs)
+    save_paths = [None] * runs
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+        save_paths = [os.path.join(save_dir, f"run-{i:05d}{SUFFIX}") for i in range(runs)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _run_chunk((config, seeds, save_paths))
+
+    chunk_size = chunk_size or max(1, runs // (workers * 4))
+    chunks = [(config, seeds[i:i + chunk_size], save_paths[i:i + chunk_size]) for i in range(0, runs, chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_run_chunk, chunks):
+            results.extend(chunk)
+    return results
+
+
+def aggregate(results):
+    """Summarize each metric over all runs (mean, std and percentiles)."""
+    summary = {}
+    for metric in METRICS:
+        values = np.array([r[metric] for r in results], dtype=np.float64)
+        if not len(values):
+            continue
+        summary[metric] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "p5": float(np.percentile(values, 5)),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run randomized disaster scenarios without the GUI.")
+    parser.add_argument("--runs", type=int, default=1000, help="number of scenarios")
+    parser.add_argument("--seed", type=int, default=0, help="master random seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--clusters", type=int, default=10, help="device clusters per scenario")
+    parser.add_argument("--devices-per-cluster", type=int, default=10)
+    parser.add_argument("--antennas", type=int, default=20, help="antennas per scenario")
+    parser.add_argument("--antenna-range", type=float, default=100)
+    parser.add_argument("--antenna-to-antenna-range", type=float, default=200)
+    parser.add_argument("--failure-rate", type=float, default=0.3, help="probability that an antenna fails")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--save-dir", help="also save every scenario to this directory")
+    parser.add_argument("--replay", nargs="+", metavar="FILE", help="evaluate saved scenarios instead of generating new ones")
+    args = parser.parse_args()
+
+    if args.replay:
+        for path in args.replay:
+            metrics = evaluate_scenario(Scenario.load(path))
+            print(json.dumps({"scenario": path, **metrics}) if args.json else
+                  f"{path}: " + ", ".join(f"{name} {value:.3f}" for name, value in metrics.items()))
+        return
+
+    config = ScenarioConfig(
+        num_clusters=args.clusters,
+        devices_per_cluster=args.devices_per_cluster,
+        num_antennas=args.antennas,
+        antenna_range=args.antenna_range,
+        antenna_to_antenna_range=args.antenna_to_antenna_range,
+        failure_rate=args.failure_rate,
+    )
+    summary = aggregate(run_batch(config, args.runs, seed=args.seed, workers=args.workers, save_dir=args.save_dir))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{args.runs} scenarios (seed {args.seed})")
+    for metric, stats in summary.items():
+        print(f"  {metric:<22} mean {stats['mean']:9.3f}  std {stats['std']:8.3f}  "
+              f"p5 {stats['p5']:9.3f}  p50 {stats['p50']:9.3f}  p95 {stats['p95']:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
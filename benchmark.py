@@ -0,0 +1,481 @@
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from bridging import plan_drones
+from capacity import assign_with_capacity
+from connectivity import AntennaNetwork
+from coverage import CoverageEngine
+from entities import Antenna, DeviceStore, MobileDevice
+from geometry import ProvinceIndex, _contains_xy
+from mobility import MobilityEngine, RandomWaypoint
+from placement import grid_sites, kmeans_sites, place_antennas
+from propagation import OkumuraHata, RasterGrid, SignalMap
+from scenario import Scenario
+from sim import Network, Topology
+from traffic import Flow, TrafficSimulator
+from spatial import GridIndex
+from tiles import TiledSignalMap
+import topologies
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def random_scenario(num_devices, num_antennas, width=800, height=600, range_radius=100, seed=0):
+    """Build random antennas and devices spread over a width x height area."""
+    rng = random.Random(seed)
+    devices = [
+        MobileDevice(f"Device-{i + 1}", (rng.randint(0, width), rng.randint(0, height)))
+        for i in range(num_devices)
+    ]
+    antennas = [
+        Antenna(f"Antenna-{i + 1}", (rng.randint(0, width), rng.randint(0, height)), range_radius, range_radius * 2)
+        for i in range(num_antennas)
+    ]
+    return antennas, devices
+
+
+def associate_nested_loop(antennas, devices):
+    """The original show_connections pass: every antenna against every device."""
+    pairs = 0
+    for antenna in antennas:
+        for device in devices:
+            if antenna.is_within_range(device):
+                pairs += 1
+    return pairs
+
+
+def associate_grid(antennas, index):
+    """The grid-indexed pass: each antenna only looks at nearby cells."""
+    pairs = 0
+    for antenna in antennas:
+        pairs += len(index.query_radius(antenna.position, antenna.range_radius))
+    return pairs
+
+
+def bench_device_association(num_devices=20000, num_antennas=50, range_radius=100):
+    """Compare the nested-loop device association with the grid index."""
+    antennas, devices = random_scenario(num_devices, num_antennas, range_radius=range_radius)
+
+    index = GridIndex(range_radius)
+    _, build_time = timed(lambda: [index.insert(d, d.position) for d in devices])
+
+    loop_pairs, loop_time = timed(associate_nested_loop, antennas, devices)
+    grid_pairs, grid_time = timed(associate_grid, antennas, index)
+    assert loop_pairs == grid_pairs, "grid index disagrees with nested loop"
+
+    engine = CoverageEngine()
+    engine.set_devices([d.position for d in devices])
+    engine.set_antennas([a.position for a in antennas], range_radius)
+    (engine_pairs, _), engine_time = timed(engine.in_range_pairs)
+    assert loop_pairs == len(engine_pairs), "coverage engine disagrees with nested loop"
+
+    print(f"Device association: {num_devices} devices x {num_antennas} antennas, {loop_pairs} pairs")
+    print(f"  nested loop: {loop_time * 1000:.1f} ms")
+    print(f"  grid index:  {grid_time * 1000:.1f} ms (+ {build_time * 1000:.1f} ms build)")
+    print(f"  numpy engine: {engine_time * 1000:.1f} ms")
+
+
+def bench_coverage_engine(num_devices=100000, num_antennas=500, range_radius=100, seed=0):
+    """Time the batched coverage engine on a city-scale population."""
+    rng = np.random.default_rng(seed)
+    engine = CoverageEngine()
+    engine.set_devices(rng.uniform(0, 10000, size=(num_devices, 2)))
+    engine.set_antennas(rng.uniform(0, 10000, size=(num_antennas, 2)), range_radius, range_radius * 2)
+
+    _, sort_time = timed(engine._sort_devices)
+    (antenna_idx, _), pairs_time = timed(engine.in_range_pairs)
+    nearest, nearest_time = timed(engine.nearest_antenna)
+    _, links_time = timed(engine.antenna_links)
+
+    print(f"Coverage engine: {num_devices} devices x {num_antennas} antennas")
+    print(f"  sort devices:    {sort_time * 1000:.1f} ms")
+    print(f"  in-range pairs:  {pairs_time * 1000:.1f} ms ({len(antenna_idx)} pairs)")
+    print(f"  nearest antenna: {nearest_time * 1000:.1f} ms ({int((nearest >= 0).sum())} covered)")
+    print(f"  antenna links:   {links_time * 1000:.1f} ms")
+
+
+def fragmented_network(num_antennas, range_radius=150, mean_degree=1.5, seed=0):
+    """Scatter antennas uniformly at a density that leaves the network in many clusters."""
+    rng = random.Random(seed)
+    side = math.sqrt(num_antennas * math.pi * range_radius ** 2 / mean_degree)
+    network = AntennaNetwork(range_radius)
+    for _ in range(num_antennas):
+        network.add({'x': rng.uniform(0, side), 'y': rng.uniform(0, side), 'range': range_radius})
+    return network
+
+
+def bench_drone_planner(sizes=(100, 1000, 10000), range_radius=150):
+    """Time the multi-drone planner on randomly fragmented layouts."""
+    print("Drone planner (drone range = 1.5 x antenna range)")
+    for num_antennas in sizes:
+        network = fragmented_network(num_antennas, range_radius)
+        clusters = network.cluster_list()
+        plan, solve_time = timed(plan_drones, clusters, range_radius * 1.5)
+        drones = [drone for _, _, hops in plan for drone in hops]
+
+        # Check the plan really reconnects everything
+        for drone in drones:
+            network.add(dict(drone))
+        assert network.is_connected(), "drone plan leaves the network split"
+
+        print(f"  {num_antennas:>6} antennas, {len(clusters):>5} clusters: "
+              f"{len(drones):>5} drones in {solve_time * 1000:.1f} ms")
+
+
+def ring_network(num_switches=50):
+    """A ring of switches with one host each."""
+    topo = Topology()
+    for i in range(num_switches):
+        topo.add_switch(f"s{i}")
+        topo.add_host(f"h{i}")
+        topo.add_link(f"h{i}", f"s{i}", bw=100, delay="1ms", loss=0)
+    for i in range(num_switches):
+        topo.add_link(f"s{i}", f"s{(i + 1) % num_switches}", bw=1000, delay="2ms", loss=0.1)
+    return Network(topo)
+
+
+def bench_traffic_events(num_switches=50, num_flows=100, rate=20.0, duration=1.0, seed=0):
+    """Measure discrete-event throughput of the traffic simulator."""
+    network = ring_network(num_switches)
+    rng = random.Random(seed)
+    simulator = TrafficSimulator(network, seed=seed)
+    for i in range(num_flows):
+        src, dst = rng.sample(range(num_switches), 2)
+        simulator.add_flow(Flow(f"h{src}", f"h{dst}", rate=rate, duration=duration, name=f"flow-{i}"))
+    results, run_time = timed(simulator.run)
+    delivered = sum(s.delivered for s in results.values())
+    print(f"Traffic simulation: {num_flows} flows over a {num_switches}-switch ring")
+    print(f"  {simulator.events_processed} events in {run_time * 1000:.1f} ms "
+          f"({simulator.events_processed / run_time / 1e6:.2f} M events/s), {delivered} packets delivered")
+
+
+def bench_topology_generators(size=100000, seed=0):
+    """Time the bulk topology generators at about `size` nodes each."""
+    side = int(math.sqrt(size))
+    k = 2 * round((4 * size) ** (1 / 3) / 2)  # k^3/4 hosts plus 5k^2/4 switches
+    generators = [
+        ("ring", lambda: topologies.ring(size, bw=1000, delay="1ms")),
+        ("grid", lambda: topologies.grid(side, side, bw=1000, delay="1ms")),
+        (f"fat-tree k={k}", lambda: topologies.fat_tree(k, bw=1000, delay="1ms")),
+        ("random geometric", lambda: topologies.random_geometric(size, math.sqrt(6 / (math.pi * size)), seed=seed)),
+        ("scale-free m=2", lambda: topologies.scale_free(size, 2, seed=seed)),
+    ]
+    print(f"Topology generators (~{size} nodes)")
+    for name, build in generators:
+        topo, build_time = timed(build)
+        print(f"  {name:<18} {len(topo.node_names):>7} nodes, {len(topo.link_ends):>7} links in {build_time * 1000:.0f} ms")
+
+
+class LegacyMobileDevice:
+    """The original dict-backed device class, kept for memory comparisons."""
+
+    def __init__(self, name, position):
+        self.name = name
+        self.position = position
+        self.connected_antenna = None
+
+
+def traced_memory(build):
+    """Run build() and return (result, bytes still allocated by it)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def bench_entity_memory(num_devices=200000, seed=0):
+    """Compare per-device memory of dict-backed objects, __slots__ objects and the column store."""
+    positions = np.random.default_rng(seed).uniform(0, 800, (num_devices, 2))
+
+    def objects(cls):
+        return [cls(f"Device-{i + 1}", position) for i, position in enumerate(map(tuple, positions.tolist()))]
+
+    def store():
+        devices = DeviceStore()
+        devices.add_many(positions)
+        return devices
+
+    print(f"Entity memory ({num_devices} devices)")
+    baseline = None
+    for name, build in (("dict objects", lambda: objects(LegacyMobileDevice)),
+                        ("__slots__ objects", lambda: objects(MobileDevice)),
+                        ("column store", store)):
+        result, used = traced_memory(build)
+        baseline = baseline or used
+        print(f"  {name:<18} {used / num_devices:6.1f} bytes/device ({baseline / used:.1f}x smaller)")
+        del result
+
+
+def bench_signal_map(num_antennas=200, size=1000, seed=0):
+    """Time per-antenna tile caching against rebuilding the whole signal map."""
+    rng = np.random.default_rng(seed)
+    signal = SignalMap(RasterGrid(0, 0, size * 5, size * 5, 5, metres_per_unit=20), OkumuraHata(900))
+    positions = rng.uniform(0, size * 5, size=(num_antennas, 2))
+    _, build_time = timed(lambda: [signal.set_antenna(k, xy, 43) for k, xy in enumerate(positions)])
+    _, add_time = timed(signal.set_antenna, num_antennas, (size * 2.5, size * 2.5), 43)
+    _, move_time = timed(signal.set_antenna, num_antennas, (size * 2.5 + 100, size * 2.5), 43)
+    _, remove_time = timed(signal.remove_antenna, num_antennas)
+    _, rebuild_time = timed(signal.rebuild)
+    _, sinr_time = timed(signal.sinr_db)
+    devices = rng.uniform(0, size * 5, size=(100000, 2))
+    (_, served), serve_time = timed(signal.serving, devices)
+
+    print(f"Signal map: {size}x{size} cells, {num_antennas} antennas (Okumura-Hata)")
+    print(f"  build all tiles:  {build_time * 1000:.1f} ms")
+    print(f"  add one antenna:  {add_time * 1000:.1f} ms")
+    print(f"  move it:          {move_time * 1000:.1f} ms")
+    print(f"  remove it:        {remove_time * 1000:.1f} ms")
+    print(f"  full rebuild:     {rebuild_time * 1000:.1f} ms")
+    print(f"  SINR map:         {sinr_time * 1000:.1f} ms")
+    print(f"  serve 100k devices: {serve_time * 1000:.1f} ms ({len(served)} served)")
+
+
+def bench_antenna_placement(num_devices=100000, count=100, range_radius=300, seed=0):
+    """Time greedy coverage placement on clustered devices."""
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform(0, 5000, size=(200, 2))
+    devices = centres[rng.integers(0, len(centres), num_devices)] + rng.normal(0, 150, size=(num_devices, 2))
+    sites, kmeans_time = timed(kmeans_sites, devices, 4 * count, seed=seed)
+    candidates = np.concatenate([grid_sites(0, 0, 5000, 5000, range_radius / 2), sites])
+    (positions, covered), place_time = timed(place_antennas, devices, count, range_radius, range_radius * 2, candidates)
+
+    print(f"Antenna placement: {num_devices} devices, {len(candidates)} candidate sites, {count} antennas")
+    print(f"  k-means seeding: {kmeans_time * 1000:.1f} ms")
+    print(f"  greedy placement: {place_time * 1000:.1f} ms "
+          f"({len(positions)} placed, {covered[-1] if len(covered) else 0} devices covered)")
+
+
+def bench_mobility(num_devices=100000, num_antennas=300, ticks=100, seed=0):
+    """Time incremental re-association of moving devices against a full rescan per tick."""
+    rng = np.random.default_rng(seed)
+    bounds = (0, 0, 5000, 5000)
+    antenna_xy = rng.uniform(0, 5000, size=(num_antennas, 2))
+    ranges = rng.uniform(150, 400, size=num_antennas)
+    xy = rng.uniform(0, 5000, size=(num_devices, 2))
+    engine = MobilityEngine(RandomWaypoint(bounds, seed=seed), xy, antenna_xy, ranges, bounds)
+
+    checked = []
+    handovers, run_time = timed(engine.run, ticks, 1.0, lambda engine, changes: checked.append(engine.checked))
+    rescan = CoverageEngine()
+    rescan.set_antennas(antenna_xy, ranges)
+    rescan.set_devices(xy)
+    nearest, rescan_time = timed(rescan.nearest_antenna)
+    assert np.array_equal(nearest, engine.antenna), "incremental association disagrees with a full rescan"
+
+    print(f"Mobility: {num_devices} devices, {num_antennas} antennas, {ticks} ticks of 1 s")
+    print(f"  per tick:         {run_time / ticks * 1000:.1f} ms "
+          f"({np.mean(checked) / num_devices:.0%} of devices re-checked, {handovers} handovers)")
+    print(f"  full rescan:      {rescan_time * 1000:.1f} ms")
+    print(f"  simulated 1 h in: {run_time / ticks * 3600:.1f} s")
+
+
+def bench_capacity(num_devices=100000, num_antennas=200, max_devices=400, range_radius=150, seed=0):
+    """Time capacity-aware association against plain nearest-antenna association."""
+    rng = np.random.default_rng(seed)
+    antenna_xy = rng.uniform(0, 1000, size=(num_antennas, 2))
+    device_xy = rng.uniform(0, 1000, size=(num_devices, 2))
+    engine = CoverageEngine()
+    engine.set_antennas(antenna_xy, range_radius)
+    engine.set_devices(device_xy)
+    (antenna_idx, device_idx), pairs_time = timed(engine.in_range_pairs)
+    delta = antenna_xy[antenna_idx] - device_xy[device_idx]
+    score = -np.einsum("ij,ij->i", delta, delta)
+
+    _, nearest_time = timed(engine.nearest_antenna)
+    load, capacity_time = timed(assign_with_capacity, antenna_idx, device_idx, score, num_antennas, num_devices,
+                                max_devices=max_devices)
+    assert load.subscribers.max() <= max_devices, "an antenna was loaded past its capacity"
+
+    print(f"Capacity: {num_devices} devices, {num_antennas} antennas of {max_devices} devices, "
+          f"{len(antenna_idx)} candidate pairs")
+    print(f"  candidate pairs:  {pairs_time * 1000:.1f} ms")
+    print(f"  nearest antenna:  {nearest_time * 1000:.1f} ms")
+    print(f"  with capacity:    {capacity_time * 1000:.1f} ms ({load.rounds} rounds)")
+    print(f"  served {num_devices - len(load.dropped) - len(load.uncovered)}, dropped {len(load.dropped)}, "
+          f"uncovered {len(load.uncovered)}, mean utilization {load.utilization().mean():.0%}")
+
+
+def bench_scenario_files(num_devices=1000000, num_antennas=1000, seed=0):
+    """Time saving and loading a large scenario, memory-mapped and read in full."""
+    rng = np.random.default_rng(seed)
+    scenario = Scenario(meta={"seed": seed})
+    scenario["antennas/xy"] = rng.uniform(0, 5000, size=(num_antennas, 2))
+    scenario["devices/xy"] = rng.uniform(0, 5000, size=(num_devices, 2))
+    scenario["devices/antenna"] = rng.integers(-1, num_antennas, size=num_devices, dtype=np.int32)
+    scenario.put_topology(topologies.fat_tree(16))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.scn")
+        _, save_time = timed(scenario.save, path)
+        mapped, mmap_time = timed(Scenario.load, path)
+        _, touch_time = timed(lambda: float(mapped["devices/xy"].sum()))
+        loaded, read_time = timed(Scenario.load, path, mmap=False)
+        assert np.array_equal(loaded["devices/xy"], scenario["devices/xy"]), "scenario did not round-trip"
+        size = os.path.getsize(path)
+        del mapped, loaded  # Release the mapping before the directory is removed
+
+    print(f"Scenario files: {num_devices} devices, {num_antennas} antennas, {size / 2 ** 20:.1f} MiB")
+    print(f"  save:             {save_time * 1000:.1f} ms")
+    print(f"  load (mmap):      {mmap_time * 1000:.2f} ms, first pass over positions {touch_time * 1000:.1f} ms")
+    print(f"  load (read):      {read_time * 1000:.1f} ms")
+
+
+def bench_country_tiles(num_antennas=3000, view=(800, 500), seed=0):
+    """Zoom a tiled signal map of Turkey from national to street level and move an antenna."""
+    rng = np.random.default_rng(seed)
+    bounds = (25.6, 35.8, 44.9, 42.2)
+    lons = rng.uniform(bounds[0], bounds[2], num_antennas)
+    lats = rng.uniform(bounds[1], bounds[3], num_antennas)
+    views = [
+        ("national", bounds),
+        ("region", (32.0, 39.2, 33.6, 40.2)),
+        ("city", (32.7, 39.8, 32.95, 40.0)),
+        ("street", (32.84, 39.91, 32.87, 39.93)),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        tiled = TiledSignalMap(bounds, OkumuraHata(900), directory, cell_m=25)
+        for key, (lon, lat) in enumerate(zip(lons.tolist(), lats.tolist())):
+            tiled.set_antenna(key, lon, lat, 43)
+        total_tiles = sum(level.valid.size for level in tiled.levels)
+        print(f"Country tiles: {num_antennas} antennas, {len(tiled.levels)} levels of 256x256 tiles, "
+              f"{total_tiles} tiles in all (25 m cells at the finest level)")
+        for name, box in views:
+            before = tiled.computed
+            (level, _, _, _), elapsed = timed(tiled.viewport, *box, *view)
+            print(f"  {name:<9} level {level:2d}: {elapsed * 1000:7.1f} ms, {tiled.computed - before} tiles computed")
+        _, elapsed = timed(tiled.viewport, *views[-1][1], *view)
+        print(f"  street again:      {elapsed * 1000:7.1f} ms (cached)")
+
+        invalidated = tiled.invalidated
+        near = int(np.argmin(np.hypot(lons - 32.855, lats - 39.92)))
+        tiled.set_antenna(near, 32.855, 39.92, 43)
+        before = tiled.computed
+        _, elapsed = timed(tiled.viewport, *views[-1][1], *view)
+        print(f"  moved an antenna:  {tiled.invalidated - invalidated} tiles invalidated, street view "
+              f"{elapsed * 1000:.1f} ms with {tiled.computed - before} recomputed")
+        on_disk = sum(os.stat(os.path.join(tiled.directory, name)).st_size for name in os.listdir(tiled.directory))
+        cached = sum(tile.best_mw.nbytes * 3 for tile in tiled.cache.values())
+        print(f"  memory: {len(tiled.cache)} cached tiles, {cached / 2 ** 20:.1f} MiB; "
+              f"disk: {on_disk / 2 ** 20:.1f} MiB written")
+        tiled.close()
+
+
+def _province_geojson(path, rows=9, cols=9, points_per_edge=1500, seed=0):
+    """Write a GeoJSON of rows x cols wiggly provinces over Turkey's bounding box.
+
+    Provinces are cells of a jittered lattice whose edges are densified
+    with noise, each shared edge generated once so neighbours meet exactly.
+    """
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = 25.6, 35.8, 44.9, 42.2
+    step_lon, step_lat = (max_lon - min_lon) / cols, (max_lat - min_lat) / rows
+    lon, lat = np.meshgrid(np.linspace(min_lon, max_lon, cols + 1), np.linspace(min_lat, max_lat, rows + 1))
+    inner = (slice(1, -1), slice(1, -1))
+    lon[inner] += rng.uniform(-0.25, 0.25, lon[inner].shape) * step_lon
+    lat[inner] += rng.uniform(-0.25, 0.25, lat[inner].shape) * step_lat
+    t = np.linspace(0, 1, points_per_edge, endpoint=False)
+    edges = {}
+
+    def edge(a, b):
+        if (b, a) in edges:
+            return edges[b, a][::-1]
+        (x0, y0), (x1, y1) = (lon[a], lat[a]), (lon[b], lat[b])
+        wiggle = 0.05 * np.sin(np.pi * t) * np.sin(t * rng.uniform(10, 40) + rng.uniform(0, 6))
+        if a[0] == b[0] in (0, rows) or a[1] == b[1] in (0, cols):
+            wiggle = 0 * t  # Keep the outer border straight
+        points = np.column_stack([x0 + (x1 - x0) * t - (y1 - y0) * wiggle, y0 + (y1 - y0) * t + (x1 - x0) * wiggle])
+        edges[a, b] = points
+        return points
+
+    features = []
+    for r in range(rows):
+        for c in range(cols):
+            corners = [(r, c), (r, c + 1), (r + 1, c + 1), (r + 1, c)]
+            ring = np.concatenate([edge(corners[i], corners[(i + 1) % 4]) for i in range(4)])
+            ring = np.vstack([ring, ring[:1]]).tolist()
+            features.append({"type": "Feature", "properties": {"name": f"Province {r * cols + c}"},
+                             "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def bench_province_lookup(num_points=2000000, checked=200000, seed=0):
+    """Locate millions of points in 81 detailed provinces, against testing every polygon in turn."""
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "provinces.geojson")
+        _province_geojson(path)
+        index, elapsed = timed(ProvinceIndex.load, path)
+        vertices = len(index.arrays["coords"])
+        print(f"Province lookup: {len(index)} provinces, {vertices} vertices")
+        print(f"  parse and index:    {elapsed:6.2f} s")
+        arrays = {name: index.arrays[name] for name in ("names", "coords", "ring_starts", "ring_part", "part_province")}
+        _, elapsed = timed(ProvinceIndex, arrays)
+        print(f"  index only:         {elapsed:6.2f} s ({index.owner.size} cells, "
+              f"{np.mean(index.owner >= 0):.0%} inside a single province)")
+
+    lons = rng.uniform(25.0, 45.5, num_points)
+    lats = rng.uniform(35.3, 42.7, num_points)
+    province, elapsed = timed(index.locate, lons, lats)
+    print(f"  locate {num_points} points: {elapsed:6.2f} s ({num_points / elapsed / 1e6:.1f} M points/s)")
+
+    def scan(lons, lats):
+        found = np.full(len(lons), -1, dtype=np.intp)
+        for i, polygon in enumerate(index.polygons):
+            found[(found < 0) & _contains_xy(polygon, lons, lats)] = i
+        return found
+
+    if _contains_xy is not None:
+        found, elapsed = timed(scan, lons[:checked], lats[:checked])
+        print(f"  scan all polygons:  {elapsed * num_points / checked:6.2f} s (from {checked} points), "
+              f"{np.count_nonzero(found != province[:checked])} disagreements")
+    counts, elapsed = timed(index.counts, lons, lats)
+    print(f"  per-province counts: {elapsed:6.2f} s, {int(counts.sum())} points in provinces")
+
+
+BENCHMARKS = {
+    "association": bench_device_association,
+    "coverage": bench_coverage_engine,
+    "drones": bench_drone_planner,
+    "traffic": bench_traffic_events,
+    "topologies": bench_topology_generators,
+    "memory": bench_entity_memory,
+    "signal": bench_signal_map,
+    "placement": bench_antenna_placement,
+    "mobility": bench_mobility,
+    "capacity": bench_capacity,
+    "scenario": bench_scenario_files,
+    "tiles": bench_country_tiles,
+    "provinces": bench_province_lookup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run performance benchmarks for the simulation.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
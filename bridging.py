@@ -0,0 +1,137 @@
+import math
+
+from connectivity import DisjointSet
+from spatial import GridIndex, KDTree
+
+
+def cluster_spanning_edges(points, labels):
+    """Return the edges of a minimum spanning tree over the clusters.
+
+    `points` is a list of (x, y) positions and `labels` gives the cluster of
+    each point. Clusters are contracted to single nodes, and the result is the
+    list of shortest point pairs that join them into one tree, as
+    (distance, i, j) tuples sorted by distance. This is Boruvka's algorithm:
+    every round, each cluster finds its nearest foreign point through a k-d
+    tree that skips subtrees belonging entirely to the querying cluster.
+    """
+    tree = KDTree(points)
+    merged = DisjointSet()
+    for label in set(labels):
+        merged.add(label)
+
+    # Per point, the last (squared distance, index) found. Merging clusters can
+    # only push a point's nearest foreign neighbour further away, so this stays
+    # a lower bound, and is still exact while that neighbour remains foreign.
+    nearest = [(0.0, -1)] * len(labels)
+
+    edges = []
+    while len(merged) > 1:
+        current = [merged.find(label) for label in labels]
+        node_labels = None
+
+        best = {}  # cluster -> (squared distance, i, j)
+        for i, cluster in enumerate(current):
+            bound = best[cluster][0] if cluster in best else float('inf')
+            d2, j = nearest[i]
+            if d2 >= bound:
+                continue
+            if j < 0 or current[j] == cluster:
+                if node_labels is None:
+                    node_labels = tree.node_labels(current)
+                d2, j = tree.nearest_with_other_label(i, current, node_labels, bound)
+                nearest[i] = (d2, j)
+            if j >= 0:
+                best[cluster] = (d2, i, j)
+
+        merged_any = False
+        for d2, i, j in sorted(best.values()):
+            if merged.find(current[i]) != merged.find(current[j]):
+                merged.union(current[i], current[j])
+                edges.append((math.sqrt(d2), i, j))
+                merged_any = True
+        if not merged_any:
+            break
+
+    edges.sort()
+    return edges
+
+
+def _flatten(clusters):
+    """Return (antennas, labels) with each antenna labelled by its cluster index."""
+    antennas = []
+    labels = []
+    for label, cluster in enumerate(clusters):
+        for antenna in cluster:
+            antennas.append(antenna)
+            labels.append(label)
+    return antennas, labels
+
+
+def closest_bridges(clusters, k=1):
+    """Return up to k bridging antenna pairs between clusters, shortest first.
+
+    `clusters` is a list of lists of antenna dicts (as returned by
+    `find_clusters`). The pairs are the shortest edges of the minimum spanning
+    tree over the clusters, so each one joins a different pair of cluster
+    groups and together they reconnect as much of the network as possible.
+    Returns a list of (distance, antenna1, antenna2) tuples.
+    """
+    if len(clusters) < 2:
+        return []
+    antennas, labels = _flatten(clusters)
+
+    edges = cluster_spanning_edges([(a['x'], a['y']) for a in antennas], labels)
+    return [(dist, antennas[i], antennas[j]) for dist, i, j in edges[:k]]
+
+
+def plan_drones(clusters, drone_range):
+    """Plan drone positions that reconnect all clusters into one network.
+
+    Clusters are joined along the edges of their minimum spanning tree,
+    shortest first. Each edge of length d gets ceil(d / drone_range) - 1
+    drones (at least one) spaced evenly along it, so consecutive hops stay
+    within `drone_range`. Because the MST minimises any non-decreasing
+    function of its edge lengths, this also minimises the drone count among
+    direct bridges. A drone that lands within range of further clusters merges
+    them too, and any later edge between already-joined clusters is skipped.
+
+    Returns a list of (antenna1, antenna2, drones) tuples, where drones is the
+    list of `{'x', 'y', 'range'}` dicts placed on the segment between them.
+    """
+    if len(clusters) < 2:
+        return []
+    antennas, labels = _flatten(clusters)
+
+    edges = cluster_spanning_edges([(a['x'], a['y']) for a in antennas], labels)
+
+    index = GridIndex(drone_range)
+    for i, antenna in enumerate(antennas):
+        index.insert(i, (antenna['x'], antenna['y']))
+    joined = DisjointSet()
+    for label in range(len(clusters)):
+        joined.add(label)
+
+    plan = []
+    # Shrink the spacing a hair so float rounding never pushes a hop past the range
+    hop = drone_range * (1 - 1e-9)
+    for dist, i, j in edges:
+        if joined.find(labels[i]) == joined.find(labels[j]):
+            continue
+        ant1, ant2 = antennas[i], antennas[j]
+        count = max(1, math.ceil(dist / hop) - 1)
+        drones = []
+        for step in range(1, count + 1):
+            t = step / (count + 1)
+            drone = {
+                'x': ant1['x'] + (ant2['x'] - ant1['x']) * t,
+                'y': ant1['y'] + (ant2['y'] - ant1['y']) * t,
+                'range': drone_range,
+            }
+            drones.append(drone)
+            for k in index.query_radius((drone['x'], drone['y']), drone_range):
+                joined.union(labels[i], labels[k])
+        joined.union(labels[i], labels[j])
+        plan.append((ant1, ant2, drones))
+        if len(joined) == 1:
+            break
+    return plan
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class CapacityAssignment:
+    """Result of a capacity-aware association.
+
+    `antenna[d]` is the antenna serving device d, or -1. Devices that were
+    in range of some antenna but could not be admitted anywhere are listed
+    in `dropped`; devices in range of none are `uncovered`.
+    """
+
+    def __init__(self, antenna, subscribers, bandwidth, max_devices, budget, dropped, uncovered, rounds):
+        self.antenna = antenna
+        self.subscribers = subscribers  # Devices admitted per antenna
+        self.bandwidth = bandwidth  # Demand admitted per antenna
+        self.max_devices = max_devices
+        self.budget = budget
+        self.dropped = dropped
+        self.uncovered = uncovered
+        self.rounds = rounds
+
+    def utilization(self):
+        """Per antenna, the larger of the subscriber and bandwidth utilization (0 for unlimited antennas)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            by_devices = np.where(np.isfinite(self.max_devices), self.subscribers / self.max_devices, 0.0)
+            by_bandwidth = np.where(np.isfinite(self.budget), self.bandwidth / self.budget, 0.0)
+        return np.nan_to_num(np.maximum(by_devices, by_bandwidth))
+
+    def pairs(self):
+        """(antenna indices, device indices) of the admitted devices."""
+        served = np.flatnonzero(self.antenna >= 0)
+        return self.antenna[served], served
+
+
+def _per_antenna(value, count, dtype=np.float64):
+    """Broadcast a scalar or array limit to one entry per antenna; None means unlimited."""
+    if value is None:
+        return np.full(count, np.inf)
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (count,)).astype(np.float64)
+
+
+def assign_with_capacity(antenna_idx, device_idx, score, num_antennas, num_devices,
+                         max_devices=None, budget=None, demand=None):
+    """Associate every device with one antenna without exceeding antenna capacity.
+
+    The inputs list every (antenna, device) pair in range with a `score`
+    (higher is better, e.g. received power in dBm or minus the distance).
+    Antennas admit at most `max_devices` devices and at most `budget`
+    total `demand` (per-device demand, 1 by default); both may be scalars
+    or per-antenna arrays, and None means unlimited.
+
+    This is deferred acceptance run in vectorized rounds: every unplaced
+    device proposes to its best antenna not yet tried, and each antenna
+    keeps the strongest devices it can hold among those it already holds
+    and the new proposals, rejecting the rest. Rejected devices move on to
+    their next antenna. Without capacity limits this is plain best-server
+    association. The result is stable: no device and antenna would both
+    rather be paired with each other than with what they got.
+    """
+    antenna_idx = np.asarray(antenna_idx, dtype=np.intp)
+    device_idx = np.asarray(device_idx, dtype=np.intp)
+    score = np.asarray(score, dtype=np.float64)
+    max_devices = _per_antenna(max_devices, num_antennas)
+    budget = _per_antenna(budget, num_antennas)
+    demand = np.ones(num_devices) if demand is None else np.broadcast_to(np.asarray(demand, dtype=np.float64), (num_devices,))
+
+    # Each device's candidates, best first, as contiguous runs. Scores are
+    # replaced by their global rank so every later sort is on one int64 key.
+    order = np.argsort(-score)
+    strength = np.empty(len(order), dtype=np.int64)
+    strength[order] = np.arange(len(order) - 1, -1, -1)
+    order = order[np.argsort(device_idx[order], kind="stable")]
+    cand_antenna = antenna_idx[order]
+    cand_strength = strength[order]
+    cand_device = device_idx[order]
+    first = np.searchsorted(cand_device, np.arange(num_devices + 1))
+    next_choice = first[:-1].copy()
+    end = first[1:]
+
+    assigned = np.full(num_devices, -1, dtype=np.intp)
+    held = np.zeros(num_devices, dtype=np.int64)  # Strength of the pair each device holds
+    proposing = np.flatnonzero(next_choice < end)
+    rounds = 0
+    while len(proposing):
+        rounds += 1
+        choice = next_choice[proposing]
+        next_choice[proposing] += 1
+        assigned[proposing] = cand_antenna[choice]
+        held[proposing] = cand_strength[choice]
+
+        # Every antenna that got proposals re-ranks its holders plus the newcomers
+        touched = np.zeros(num_antennas, dtype=bool)
+        touched[assigned[proposing]] = True
+        contenders = np.flatnonzero((assigned >= 0) & touched[np.maximum(assigned, 0)])
+        ranked = contenders[np.argsort(assigned[contenders] * len(order) - held[contenders])]
+        antenna_of = assigned[ranked]
+        group_start = np.searchsorted(antenna_of, antenna_of, side="left")
+        rank = np.arange(len(ranked)) - group_start
+        admitted_demand = np.cumsum(demand[ranked])
+        admitted_demand -= (admitted_demand - demand[ranked])[group_start]
+        fits = (rank < max_devices[antenna_of]) & (admitted_demand <= budget[antenna_of])
+        # Once a device does not fit, nobody weaker at that antenna gets in either,
+        # so reject everything from an antenna's first failure onwards
+        failures = np.cumsum(~fits)
+        failures -= (failures - ~fits)[group_start]
+        rejected = ranked[failures > 0]
+        assigned[rejected] = -1
+        proposing = rejected[next_choice[rejected] < end[rejected]]
+
+    subscribers = np.bincount(assigned[assigned >= 0], minlength=num_antennas)
+    bandwidth = np.bincount(assigned[assigned >= 0], weights=demand[assigned >= 0], minlength=num_antennas)
+    has_candidates = end > first[:-1]
+    dropped = np.flatnonzero(has_candidates & (assigned < 0))
+    uncovered = np.flatnonzero(~has_candidates)
+    return CapacityAssignment(assigned, subscribers, bandwidth, max_devices, budget, dropped, uncovered, rounds)
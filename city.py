@@ -0,0 +1,34 @@
+import random
+
+# Simulated city border (a rough rectangle for Istanbul), shared by main.py and the headless batch runner
+CITY_BORDER = {
+    "x_min": 50,
+    "x_max": 750,
+    "y_min": 50,
+    "y_max": 550
+}
+
+
+def within_city_border(position):
+    """Check if the position is within the predefined city border."""
+    x, y = position
+    return CITY_BORDER["x_min"] <= x <= CITY_BORDER["x_max"] and CITY_BORDER["y_min"] <= y <= CITY_BORDER["y_max"]
+
+
+def cluster_positions(job, num_clusters, devices_per_cluster, seed=None):
+    """Random device positions grouped around cluster centers inside the city border; the same seed gives the same positions."""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(num_clusters):
+        job.check()
+        # Randomly choose a cluster center within the city border
+        cluster_x = rng.randint(CITY_BORDER["x_min"] + 30, CITY_BORDER["x_max"] - 30)
+        cluster_y = rng.randint(CITY_BORDER["y_min"] + 30, CITY_BORDER["y_max"] - 30)
+
+        # Randomly offset device positions within a small range around the cluster center
+        for i in range(devices_per_cluster):
+            position = (cluster_x + rng.randint(-20, 20), cluster_y + rng.randint(-20, 20))
+            # Ensure the device stays within city borders
+            if within_city_border(position):
+                positions.append(position)
+    return positions
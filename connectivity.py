@@ -0,0 +1,178 @@
+from spatial import GridIndex
+
+
+class DisjointSet:
+    """Union-find over hashable items with path compression and union by size.
+
+    The members of each set are tracked as well, so membership and set-count
+    queries are answered without walking the structure.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.members = {}  # root -> set of items
+
+    def add(self, item):
+        """Add an item as its own singleton set."""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.members[item] = {item}
+
+    def find(self, item):
+        """Return the root of the set containing the item."""
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        """Merge the sets containing a and b and return the new root."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if len(self.members[root_a]) < len(self.members[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.members[root_a] |= self.members.pop(root_b)
+        return root_a
+
+    def remove_set(self, item):
+        """Remove the whole set containing the item and return its members."""
+        members = self.members.pop(self.find(item))
+        for member in members:
+            del self.parent[member]
+        return members
+
+    def component(self, item):
+        """Return the members of the set containing the item."""
+        return self.members[self.find(item)]
+
+    def sets(self):
+        """Return every set as a collection of members."""
+        return list(self.members.values())
+
+    def __contains__(self, item):
+        return item in self.parent
+
+    def __len__(self):
+        """Number of disjoint sets."""
+        return len(self.members)
+
+
+class AntennaNetwork:
+    """Incrementally maintained links between antennas.
+
+    Antennas are the `{'x', 'y', 'range'}` dicts used by gui.py. Each one is
+    given an integer `'id'` when added. Two antennas are linked when their
+    distance is within the range of either of them. Adding or removing an
+    antenna only examines its neighbours through a grid index, so the cost
+    does not grow with the size of the network.
+
+    Clusters of linked antennas are tracked in a DisjointSet. Additions merge
+    clusters directly; a removal rebuilds only the cluster that contained the
+    removed antenna, since that is the only one that can split.
+    """
+
+    def __init__(self, cell_size=150):
+        self.index = GridIndex(cell_size)
+        self.antennas = {}  # id -> antenna dict
+        self.adjacency = {}  # id -> set of linked ids
+        self.clusters = DisjointSet()
+        self.max_range = 0
+        self.next_id = 0
+
+    def add(self, antenna):
+        """Add an antenna and return the ids of the antennas it links to."""
+        antenna_id = self.next_id
+        self.next_id += 1
+        antenna['id'] = antenna_id
+
+        if antenna['range'] > self.max_range:
+            self.max_range = antenna['range']
+            if self.max_range > 2 * self.index.cell_size:
+                self.index.rebuild(self.max_range)
+
+        neighbors = set()
+        x, y, r = antenna['x'], antenna['y'], antenna['range']
+        for other in self.index.query_radius((x, y), self.max_range):
+            dx = other['x'] - x
+            dy = other['y'] - y
+            reach = max(r, other['range'])
+            if dx * dx + dy * dy <= reach * reach:
+                neighbors.add(other['id'])
+                self.adjacency[other['id']].add(antenna_id)
+
+        self.antennas[antenna_id] = antenna
+        self.adjacency[antenna_id] = neighbors
+        self.index.insert(antenna, (x, y))
+
+        self.clusters.add(antenna_id)
+        for other_id in neighbors:
+            self.clusters.union(antenna_id, other_id)
+        return set(neighbors)
+
+    def remove(self, antenna_id):
+        """Remove an antenna and return the ids it was linked to."""
+        antenna = self.antennas.pop(antenna_id)
+        self.index.remove(antenna, (antenna['x'], antenna['y']))
+        neighbors = self.adjacency.pop(antenna_id)
+        for other_id in neighbors:
+            self.adjacency[other_id].discard(antenna_id)
+
+        # Only the removed antenna's cluster can split, so rebuild just that one
+        members = self.clusters.remove_set(antenna_id)
+        members.discard(antenna_id)
+        for member in members:
+            self.clusters.add(member)
+        for member in members:
+            for other_id in self.adjacency[member]:
+                self.clusters.union(member, other_id)
+        return neighbors
+
+    def neighbors(self, antenna_id):
+        """Return the ids of the antennas linked to the given one."""
+        return self.adjacency[antenna_id]
+
+    def edges(self):
+        """Yield every link once as an (id, id) pair with the smaller id first."""
+        for antenna_id, neighbors in self.adjacency.items():
+            for other_id in neighbors:
+                if antenna_id < other_id:
+                    yield antenna_id, other_id
+
+    def cluster_count(self):
+        """Return the number of connected clusters."""
+        return len(self.clusters)
+
+    def is_connected(self):
+        """Return True if every antenna is reachable from every other."""
+        return len(self.clusters) <= 1
+
+    def same_cluster(self, id1, id2):
+        """Return True if the two antennas are in the same cluster."""
+        return self.clusters.find(id1) == self.clusters.find(id2)
+
+    def cluster_of(self, antenna_id):
+        """Return the ids of the antennas in the same cluster as the given one."""
+        return self.clusters.component(antenna_id)
+
+    def cluster_list(self):
+        """Return every cluster as a list of antenna dicts."""
+        return [[self.antennas[i] for i in members] for members in self.clusters.sets()]
+
+    def clear(self):
+        """Remove every antenna."""
+        self.index.clear()
+        self.antennas = {}
+        self.adjacency = {}
+        self.clusters = DisjointSet()
+        self.max_range = 0
+
+    def __contains__(self, antenna_id):
+        return antenna_id in self.antennas
+
+    def __len__(self):
+        return len(self.antennas)
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 from sim import Topology, Network, Drone, MobileDevice, SimulationManager
+import telemetry
 
 
 class SimulationApp:
@@ -93,6 +94,8 @@ class SimulationApp:
 
 
 if __name__ == "__main__":
+    # Echo every simulation event to the terminal while the GUI is open
+    telemetry.configure(level=telemetry.DEBUG, sink="console")
     root = tk.Tk()
     app = SimulationApp(root)
     root.mainloop()
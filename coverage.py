@@ -0,0 +1,159 @@
+import numpy as np
+
+
+class CoverageEngine:
+    """Headless antenna/device coverage computed over contiguous NumPy arrays.
+
+    Antennas and devices are stored as float64 (x, y) rows. All range checks
+    compare squared distances, so no square roots are taken. Devices are kept
+    sorted by x so each antenna only examines the vertical strip of devices
+    within its range instead of the whole population.
+    """
+
+    def __init__(self):
+        self.antenna_xy = np.empty((0, 2), dtype=np.float64)
+        self.antenna_range = np.empty(0, dtype=np.float64)
+        self.antenna_link_range = np.empty(0, dtype=np.float64)
+
+        self._device_buffer = np.empty((0, 2), dtype=np.float64)
+        self.num_devices = 0
+        self._order = None  # device indices sorted by x, rebuilt lazily
+        self._sorted_x = None
+
+    @property
+    def device_xy(self):
+        """(num_devices, 2) view of the device positions."""
+        return self._device_buffer[:self.num_devices]
+
+    def set_antennas(self, positions, ranges, link_ranges=None):
+        """Replace all antennas. `ranges` is the device range, `link_ranges` the antenna-to-antenna range."""
+        self.antenna_xy = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        count = len(self.antenna_xy)
+        self.antenna_range = np.broadcast_to(np.asarray(ranges, dtype=np.float64), (count,)).copy()
+        if link_ranges is None:
+            link_ranges = self.antenna_range
+        self.antenna_link_range = np.broadcast_to(np.asarray(link_ranges, dtype=np.float64), (count,)).copy()
+
+    def set_devices(self, positions):
+        """Replace all devices."""
+        self._device_buffer = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.num_devices = len(self._device_buffer)
+        self._order = None
+
+    def add_devices(self, positions):
+        """Append devices, growing the backing array geometrically."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        needed = self.num_devices + len(positions)
+        if needed > len(self._device_buffer):
+            capacity = max(needed, 2 * len(self._device_buffer), 64)
+            buffer = np.empty((capacity, 2), dtype=np.float64)
+            buffer[:self.num_devices] = self.device_xy
+            self._device_buffer = buffer
+        self._device_buffer[self.num_devices:needed] = positions
+        self.num_devices = needed
+        self._order = None
+
+    def _sort_devices(self):
+        if self._order is None:
+            self._order = np.argsort(self.device_xy[:, 0], kind="stable")
+            self._sorted_x = self.device_xy[self._order, 0]
+        return self._order
+
+    def _strip(self, antenna_index):
+        """Return (device indices, squared distances) for devices in the antenna's x-strip."""
+        order = self._sort_devices()
+        ax, ay = self.antenna_xy[antenna_index]
+        r = self.antenna_range[antenna_index]
+        lo = np.searchsorted(self._sorted_x, ax - r, side="left")
+        hi = np.searchsorted(self._sorted_x, ax + r, side="right")
+        candidates = order[lo:hi]
+        delta = self.device_xy[candidates]
+        dx = delta[:, 0] - ax
+        dy = delta[:, 1] - ay
+        return candidates, dx * dx + dy * dy
+
+    def in_range_pairs(self, progress=None):
+        """Return (antenna_indices, device_indices) for every in-range pair.
+
+        Pairs are grouped by antenna in antenna order, and by device index within each antenna.
+        `progress(fraction)`, if given, is called before each antenna.
+        """
+        antenna_parts = []
+        device_parts = []
+        r2 = self.antenna_range ** 2
+        count = len(self.antenna_xy)
+        for i in range(count):
+            if progress is not None:
+                progress(i / count)
+            candidates, d2 = self._strip(i)
+            hits = np.sort(candidates[d2 <= r2[i]])
+            antenna_parts.append(np.full(len(hits), i, dtype=np.intp))
+            device_parts.append(hits)
+        if not antenna_parts:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(antenna_parts), np.concatenate(device_parts)
+
+    def nearest_antenna(self):
+        """Return, per device, the index of the nearest in-range antenna (-1 if uncovered)."""
+        best_d2 = np.full(self.num_devices, np.inf)
+        best = np.full(self.num_devices, -1, dtype=np.intp)
+        r2 = self.antenna_range ** 2
+        for i in range(len(self.antenna_xy)):
+            candidates, d2 = self._strip(i)
+            closer = (d2 <= r2[i]) & (d2 < best_d2[candidates])
+            winners = candidates[closer]
+            best_d2[winners] = d2[closer]
+            best[winners] = i
+        return best
+
+    def antenna_loads(self, nearest=False):
+        """Return the number of devices served by each antenna.
+
+        With `nearest` each device counts only towards its nearest in-range antenna,
+        otherwise towards every antenna that covers it.
+        """
+        if nearest:
+            assigned = self.nearest_antenna()
+            return np.bincount(assigned[assigned >= 0], minlength=len(self.antenna_xy))
+        antenna_idx, _ = self.in_range_pairs()
+        return np.bincount(antenna_idx, minlength=len(self.antenna_xy))
+
+    def antenna_links(self):
+        """Return (i, j) index arrays, i < j, for antenna pairs where j is within i's link range.
+
+        Like the device strips, each antenna only looks at antennas in its x-strip.
+        """
+        xy = self.antenna_xy
+        order = np.argsort(xy[:, 0], kind="stable")
+        sorted_x = xy[order, 0]
+        r = self.antenna_link_range
+        lo = np.searchsorted(sorted_x, xy[:, 0] - r, side="left")
+        hi = np.searchsorted(sorted_x, xy[:, 0] + r, side="right")
+        i_parts = []
+        j_parts = []
+        for i in range(len(xy)):
+            candidates = order[lo[i]:hi[i]]
+            candidates = candidates[candidates > i]
+            delta = xy[candidates] - xy[i]
+            d2 = np.einsum("ij,ij->i", delta, delta)
+            hits = np.sort(candidates[d2 <= r[i] * r[i]])
+            i_parts.append(np.full(len(hits), i, dtype=np.intp))
+            j_parts.append(hits)
+        if not i_parts:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(i_parts), np.concatenate(j_parts)
+
+
+def compute_connections(antenna_xy, ranges, link_ranges, device_xy, progress=None):
+    """Compute device and antenna-to-antenna links from copies of the scene, on any thread.
+
+    Returns (antenna_idx, device_idx, link_i, link_j) like in_range_pairs and antenna_links.
+    """
+    engine = CoverageEngine()
+    engine.set_antennas(antenna_xy, ranges, link_ranges)
+    engine.set_devices(device_xy)
+    antenna_idx, device_idx = engine.in_range_pairs(progress)
+    link_i, link_j = engine.antenna_links()
+    if progress is not None:
+        progress(1.0)
+    return antenna_idx, device_idx, link_i, link_j
@@ -0,0 +1,300 @@
+import bisect
+import math
+
+import numpy as np
+
+
+class Antenna:
+    __slots__ = ("name", "position", "range_radius", "antenna_range", "connected_devices", "connected_antennas")
+
+    def __init__(self, name, position, range_radius, antenna_range):
+        self.name = name
+        self.position = position  # (x, y) tuple
+        self.range_radius = range_radius  # Mobile device range
+        self.antenna_range = antenna_range  # Antenna-to-antenna range
+        self.connected_devices = []
+        self.connected_antennas = []
+
+    def is_within_range(self, device):
+        x1, y1 = self.position
+        x2, y2 = device.position
+        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        return distance <= self.range_radius
+
+    def is_antenna_within_range(self, other_antenna):
+        x1, y1 = self.position
+        x2, y2 = other_antenna.position
+        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        return distance <= self.antenna_range
+
+    def connect_device(self, device):
+        if self.is_within_range(device):
+            self.attach_device(device)
+
+    def attach_device(self, device):
+        """Record a device already known to be in range."""
+        self.connected_devices.append(device)
+        device.connected_antenna = self
+
+    def connect_antenna(self, other_antenna):
+        if self.is_antenna_within_range(other_antenna):
+            self.attach_antenna(other_antenna)
+
+    def attach_antenna(self, other_antenna):
+        """Record an antenna already known to be in range."""
+        self.connected_antennas.append(other_antenna)
+
+
+class MobileDevice:
+    __slots__ = ("name", "position", "connected_antenna")
+
+    def __init__(self, name, position):
+        self.name = name
+        self.position = position  # (x, y) tuple
+        self.connected_antenna = None
+
+
+def _reserve(buffer, used, needed):
+    """Return `buffer`, or a geometrically larger copy of it if it cannot hold `needed` rows."""
+    if needed <= len(buffer):
+        return buffer
+    capacity = max(needed, 2 * len(buffer), 64)
+    grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+class AntennaView:
+    """An Antenna backed by an AntennaStore, identified by its stable id.
+
+    The row is looked up on every access, so a view stays on its antenna
+    when other antennas are removed, and raises ValueError once its own
+    antenna is removed.
+    """
+
+    __slots__ = ("store", "id")
+
+    def __init__(self, store, antenna_id):
+        self.store = store
+        self.id = antenna_id
+
+    @property
+    def row(self):
+        return self.store.row_of(self.id)
+
+    name = property(lambda self: self.store.names[self.row])
+    position = property(lambda self: tuple(self.store.xy[self.row].tolist()))
+    range_radius = property(lambda self: float(self.store.range_radius[self.row]))
+    antenna_range = property(lambda self: float(self.store.antenna_range[self.row]))
+
+    # The range checks only need position and ranges, so they work on views unchanged
+    is_within_range = Antenna.is_within_range
+    is_antenna_within_range = Antenna.is_antenna_within_range
+    connect_device = Antenna.connect_device
+    connect_antenna = Antenna.connect_antenna
+
+    @property
+    def connected_devices(self):
+        devices = self.store.devices
+        if devices is None:
+            return []
+        return [devices[j] for j in devices.devices_of(self.row).tolist()]
+
+    @property
+    def connected_antennas(self):
+        return [self.store[j] for j in sorted(self.store.links[self.row])]
+
+    def attach_device(self, device):
+        device.connected_antenna = self
+
+    def attach_antenna(self, other_antenna):
+        self.store.links[self.row].add(other_antenna.row)
+
+    def __eq__(self, other):
+        return isinstance(other, AntennaView) and other.store is self.store and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.store), self.id))
+
+    def __repr__(self):
+        return f"AntennaView({self.name!r}, {self.position})"
+
+
+class DeviceView(MobileDevice):
+    """A MobileDevice backed by a row of a DeviceStore."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    name = property(lambda self: self.store.name(self.index))
+    position = property(lambda self: tuple(self.store.xy[self.index].tolist()))
+
+    @property
+    def connected_antenna(self):
+        antenna = int(self.store.antenna[self.index])
+        return self.store.antennas[antenna] if antenna >= 0 else None
+
+    @connected_antenna.setter
+    def connected_antenna(self, antenna):
+        if antenna is None:
+            self.store.antenna[self.index] = -1
+        elif isinstance(antenna, AntennaView) and antenna.store is self.store.antennas:
+            self.store.antenna[self.index] = antenna.row
+        else:
+            raise TypeError("connected_antenna must be an antenna from the store's AntennaStore")
+
+    def __eq__(self, other):
+        return isinstance(other, DeviceView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    def __repr__(self):
+        return f"DeviceView({self.name!r}, {self.position})"
+
+
+class AntennaStore:
+    """Antennas kept as columns (position, device range, antenna range) with a name list.
+
+    Indexing or iterating returns AntennaView objects created on demand.
+    Rows shift when an antenna is removed; `ids` holds a stable, increasing
+    id per antenna, which is what views hold on to. Antenna-to-antenna links are sets of row indices.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = []
+        self.next_id = 0
+        self._xy = np.empty((0, 2), dtype=np.float64)
+        self._range_radius = np.empty(0, dtype=np.float64)
+        self._antenna_range = np.empty(0, dtype=np.float64)
+        self.links = []  # row -> set of linked rows
+        self.devices = None  # DeviceStore whose devices connect to these antennas
+
+    xy = property(lambda self: self._xy[:len(self.names)])
+    range_radius = property(lambda self: self._range_radius[:len(self.names)])
+    antenna_range = property(lambda self: self._antenna_range[:len(self.names)])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        count = len(self.names)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("antenna index out of range")
+        return AntennaView(self, self.ids[index])
+
+    def __iter__(self):
+        return (AntennaView(self, antenna_id) for antenna_id in list(self.ids))
+
+    def add(self, name, position, range_radius, antenna_range):
+        """Append an antenna and return its view."""
+        count = len(self.names)
+        self._xy = _reserve(self._xy, count, count + 1)
+        self._range_radius = _reserve(self._range_radius, count, count + 1)
+        self._antenna_range = _reserve(self._antenna_range, count, count + 1)
+        self._xy[count] = position
+        self._range_radius[count] = range_radius
+        self._antenna_range[count] = antenna_range
+        self.names.append(name)
+        self.ids.append(self.next_id)
+        self.next_id += 1
+        self.links.append(set())
+        return AntennaView(self, self.ids[count])
+
+    def rows_of(self, antenna_ids):
+        """Map an array of antenna ids to their current rows."""
+        return np.searchsorted(np.asarray(self.ids, dtype=np.int64), antenna_ids)
+
+    def row_of(self, antenna_id):
+        """The current row of one antenna id; ValueError if it is not in the store."""
+        row = bisect.bisect_left(self.ids, antenna_id)
+        if row == len(self.ids) or self.ids[row] != antenna_id:
+            raise ValueError(f"antenna {antenna_id} is not in the store")
+        return row
+
+    def remove(self, antenna):
+        """Remove an antenna, disconnecting its devices and links. Rows after it move down by one."""
+        index = antenna.row
+        count = len(self.names)
+        for column in (self._xy, self._range_radius, self._antenna_range):
+            column[index:count - 1] = column[index + 1:count]
+        del self.names[index]
+        del self.ids[index]
+        del self.links[index]
+        self.links = [{j - (j > index) for j in linked if j != index} for linked in self.links]
+        if self.devices is not None:
+            self.devices.antenna_removed(index)
+
+
+class DeviceStore:
+    """Mobile devices kept as NumPy columns: position and connected antenna row (-1 if none).
+
+    A device costs 20 bytes plus growth slack instead of a Python object,
+    a dict, a position tuple and a name string. Names follow
+    `name_prefix + str(index + 1)` unless given otherwise. Indexing or
+    iterating returns DeviceView objects created on demand.
+    """
+
+    def __init__(self, antennas=None, name_prefix="Device-"):
+        self.antennas = antennas
+        if antennas is not None:
+            antennas.devices = self
+        self.name_prefix = name_prefix
+        self.custom_names = {}  # index -> name, only for names off the default pattern
+        self._xy = np.empty((0, 2), dtype=np.float64)
+        self._antenna = np.empty(0, dtype=np.int32)
+        self.count = 0
+
+    xy = property(lambda self: self._xy[:self.count])
+    antenna = property(lambda self: self._antenna[:self.count])
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("device index out of range")
+        return DeviceView(self, index)
+
+    def __iter__(self):
+        return (DeviceView(self, i) for i in range(self.count))
+
+    def name(self, index):
+        return self.custom_names.get(index) or f"{self.name_prefix}{index + 1}"
+
+    def add(self, position, name=None):
+        """Append a device and return its view."""
+        index = self.add_many([position])[0]
+        if name is not None and name != f"{self.name_prefix}{index + 1}":
+            self.custom_names[index] = name
+        return DeviceView(self, index)
+
+    def add_many(self, positions):
+        """Append devices from an (N, 2) array of positions and return their indices as a range."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        first = self.count
+        needed = first + len(positions)
+        self._xy = _reserve(self._xy, first, needed)
+        self._antenna = _reserve(self._antenna, first, needed)
+        self._xy[first:needed] = positions
+        self._antenna[first:needed] = -1
+        self.count = needed
+        return range(first, needed)
+
+    def devices_of(self, antenna_index):
+        """Return the indices of the devices connected to an antenna."""
+        return np.flatnonzero(self.antenna == antenna_index)
+
+    def antenna_removed(self, antenna_index):
+        """Disconnect devices from a removed antenna and shift later antenna rows down."""
+        antenna = self.antenna
+        antenna[antenna == antenna_index] = -1
+        antenna[antenna > antenna_index] -= 1
@@ -0,0 +1,368 @@
+import json
+import os
+import re
+
+import numpy as np
+import shapely
+from shapely.geometry import Point, Polygon
+from shapely.prepared import prep
+
+from telemetry import WARNING, event_type, log
+
+# Vectorized containment is only available from shapely 2.0
+_contains_xy = getattr(shapely, "contains_xy", None)
+
+CACHE_DIR_NAME = ".geocache"
+
+_memory_cache = {}
+
+CACHE_WRITE_FAILED = event_type("geometry_cache_write_failed", WARNING, "Could not write geometry cache for '{0}': {1}")
+
+
+def _cache_path(geojson_path, name):
+    """Return the cache file for `name`, keyed by the GeoJSON file's mtime and size."""
+    stat = os.stat(geojson_path)
+    safe_name = re.sub(r"[^\w.-]+", "_", name)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(geojson_path)), CACHE_DIR_NAME)
+    return cache_dir, os.path.join(cache_dir, f"{safe_name}-{stat.st_mtime_ns}-{stat.st_size}.npz")
+
+
+def _write_cache_file(cache_dir, cache_file, label, save):
+    """Write a cache file with `save(path)` through a temporary file and drop stale entries with the same key."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        key = os.path.basename(cache_file).rsplit("-", 2)[0]
+        for name in os.listdir(cache_dir):
+            if name.rsplit("-", 2)[0] == key and name != os.path.basename(cache_file):
+                os.remove(os.path.join(cache_dir, name))
+        root, ext = os.path.splitext(cache_file)
+        tmp_file = f"{root}.tmp{ext}"
+        save(tmp_file)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log.record(CACHE_WRITE_FAILED, label, e)
+
+
+class CanvasTransform:
+    """Affine mapping between geo (lon, lat) and canvas (x, y) coordinates.
+
+    The polygon's bounding box is scaled uniformly to fit the canvas with
+    padding and centred, with the y axis flipped. Build one per canvas size.
+    """
+
+    def __init__(self, bounds, canvas_width, canvas_height, padding=20):
+        min_lon, min_lat, max_lon, max_lat = bounds
+        lon_range = max_lon - min_lon
+        lat_range = max_lat - min_lat
+        if lon_range == 0 or lat_range == 0:
+            raise ValueError("Invalid city boundary coordinates.")
+
+        self.min_lon = min_lon
+        self.min_lat = min_lat
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.scale_factor = min(
+            (canvas_width - padding) / lon_range,
+            (canvas_height - padding) / lat_range
+        )
+        self.x_offset = (canvas_width - lon_range * self.scale_factor) / 2
+        self.y_offset = (canvas_height - lat_range * self.scale_factor) / 2
+
+    @property
+    def metres_per_unit(self):
+        """Approximate ground distance of one canvas unit (a degree of latitude is about 111.32 km)."""
+        return 111320 / self.scale_factor
+
+    def to_canvas(self, lon, lat):
+        """Map geo coordinates (scalars or arrays) to canvas coordinates."""
+        x = (lon - self.min_lon) * self.scale_factor + self.x_offset
+        y = self.canvas_height - ((lat - self.min_lat) * self.scale_factor + self.y_offset)
+        return x, y
+
+    def to_geo(self, x, y):
+        """Map canvas coordinates (scalars or arrays) back to geo coordinates."""
+        lon = (x - self.x_offset) / self.scale_factor + self.min_lon
+        lat = (self.canvas_height - y - self.y_offset) / self.scale_factor + self.min_lat
+        return lon, lat
+
+
+class CityGeometry:
+    """A city polygon with a prepared geometry for fast point containment."""
+
+    def __init__(self, coordinates):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.polygon = Polygon(self.coordinates)
+        self.prepared = prep(self.polygon)
+        if hasattr(shapely, "prepare"):
+            shapely.prepare(self.polygon)
+        self.bounds = self.polygon.bounds  # (min_lon, min_lat, max_lon, max_lat)
+        self.transform = None
+
+    @classmethod
+    def load(cls, geojson_path, city_name):
+        """Load a city from the GeoJSON (through the ProvinceIndex cache), or return None if it is missing."""
+        return ProvinceIndex.load(geojson_path).city(city_name)
+
+    def fit_canvas(self, canvas_width, canvas_height):
+        """Recompute the canvas transform if the canvas size changed, and return it."""
+        transform = self.transform
+        if transform is None or (transform.canvas_width, transform.canvas_height) != (canvas_width, canvas_height):
+            self.transform = CanvasTransform(self.bounds, canvas_width, canvas_height)
+        return self.transform
+
+    def canvas_coordinates(self):
+        """Return the polygon ring in canvas coordinates as a list of (x, y)."""
+        xs, ys = self.transform.to_canvas(self.coordinates[:, 0], self.coordinates[:, 1])
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def contains_canvas_point(self, x, y):
+        """Return True if the canvas point lies inside the city."""
+        min_lon, min_lat, max_lon, max_lat = self.bounds
+        lon, lat = self.transform.to_geo(x, y)
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+        return self.prepared.contains(Point(lon, lat))
+
+    def contains_canvas_points(self, xs, ys):
+        """Vectorized containment test for arrays of canvas points."""
+        lon, lat = self.transform.to_geo(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64))
+        if _contains_xy is not None:
+            return _contains_xy(self.polygon, lon, lat)
+        return np.array([self.prepared.contains(Point(a, b)) for a, b in zip(lon.tolist(), lat.tolist())], dtype=bool)
+
+    def sample_canvas_points(self, count, rng=None, box=None):
+        """Return `count` uniformly random canvas points inside the city as a (count, 2) array.
+
+        Candidates are drawn in batches from the city's canvas bounding box
+        (clipped to `box` = (x_min, y_min, x_max, y_max) if given) and tested
+        together; each batch is sized from the acceptance rate seen so far.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        min_lon, min_lat, max_lon, max_lat = self.bounds
+        x_min, y_max = self.transform.to_canvas(min_lon, min_lat)
+        x_max, y_min = self.transform.to_canvas(max_lon, max_lat)
+        if box is not None:
+            x_min, y_min = max(x_min, box[0]), max(y_min, box[1])
+            x_max, y_max = min(x_max, box[2]), min(y_max, box[3])
+        if x_min >= x_max or y_min >= y_max:
+            return np.empty((0, 2), dtype=np.float64)
+
+        batches = []
+        found = 0
+        tried = 0
+        while found < count:
+            rate = found / tried if tried else 0.5
+            if tried >= 10000 and found == 0:
+                break  # The region does not overlap the city
+            size = int((count - found) / max(rate, 0.01) * 1.1) + 64
+            xs = rng.uniform(x_min, x_max, size)
+            ys = rng.uniform(y_min, y_max, size)
+            inside = self.contains_canvas_points(xs, ys)
+            batches.append(np.column_stack([xs[inside], ys[inside]]))
+            found += int(inside.sum())
+            tried += size
+        points = np.concatenate(batches) if batches else np.empty((0, 2), dtype=np.float64)
+        return points[:count]
+
+
+def _polygon_rings(geometry):
+    """Yield the rings of each part of a Polygon or MultiPolygon geometry, exterior ring first."""
+    if geometry["type"] == "Polygon":
+        yield geometry["coordinates"]
+    elif geometry["type"] == "MultiPolygon":
+        yield from geometry["coordinates"]
+
+
+def _read_provinces(geojson_path):
+    """Parse every polygon feature of the GeoJSON into flat arrays (see ProvinceIndex.load)."""
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        geojson_data = json.load(f)
+    names, rings, ring_part, part_province = [], [], [], []
+    for feature in geojson_data["features"]:
+        name = feature["properties"].get("name")
+        if name is None or name in names or not feature.get("geometry"):
+            continue
+        for part in _polygon_rings(feature["geometry"]):
+            for ring in part:
+                rings.append(np.asarray(ring, dtype=np.float64).reshape(-1, 2))
+                ring_part.append(len(part_province))
+            part_province.append(len(names))
+        names.append(name)
+    ring_starts = np.cumsum([0] + [len(ring) for ring in rings])
+    coords = np.concatenate(rings) if rings else np.empty((0, 2), dtype=np.float64)
+    return {
+        "names": np.array(names, dtype=str),
+        "coords": coords,
+        "ring_starts": ring_starts.astype(np.int64),
+        "ring_part": np.array(ring_part, dtype=np.int32),
+        "part_province": np.array(part_province, dtype=np.int32),
+    }
+
+
+def _boxes(min_x, min_y, max_x, max_y):
+    if hasattr(shapely, "box"):
+        return shapely.box(min_x, min_y, max_x, max_y)
+    from shapely.geometry import box
+    return [box(*b) for b in zip(min_x.tolist(), min_y.tolist(), max_x.tolist(), max_y.tolist())]
+
+
+class ProvinceIndex:
+    """Every province polygon of an admin-level GeoJSON, indexed for lookups.
+
+    Names map to polygons through a dict, and points map to provinces
+    through a grid laid over the provinces' bounding box: each cell records
+    the province that fully contains it, or else the provinces whose
+    polygons touch it. Points in a contained cell are answered by table
+    lookup; only points in border cells are tested against real polygons,
+    and then only against the few provinces touching that cell.
+
+    The parsed polygons and the grid are cached in a .npz next to the
+    GeoJSON, keyed by its mtime and size, and kept in memory per process.
+    """
+
+    def __init__(self, arrays, cell_deg=0.05):
+        self.arrays = arrays = dict(arrays)
+        names = arrays["names"].tolist()
+        coords = arrays["coords"]
+        starts = arrays["ring_starts"].tolist()
+        ring_part = arrays["ring_part"].tolist()
+        part_province = arrays["part_province"].tolist()
+
+        parts = [[] for _ in part_province]
+        for i, part in enumerate(ring_part):
+            parts[part].append(coords[starts[i]:starts[i + 1]])
+        members = [[] for _ in names]
+        for part, province in enumerate(part_province):
+            if parts[part]:
+                members[province].append(Polygon(parts[part][0], parts[part][1:]))
+        self.names = names
+        self.polygons = [shapely.geometry.MultiPolygon(p) if len(p) > 1 else p[0] for p in members]
+        self.lookup = {name: i for i, name in enumerate(names)}
+        self.sorted_names = sorted(names)
+        self.prepared = [prep(polygon) for polygon in self.polygons]
+        if hasattr(shapely, "prepare"):
+            shapely.prepare(self.polygons)
+        self.bounds = np.array([polygon.bounds for polygon in self.polygons], dtype=np.float64).reshape(-1, 4)
+
+        if "grid_owner" not in arrays or arrays["grid_params"][2] != cell_deg:
+            arrays.update(self._build_grid(cell_deg))
+        self.origin_lon, self.origin_lat, self.cell_deg = arrays["grid_params"].tolist()
+        self.owner = arrays["grid_owner"]
+        self.cell_starts = arrays["grid_starts"]
+        self.cell_candidates = arrays["grid_candidates"]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.lookup
+
+    @classmethod
+    def load(cls, geojson_path, cell_deg=0.05):
+        """Load all provinces of a GeoJSON file, through the .npz cache when it is current."""
+        # Each grid size gets its own cache file, both on disk and in memory
+        cache_dir, cache_file = _cache_path(geojson_path, f"provinces-{cell_deg:g}")
+        if cache_file in _memory_cache:
+            return _memory_cache[cache_file]
+
+        if os.path.exists(cache_file):
+            with np.load(cache_file) as data:
+                index = cls({name: data[name] for name in data.files}, cell_deg)
+        else:
+            index = cls(_read_provinces(geojson_path), cell_deg)
+            _write_cache_file(cache_dir, cache_file, "provinces", lambda path: np.savez(path, **index.arrays))
+        _memory_cache[cache_file] = index
+        return index
+
+    def _build_grid(self, cell_deg):
+        """Classify every grid cell against the provinces whose bounding boxes overlap it."""
+        if len(self.polygons):
+            min_lon, min_lat = self.bounds[:, :2].min(axis=0)
+            max_lon, max_lat = self.bounds[:, 2:].max(axis=0)
+        else:
+            min_lon = min_lat = max_lon = max_lat = 0.0
+        cols = max(int(np.ceil((max_lon - min_lon) / cell_deg)), 1)
+        rows = max(int(np.ceil((max_lat - min_lat) / cell_deg)), 1)
+        owner = np.full(rows * cols, -1, dtype=np.int32)
+        touch_cells, touch_provinces = [], []
+        for i, polygon in enumerate(self.polygons):
+            c0, r0 = np.floor((self.bounds[i, :2] - (min_lon, min_lat)) / cell_deg).astype(int)
+            c1, r1 = np.floor((self.bounds[i, 2:] - (min_lon, min_lat)) / cell_deg).astype(int)
+            r, c = np.mgrid[r0:min(r1, rows - 1) + 1, c0:min(c1, cols - 1) + 1]
+            r, c = r.ravel(), c.ravel()
+            x0 = min_lon + c * cell_deg
+            y0 = min_lat + r * cell_deg
+            boxes = _boxes(x0, y0, x0 + cell_deg, y0 + cell_deg)
+            if hasattr(shapely, "contains") and hasattr(shapely, "box"):
+                inside = shapely.contains(polygon, boxes)
+                touching = shapely.intersects(polygon, boxes)
+            else:
+                inside = np.array([self.prepared[i].contains(b) for b in boxes], dtype=bool)
+                touching = np.array([self.prepared[i].intersects(b) for b in boxes], dtype=bool)
+            owner[(r * cols + c)[inside]] = i
+            border = touching & ~inside
+            touch_cells.append((r * cols + c)[border])
+            touch_provinces.append(np.full(int(border.sum()), i, dtype=np.int32))
+
+        # Border cells keep their candidate provinces as contiguous runs (CSR layout)
+        cells = np.concatenate(touch_cells) if touch_cells else np.empty(0, dtype=np.int64)
+        provinces = np.concatenate(touch_provinces) if touch_provinces else np.empty(0, dtype=np.int32)
+        keep = owner[cells] < 0
+        cells, provinces = cells[keep], provinces[keep]
+        order = np.argsort(cells, kind="stable")
+        starts = np.searchsorted(cells[order], np.arange(rows * cols + 1))
+        return {
+            "grid_params": np.array([min_lon, min_lat, cell_deg], dtype=np.float64),
+            "grid_owner": owner.reshape(rows, cols),
+            "grid_starts": starts.astype(np.int64),
+            "grid_candidates": provinces[order],
+        }
+
+    def polygon(self, name):
+        """The shapely polygon of a province (KeyError if unknown)."""
+        return self.polygons[self.lookup[name]]
+
+    def city(self, name):
+        """A CityGeometry for the province's largest part, or None if the name is unknown."""
+        if name not in self.lookup:
+            return None
+        polygon = self.polygon(name)
+        if polygon.geom_type == "MultiPolygon":
+            polygon = max(polygon.geoms, key=lambda part: part.area)
+        return CityGeometry(np.asarray(polygon.exterior.coords, dtype=np.float64))
+
+    def locate(self, lons, lats):
+        """Return the province index of each point, or -1 for points in no province."""
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        rows, cols = self.owner.shape
+        col = np.floor((lons - self.origin_lon) / self.cell_deg)
+        row = np.floor((lats - self.origin_lat) / self.cell_deg)
+        on_grid = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        cell = np.where(on_grid, row * cols + col, 0).astype(np.int64)
+        result = np.where(on_grid, self.owner.ravel()[cell], -1).astype(np.intp)
+
+        # Points in border cells: test each against the provinces touching its cell
+        border = np.flatnonzero(on_grid & (result < 0))
+        first = self.cell_starts[cell[border]]
+        count = self.cell_starts[cell[border] + 1] - first
+        point = np.repeat(border, count)
+        candidate = self.cell_candidates[np.repeat(first - np.cumsum(count) + count, count) + np.arange(len(point))]
+        for i in np.unique(candidate).tolist():
+            pts = point[candidate == i]
+            pts = pts[result[pts] < 0]
+            if _contains_xy is not None:
+                inside = _contains_xy(self.polygons[i], lons[pts], lats[pts])
+            else:
+                inside = np.array([self.prepared[i].contains(Point(a, b))
+                                   for a, b in zip(lons[pts].tolist(), lats[pts].tolist())], dtype=bool)
+            result[pts[inside]] = i
+        return result
+
+    def counts(self, lons, lats, weights=None):
+        """Per-province number of points (or sum of `weights`), in the order of `names`."""
+        province = self.locate(lons, lats)
+        inside = province >= 0
+        if weights is not None:
+            weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), province.shape)[inside]
+        return np.bincount(province[inside], weights=weights, minlength=len(self.names))
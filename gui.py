@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
 import math
+from background import BackgroundRunner
+from bridging import plan_drones
+from connectivity import AntennaNetwork
+import telemetry
 
 class NetworkSimulationApp:
     def __init__(self, root):
@@ -9,11 +13,17 @@ class NetworkSimulationApp:
         
         # Initialize parameters
         self.antennas = []
-        self.drone = None  # To track the drone node
+        self.drones = []  # Drones bridging disconnected clusters
+        self.drone_plan = []  # (antenna1, antenna2, drones) for each bridge
+        self.network = AntennaNetwork()  # Antenna links, maintained incrementally
+        self.connection_items = {}  # (id1, id2) -> canvas line
         self.antenna_range = tk.DoubleVar(value=150)  # Default range of antennas
         
         # Create the GUI layout
         self.create_widgets()
+
+        # Drone planning runs on a worker thread; results come back through the Tk loop
+        self.runner = BackgroundRunner(self.root, progressbar=self.progress)
         
     def create_widgets(self):
         # Create a frame for the controls
@@ -23,6 +33,10 @@ class NetworkSimulationApp:
         # Add a label and entry for the antenna range
         ttk.Label(control_frame, text="Antenna Range:").grid(row=0, column=0, sticky=tk.W)
         ttk.Entry(control_frame, textvariable=self.antenna_range).grid(row=0, column=1, sticky=(tk.W, tk.E))
+
+        # Progress of background computations
+        self.progress = ttk.Progressbar(control_frame, length=200, maximum=100)
+        self.progress.grid(row=0, column=2, padx=10)
         
         # Create a canvas for the network visualization
         self.canvas = tk.Canvas(self.root, width=1200, height=700, bg="white")
@@ -53,115 +67,116 @@ class NetworkSimulationApp:
         """Add a new antenna at the specified position."""
         antenna = {'x': x, 'y': y, 'range': self.antenna_range.get()}
         self.antennas.append(antenna)
+        self.network.add(antenna)
         self.draw_antenna(antenna)
+
+        # A drone plan still being computed is for the old clusters: supersede it
+        if self.runner.busy("drones"):
+            self.clear_drones()
+            if not self.is_network_connected():
+                self.place_drone_optimally()
+        
+    def remove_antenna(self, antenna):
+        """Remove an antenna along with its canvas items and connections."""
+        self.antennas.remove(antenna)
+        for other_id in self.network.remove(antenna['id']):
+            key = (min(antenna['id'], other_id), max(antenna['id'], other_id))
+            self.canvas.delete(self.connection_items.pop(key))
+        self.canvas.delete(f"antenna_{antenna['id']}")
         
     def draw_antenna(self, antenna):
         """Draw an antenna and its coverage area on the canvas."""
         x, y, r = antenna['x'], antenna['y'], antenna['range']
+        tag = f"antenna_{antenna['id']}"
         
         # Draw the coverage area (circle)
-        self.canvas.create_oval(x - r, y - r, x + r, y + r, outline="blue", width=2, tags="coverage")
+        self.canvas.create_oval(x - r, y - r, x + r, y + r, outline="blue", width=2, tags=("coverage", tag))
         
         # Draw the antenna as a small circle
-        self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="red", tags="antenna")
+        self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="red", tags=("antenna", tag))
         
-        # Visualize connections between antennas
-        self.update_connections()
+        # Visualize connections to neighbouring antennas
+        self.draw_connections(antenna)
         
     def delete_closest_node(self, x, y):
         """Find and delete the closest antenna or drone to the clicked position."""
-        if not self.antennas and not self.drone:
+        if not self.antennas and not self.drones:
             return
         
         closest_node = None
         min_distance = float('inf')
         
-        # Find the closest antenna by comparing distances
-        for antenna in self.antennas:
+        # Find the closest antenna among those near the click
+        for antenna in self.network.index.query_radius((x, y), 20):
             dist = self.distance_from_point(antenna, x, y)
             if dist < min_distance:
                 min_distance = dist
                 closest_node = antenna
         
-        # Check the drone as well
-        if self.drone:
-            dist = self.distance_from_point(self.drone, x, y)
+        # Check the drones as well
+        for drone in self.drones:
+            dist = self.distance_from_point(drone, x, y)
             if dist < min_distance:
                 min_distance = dist
-                closest_node = self.drone
+                closest_node = drone
         
         # Remove the node if it's within a reasonable click distance (20 pixels radius)
         if closest_node and min_distance <= 20:
-            if closest_node == self.drone:
-                self.drone = None
-                self.canvas.delete("drone")
-                self.canvas.delete("drone_connections")
-            else:
-                self.antennas.remove(closest_node)
-            self.redraw_canvas()
+            if not any(closest_node is drone for drone in self.drones):
+                self.remove_antenna(closest_node)
+
+            # Clear the current drones; they are re-planned below if the network is still split
+            self.clear_drones()
 
             # After deleting, re-evaluate network connectivity
             if not self.is_network_connected():
                 self.place_drone_optimally()
-            else:
-                # Clear any existing drone connections if the network is now fully connected
-                self.drone = None
-                self.canvas.delete("drone_connections")
-                self.canvas.delete("drone")
 
         
-    def redraw_canvas(self):
-        """Clear the canvas and redraw all antennas and connections."""
-        self.canvas.delete("all")  # Clear everything
-        for antenna in self.antennas:
-            self.draw_antenna(antenna)  # Redraw antennas and connections
-        if self.drone:
-            self.draw_drone(self.drone)
-        
-    def update_connections(self):
-        """Update the connections between antennas based on their range."""
-        self.canvas.delete("connections")  # Remove existing connections
-        
-        for i, ant1 in enumerate(self.antennas):
-            for j, ant2 in enumerate(self.antennas):
-                if i != j:
-                    dist = self.distance(ant1, ant2)
-                    if dist <= ant1['range']:  # If in range, draw a line
-                        self.canvas.create_line(ant1['x'], ant1['y'], ant2['x'], ant2['y'], fill="green", tags="connections")
+    def draw_connections(self, antenna):
+        """Draw the links of one antenna that are not on the canvas yet."""
+        for other_id in self.network.neighbors(antenna['id']):
+            key = (min(antenna['id'], other_id), max(antenna['id'], other_id))
+            if key not in self.connection_items:
+                other = self.network.antennas[other_id]
+                self.connection_items[key] = self.canvas.create_line(
+                    antenna['x'], antenna['y'], other['x'], other['y'], fill="green", tags="connections"
+                )
         
     def place_drone_optimally(self):
-        """Place the drone at the optimal position to connect the closest nodes between clusters."""
+        """Place the fewest drones needed to reconnect every cluster of antennas."""
         clusters = self.find_clusters()
         if len(clusters) < 2:
             return  # No need for a drone if the network is still connected
         
-        # Find the closest pair of nodes between different clusters
-        min_distance = float('inf')
-        best_pair = None
-        
-        for i, cluster1 in enumerate(clusters):
-            for j, cluster2 in enumerate(clusters):
-                if i != j:
-                    for ant1 in cluster1:
-                        for ant2 in cluster2:
-                            dist = self.distance(ant1, ant2)
-                            if dist < min_distance:
-                                min_distance = dist
-                                best_pair = (ant1, ant2)
-        
-        if best_pair:
-            # Place the drone at the midpoint between the closest nodes
-            ant1, ant2 = best_pair
-            drone_x = (ant1['x'] + ant2['x']) / 2
-            drone_y = (ant1['y'] + ant2['y']) / 2
-            self.drone = {'x': drone_x, 'y': drone_y, 'range': self.antenna_range.get() * 1.5}  # Larger range for the drone
-            
-            # Draw the drone in a different color (green)
-            self.draw_drone(self.drone)
-            
-            # Connect the drone to the closest nodes
-            self.canvas.create_line(drone_x, drone_y, ant1['x'], ant1['y'], fill="green", tags="drone_connections")
-            self.canvas.create_line(drone_x, drone_y, ant2['x'], ant2['y'], fill="green", tags="drone_connections")
+        # Bridge clusters along their minimum spanning tree; drones have a larger range.
+        # A newer request (e.g. another deletion) supersedes a plan still being computed.
+        drone_range = self.antenna_range.get() * 1.5
+        self.runner.submit("drones", lambda job: plan_drones(clusters, drone_range), self.apply_drone_plan)
+
+    def apply_drone_plan(self, plan):
+        """Show a drone plan computed in the background."""
+        self.clear_drones()
+        self.drone_plan = plan
+        self.drones = [drone for _, _, drones in self.drone_plan for drone in drones]
+        self.draw_drone_plan()
+    
+    def clear_drones(self):
+        """Remove all drones and their connections, and drop any plan still being computed."""
+        self.runner.cancel("drones")
+        self.drones = []
+        self.drone_plan = []
+        self.canvas.delete("drone")
+        self.canvas.delete("drone_connections")
+    
+    def draw_drone_plan(self):
+        """Draw every drone and the chain of links it forms between two antennas."""
+        for ant1, ant2, drones in self.drone_plan:
+            hops = [ant1] + drones + [ant2]
+            for a, b in zip(hops, hops[1:]):
+                self.canvas.create_line(a['x'], a['y'], b['x'], b['y'], fill="green", tags="drone_connections")
+            for drone in drones:
+                self.draw_drone(drone)
     
     def draw_drone(self, drone):
         """Draw the drone on the canvas."""
@@ -172,34 +187,11 @@ class NetworkSimulationApp:
         
     def find_clusters(self):
         """Find all connected clusters of antennas."""
-        clusters = []
-        visited = set()
-        
-        for i, antenna in enumerate(self.antennas):
-            if i not in visited:
-                cluster = []
-                self.dfs(i, visited, cluster)
-                clusters.append(cluster)
-        
-        return clusters
-    
-    def dfs(self, index, visited, cluster):
-        """Depth-first search to find all antennas in the same cluster."""
-        visited.add(index)
-        cluster.append(self.antennas[index])
-        
-        for i, other in enumerate(self.antennas):
-            if i not in visited and self.distance(self.antennas[index], other) <= self.antennas[index]['range']:
-                self.dfs(i, visited, cluster)
+        return self.network.cluster_list()
                 
     def is_network_connected(self):
         """Check if the current network is fully connected."""
-        if len(self.antennas) < 2:
-            return True  # A single antenna is always connected
-        
-        visited = set()
-        self.dfs(0, visited, [])
-        return len(visited) == len(self.antennas)
+        return self.network.is_connected()
     
     def distance(self, ant1, ant2):
         """Calculate the distance between two antennas."""
@@ -210,6 +202,7 @@ class NetworkSimulationApp:
         return math.sqrt((antenna['x'] - x) ** 2 + (antenna['y'] - y) ** 2)
 
 if __name__ == "__main__":
+    telemetry.configure(sink="console")
     root = tk.Tk()
     app = NetworkSimulationApp(root)
     root.mainloop()
\ No newline at end of file
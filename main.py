@@ -1,53 +1,77 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
 import random
-import math
-
-# Simulated city border (a rough rectangle for Istanbul)
-CITY_BORDER = {
-    "x_min": 50,
-    "x_max": 750,
-    "y_min": 50,
-    "y_max": 550
-}
-
-# Parent class Antenna
-class Antenna:
-    def __init__(self, name, position, range_radius, antenna_range):
-        self.name = name
-        self.position = position  # (x, y) tuple
-        self.range_radius = range_radius  # Mobile device range
-        self.antenna_range = antenna_range  # Antenna-to-antenna range
-        self.connected_devices = []
-        self.connected_antennas = []
-
-    def is_within_range(self, device):
-        x1, y1 = self.position
-        x2, y2 = device.position
-        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        return distance <= self.range_radius
-
-    def is_antenna_within_range(self, other_antenna):
-        x1, y1 = self.position
-        x2, y2 = other_antenna.position
-        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        return distance <= self.antenna_range
-
-    def connect_device(self, device):
-        if self.is_within_range(device):
-            self.connected_devices.append(device)
-            device.connected_antenna = self
-
-    def connect_antenna(self, other_antenna):
-        if self.is_antenna_within_range(other_antenna):
-            self.connected_antennas.append(other_antenna)
-
-# Parent class MobileDevice
-class MobileDevice:
-    def __init__(self, name, position):
-        self.name = name
-        self.position = position  # (x, y) tuple
-        self.connected_antenna = None
+import numpy as np
+from association import AssociationSet, split_keys
+from background import BackgroundRunner
+from capacity import assign_with_capacity
+from city import CITY_BORDER, cluster_positions, within_city_border
+from coverage import compute_connections
+from mobility import ClusterEvacuation, MobilityEngine, RandomWaypoint, RoadNetwork, grid_roads
+from placement import grid_sites, kmeans_sites, place_antennas
+from propagation import MODELS, RasterGrid, SignalMap, make_model
+from rendering import RasterOverlay, SceneRenderer
+from scenario import SUFFIX, Scenario
+import telemetry
+from entities import Antenna, AntennaStore, DeviceStore, MobileDevice  # Antenna and MobileDevice are re-exported
+
+# Signal raster: 4 px cells, one pixel is taken as 50 m (the border spans about 35 km)
+SIGNAL_CELL_SIZE = 4
+METRES_PER_PIXEL = 50
+
+# Mobility: each animation frame advances the simulation clock by MOBILITY_STEP seconds
+MOBILITY_MODELS = ("random_waypoint", "evacuation", "roads")
+MOBILITY_STEP = 30
+MOBILITY_FRAME_MS = 100
+WALKING_SPEED = (0.8 / METRES_PER_PIXEL, 1.6 / METRES_PER_PIXEL)  # Pixels per second
+EVACUATION_SHELTERS = [(150, 150), (650, 150), (400, 300), (150, 450), (650, 450)]
+ROAD_SPACING = 50
+
+# Control values saved with a scenario and restored when it is loaded
+SCENARIO_SETTINGS = ("antenna_range", "antenna_to_antenna_range", "use_path_loss", "model_name", "frequency",
+                     "antenna_power", "max_devices")
+
+
+def connections_job(job, antenna_ids, antenna_xy, ranges, link_ranges, device_xy, signal=None, max_devices=0):
+    """Compute associations from a snapshot of the scene and return them keyed by antenna id.
+
+    With a SignalMap snapshot each device attaches to its best server instead of every antenna in range.
+    With `max_devices` each antenna admits at most that many devices, strongest signal first; the rest
+    fall back to their next-best antenna or are dropped. The last item returned is then the
+    CapacityAssignment (indexed like `antenna_ids`), otherwise None.
+    """
+    if signal is None:
+        antenna_idx, device_idx, link_i, link_j = compute_connections(antenna_xy, ranges, link_ranges, device_xy, job.report)
+        # Closer is stronger without a propagation model
+        delta = antenna_xy[antenna_idx] - device_xy[device_idx]
+        score = -np.einsum("ij,ij->i", delta, delta)
+    else:
+        _, _, link_i, link_j = compute_connections(antenna_xy, ranges, link_ranges, device_xy[:0], job.report)
+        if not max_devices:
+            pair_ids, device_idx = signal.serving(device_xy)
+            return pair_ids, device_idx, antenna_ids[link_i], antenna_ids[link_j], None
+        pair_ids, device_idx, score = signal.candidates(device_xy)
+        sorter = np.argsort(antenna_ids)
+        antenna_idx = sorter[np.searchsorted(antenna_ids, pair_ids, sorter=sorter)]
+
+    load = None
+    if max_devices:
+        job.check()
+        load = assign_with_capacity(antenna_idx, device_idx, score, len(antenna_ids), len(device_xy), max_devices=max_devices)
+        antenna_idx, device_idx = load.pairs()
+    return antenna_ids[antenna_idx], device_idx, antenna_ids[link_i], antenna_ids[link_j], load
+
+
+def placement_job(job, device_xy, existing_xy, count, range_radius, link_range):
+    """Choose `count` new antenna sites from a lattice over the city plus k-means centres of the devices."""
+    candidates = np.concatenate([
+        grid_sites(CITY_BORDER["x_min"], CITY_BORDER["y_min"], CITY_BORDER["x_max"], CITY_BORDER["y_max"], range_radius / 2),
+        kmeans_sites(device_xy, 4 * count, seed=0),
+    ])
+    job.check()
+    positions, _ = place_antennas(device_xy, count, range_radius, link_range, candidates, existing_xy, job.report)
+    return positions
+
 
 # Main GUI class
 class NetworkSimulationApp:
@@ -55,11 +79,38 @@ class NetworkSimulationApp:
         self.root = root
         self.root.title("Network Simulation")
 
-        self.antennas = []
-        self.mobile_devices = []
+        # Column-backed entity stores; indexing them returns lightweight views
+        self.antennas = AntennaStore()
+        self.mobile_devices = DeviceStore(self.antennas)
 
         self.create_widgets()
 
+        # Received signal over the city; each antenna's tile is cached under its id
+        grid = RasterGrid(CITY_BORDER["x_min"], CITY_BORDER["y_min"], CITY_BORDER["x_max"], CITY_BORDER["y_max"],
+                          SIGNAL_CELL_SIZE, METRES_PER_PIXEL)
+        self.signal = SignalMap(grid, self.path_loss_model())
+        self.signal_overlay = RasterOverlay(self.canvas)
+        self.signal_visible = False
+
+        # (clusters, devices per cluster, seed) of every generated batch of devices, saved with scenarios
+        self.cluster_seeds = []
+        self.scene_generation = 0  # Bumped when a scenario replaces the scene, to drop results computed for the old one
+
+        # Moving devices, stepped from the Tk loop while mobility is on
+        self.mobility = None
+        self.mobility_frame = None
+        self.handovers = 0
+
+        # Heavy computations run on a worker thread; results come back through the Tk loop
+        self.runner = BackgroundRunner(self.root, progressbar=self.progress)
+
+        # Current associations, keyed by (antenna id, device index) and (antenna id, antenna id)
+        self.device_links = AssociationSet()
+        self.antenna_links = AssociationSet()
+
+        # Draws devices and connections, reusing canvas items and aggregating large scenes
+        self.renderer = SceneRenderer(self.canvas)
+
     def create_widgets(self):
         # Create a frame for the controls
         control_frame = ttk.Frame(self.root, padding="10")
@@ -80,6 +131,50 @@ class NetworkSimulationApp:
         # Add button to show connections
         ttk.Button(control_frame, text="Show Connections", command=self.show_connections).grid(row=3, column=0, columnspan=2)
 
+        # Progress of background computations
+        self.progress = ttk.Progressbar(control_frame, length=200, maximum=100)
+        self.progress.grid(row=4, column=0, columnspan=2)
+
+        # Signal propagation (opt-in): devices attach to their best server instead of any antenna in range
+        self.use_path_loss = tk.BooleanVar(value=False)  # Off: coverage stays the range disk set by "Antenna Range"
+        ttk.Checkbutton(control_frame, text="Path-loss coverage", variable=self.use_path_loss).grid(row=0, column=2, columnspan=2, sticky=tk.W, padx=(20, 0))
+        ttk.Label(control_frame, text="Model:").grid(row=1, column=2, sticky=tk.W, padx=(20, 0))
+        self.model_name = tk.StringVar(value="okumura_hata")
+        ttk.Combobox(control_frame, textvariable=self.model_name, values=list(MODELS), state="readonly").grid(row=1, column=3, sticky=(tk.W, tk.E))
+        ttk.Label(control_frame, text="Power (dBm):").grid(row=2, column=2, sticky=tk.W, padx=(20, 0))
+        self.antenna_power = tk.DoubleVar(value=43)  # 20 W macro cell
+        ttk.Entry(control_frame, textvariable=self.antenna_power).grid(row=2, column=3, sticky=(tk.W, tk.E))
+        ttk.Label(control_frame, text="Frequency (MHz):").grid(row=3, column=2, sticky=tk.W, padx=(20, 0))
+        self.frequency = tk.DoubleVar(value=900)
+        ttk.Entry(control_frame, textvariable=self.frequency).grid(row=3, column=3, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Signal Map", command=self.toggle_signal_map).grid(row=4, column=2, columnspan=2)
+
+        # Automatic placement of new antennas
+        ttk.Label(control_frame, text="Antennas to Place:").grid(row=5, column=0, sticky=tk.W)
+        self.antennas_to_place = tk.IntVar(value=5)
+        ttk.Entry(control_frame, textvariable=self.antennas_to_place).grid(row=5, column=1, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Optimize Placement", command=self.optimize_placement).grid(row=6, column=0, columnspan=2)
+
+        # Antenna capacity: 0 admits every device in range
+        ttk.Label(control_frame, text="Max Devices / Antenna:").grid(row=7, column=0, sticky=tk.W)
+        self.max_devices = tk.IntVar(value=0)
+        ttk.Entry(control_frame, textvariable=self.max_devices).grid(row=7, column=1, sticky=(tk.W, tk.E))
+        self.load_status = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.load_status).grid(row=7, column=2, columnspan=2, sticky=tk.W, padx=(20, 0))
+
+        # Scenario files
+        ttk.Button(control_frame, text="Save Scenario", command=self.save_scenario).grid(row=8, column=0)
+        ttk.Button(control_frame, text="Load Scenario", command=self.load_scenario).grid(row=8, column=1)
+
+        # Device movement
+        ttk.Label(control_frame, text="Mobility:").grid(row=5, column=2, sticky=tk.W, padx=(20, 0))
+        self.mobility_model = tk.StringVar(value="random_waypoint")
+        ttk.Combobox(control_frame, textvariable=self.mobility_model, values=MOBILITY_MODELS, state="readonly").grid(row=5, column=3, sticky=(tk.W, tk.E))
+        self.mobility_button = ttk.Button(control_frame, text="Start Mobility", command=self.toggle_mobility)
+        self.mobility_button.grid(row=6, column=2)
+        self.mobility_status = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.mobility_status).grid(row=6, column=3, sticky=tk.W)
+
         # Create a canvas for the network visualization
         self.canvas = tk.Canvas(self.root, width=800, height=600, bg="white")
         self.canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -95,29 +190,28 @@ class NetworkSimulationApp:
         """Populate the entire space with randomly distributed mobile device clusters."""
         num_clusters = 10  # Number of clusters to generate
         devices_per_cluster = 10  # Number of devices per cluster
+        self.generate_clusters(num_clusters, devices_per_cluster)
+
+    def generate_clusters(self, num_clusters, devices_per_cluster):
+        seed = random.randrange(2 ** 32)
+        generation = self.scene_generation
 
-        for _ in range(num_clusters):
-            # Randomly choose a cluster center within the city border
-            cluster_x = random.randint(CITY_BORDER["x_min"] + 30, CITY_BORDER["x_max"] - 30)
-            cluster_y = random.randint(CITY_BORDER["y_min"] + 30, CITY_BORDER["y_max"] - 30)
-
-            # Create devices around this cluster center
-            for i in range(devices_per_cluster):
-                device_name = f"Device-{len(self.mobile_devices) + 1}"
-                # Randomly offset device positions within a small range around the cluster center
-                x_offset = random.randint(-20, 20)
-                y_offset = random.randint(-20, 20)
-                position = (cluster_x + x_offset, cluster_y + y_offset)
-
-                # Ensure the device stays within city borders
-                if self.is_within_city_border(position):
-                    device = MobileDevice(device_name, position)
-                    self.mobile_devices.append(device)
-
-                    x_device, y_device = position
-                    self.canvas.create_oval(
-                        x_device - 5, y_device - 5, x_device + 5, y_device + 5, fill="blue", tags=("device", device_name)
-                    )
+        def add_clusters(positions):
+            if generation != self.scene_generation:
+                return  # A scenario was loaded while the clusters were being generated
+            # Seeds are kept in the order their devices were added, so replaying them rebuilds the same population
+            self.cluster_seeds.append((num_clusters, devices_per_cluster, seed))
+            self.add_devices_at(positions)
+
+        self.runner.submit(None, cluster_positions, add_clusters, num_clusters, devices_per_cluster, seed)
+
+    def add_devices_at(self, positions):
+        """Add devices (named Device-N in order) and draw them."""
+        self.mobile_devices.add_many(positions)
+        if self.mobility is not None:
+            self.mobility.set_devices(self.mobile_devices.xy)  # The position column may have been reallocated
+            self.apply_mobility_associations()
+        self.refresh_scene()
 
     def draw_city_border(self):
         """Draw a rectangle representing the city border."""
@@ -128,94 +222,264 @@ class NetworkSimulationApp:
         for antenna in self.antennas:
             x, y = antenna.position
             if (x - 10 <= event.x <= x + 10) and (y - 10 <= event.y <= y + 10):
-                # Reset connected devices to unconnected (blue)
-                for device in antenna.connected_devices:
-                    device.connected_antenna = None
-                    x2, y2 = device.position
-                    self.canvas.create_oval(x2 - 5, y2 - 5, x2 + 5, y2 + 5, fill="blue", tags=device.name)
-
-                # Remove antenna from list and delete visuals
+                # Remove antenna from the store (its devices become unconnected) and delete visuals
+                antenna_id, antenna_name = antenna.id, antenna.name  # The view cannot be read once removed
                 self.antennas.remove(antenna)
-                self.canvas.delete(antenna.name)  # Delete antenna shape
-                self.canvas.delete("connection")  # Remove connections
-                self.canvas.delete(f"text_{antenna.name}")  # Remove antenna label
+                self.canvas.delete(antenna_name)  # Delete antenna shape
+                self.canvas.delete(f"text_{antenna_name}")  # Remove antenna label
+                self.signal.remove_antenna(antenna_id)
+
+                # Drop only this antenna's connections; devices it alone covered turn blue again
+                self.device_links.discard(antenna_id)
+                self.antenna_links.discard(antenna_id, either=True)
+                self.antennas_changed()
+                self.refresh_scene()
+                self.refresh_signal_map()
                 break
 
     def add_antenna_on_click(self, event):
         # Get the mouse click coordinates and add an antenna at that position
+        self.add_antenna_at((event.x, event.y))
+
+    def add_antenna_at(self, position):
         antenna_name = f"Antenna-{len(self.antennas) + 1}"
-        position = (event.x, event.y)
 
         # Check if the click is inside the city border
         if self.is_within_city_border(position):
             range_radius = self.antenna_range.get()
             antenna_to_antenna_range = self.antenna_to_antenna_range.get()
 
-            antenna = Antenna(antenna_name, position, range_radius, antenna_to_antenna_range)
-            self.antennas.append(antenna)
+            antenna = self.antennas.add(antenna_name, position, range_radius, antenna_to_antenna_range)
+            self.signal.set_antenna(antenna.id, position, self.antenna_power.get())
 
             # Visualize the antenna on the canvas (ensure it is on top of devices)
             x, y = position
             self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="red", tags=("antenna", antenna_name))
             self.canvas.create_text(x, y + 20, text=antenna_name, tags=("antenna_text", f"text_{antenna_name}"))  # Add tag for deletion
-
+            self.antennas_changed()
+            self.refresh_signal_map()
 
     def add_mobile_devices(self):
         # Create small clusters of mobile devices in random areas within the city border
         num_clusters = 3
         devices_per_cluster = 10
+        self.generate_clusters(num_clusters, devices_per_cluster)
 
-        for cluster in range(num_clusters):
-            cluster_x = random.randint(CITY_BORDER["x_min"] + 30, CITY_BORDER["x_max"] - 30)  # Adjust to avoid going out of bounds
-            cluster_y = random.randint(CITY_BORDER["y_min"] + 30, CITY_BORDER["y_max"] - 30)
-
-            for i in range(devices_per_cluster):
-                device_name = f"Device-{len(self.mobile_devices) + 1}"
-                x_offset = random.randint(-20, 20)
-                y_offset = random.randint(-20, 20)
-                position = (cluster_x + x_offset, cluster_y + y_offset)
+    def optimize_placement(self):
+        """Add antennas where they cover the most uncovered devices while staying linked to the backbone."""
+        self.runner.submit(
+            "placement", placement_job, self.apply_placement,
+            self.mobile_devices.xy.copy(), self.antennas.xy.copy(), self.antennas_to_place.get(),
+            self.antenna_range.get(), self.antenna_to_antenna_range.get(),
+        )
 
-                # Ensure mobile devices stay within city borders
-                if self.is_within_city_border(position):
-                    device = MobileDevice(device_name, position)
-                    self.mobile_devices.append(device)
-
-                    x, y = position
-                    self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="blue", tags=device_name)
-                    #self.canvas.create_text(x, y + 20, text=device_name)
+    def apply_placement(self, positions):
+        for x, y in positions.tolist():
+            self.add_antenna_at((x, y))
+        self.show_connections()
 
     def show_connections(self):
-        # Clear previous connections
-        self.canvas.delete("connection")
+        """Recompute connections in the background; a newer request supersedes a pending one."""
+        signal = None
+        if self.use_path_loss.get():
+            self.signal.set_model(self.path_loss_model())
+            signal = self.signal.snapshot()
+        self.runner.submit(
+            "connections", connections_job, self.apply_connections,
+            np.asarray(self.antennas.ids, dtype=np.int64), self.antennas.xy.copy(),
+            self.antennas.range_radius.copy(), self.antennas.antenna_range.copy(), self.mobile_devices.xy.copy(),
+            signal, self.max_devices.get(),
+        )
+
+    def save_scenario(self, path=None):
+        """Save antennas, devices, connections, settings and cluster seeds to a scenario file."""
+        path = path or filedialog.asksaveasfilename(defaultextension=SUFFIX, filetypes=[("Scenarios", f"*{SUFFIX}")])
+        if not path:
+            return
+        scenario = Scenario(meta={
+            "settings": {name: getattr(self, name).get() for name in SCENARIO_SETTINGS},
+            "cluster_seeds": self.cluster_seeds,
+        })
+        scenario.put_stores(self.antennas, self.mobile_devices)
+        scenario["antennas/power_dbm"] = np.array([self.signal.sources[i][2] for i in self.antennas.ids])
+        scenario["device_links"] = self.device_links.keys
+        scenario["antenna_links"] = self.antenna_links.keys
+        scenario.save(path)
+
+    def load_scenario(self, path=None):
+        """Replace the current scene with a saved scenario.
+
+        Scenarios saved by batch.py open too; their failed antennas are left out.
+        """
+        path = path or filedialog.askopenfilename(filetypes=[("Scenarios", f"*{SUFFIX}")])
+        if not path:
+            return
+        scenario = Scenario.load(path)
+        # Results still in flight refer to the old stores' rows; drop them before swapping the stores
+        for key in ("connections", "placement"):
+            self.runner.cancel(key)
+        self.scene_generation += 1
+        if self.mobility is not None:
+            self.toggle_mobility()
+        for name in self.antennas.names:
+            self.canvas.delete(name, f"text_{name}")
+        self.renderer.clear_devices()
+        self.renderer.antenna_lines.clear()
+
+        settings = scenario.meta.get("settings", {})
+        for name in SCENARIO_SETTINGS:
+            if name in settings:
+                getattr(self, name).set(settings[name])
+        self.cluster_seeds = [tuple(seeds) for seeds in scenario.meta.get("cluster_seeds", [])]
+        self.antennas, self.mobile_devices = scenario.stores()
+        power = scenario["antennas/power_dbm"] if "antennas/power_dbm" in scenario else None
+        self.signal = SignalMap(self.signal.grid, self.path_loss_model())
+        for row, (antenna_id, position) in enumerate(zip(self.antennas.ids, self.antennas.xy.tolist())):
+            self.signal.set_antenna(antenna_id, position, self.antenna_power.get() if power is None else power[row])
+        self.device_links.replace_keys(scenario["device_links"] if "device_links" in scenario else np.empty(0, dtype=np.int64))
+        self.antenna_links.replace_keys(scenario["antenna_links"] if "antenna_links" in scenario else np.empty(0, dtype=np.int64))
+        if "antennas/alive" in scenario:
+            for antenna in reversed(list(self.antennas)):
+                if not scenario["antennas/alive"][antenna.row]:
+                    self.signal.remove_antenna(antenna.id)
+                    self.device_links.discard(antenna.id)
+                    self.antenna_links.discard(antenna.id, either=True)
+                    self.antennas.remove(antenna)
 
-        # Connect mobile devices to antennas
         for antenna in self.antennas:
-            for device in self.mobile_devices:
-                if antenna.is_within_range(device):
-                    antenna.connect_device(device)
-                    x1, y1 = antenna.position
-                    x2, y2 = device.position
-                    # Change color to green for connected mobile devices
-                    self.canvas.create_oval(x2 - 5, y2 - 5, x2 + 5, y2 + 5, fill="green", tags=device.name)
-                    # Draw a line representing the connection
-                    self.canvas.create_line(x1, y1, x2, y2, fill="green", tags="connection")
+            x, y = antenna.position
+            self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="red", tags=("antenna", antenna.name))
+            self.canvas.create_text(x, y + 20, text=antenna.name, tags=("antenna_text", f"text_{antenna.name}"))
+        self.load_status.set("")
+        self.refresh_scene()
+        self.refresh_signal_map()
+
+    def toggle_mobility(self):
+        """Start or stop moving the devices with the selected mobility model."""
+        if self.mobility is not None:
+            self.root.after_cancel(self.mobility_frame)
+            self.mobility = None
+            self.mobility_button.configure(text="Start Mobility")
+            return
+        bounds = (CITY_BORDER["x_min"], CITY_BORDER["y_min"], CITY_BORDER["x_max"], CITY_BORDER["y_max"])
+        name = self.mobility_model.get()
+        if name == "evacuation":
+            model = ClusterEvacuation(EVACUATION_SHELTERS, speed=WALKING_SPEED)
+        elif name == "roads":
+            model = RoadNetwork(*grid_roads(bounds, ROAD_SPACING), speed=WALKING_SPEED)
+        else:
+            model = RandomWaypoint(bounds, speed=WALKING_SPEED)
+        self.mobility = MobilityEngine(model, self.mobile_devices.xy, self.antennas.xy, self.antennas.range_radius, bounds, cell_size=25)
+        self.handovers = 0
+        self.mobility_button.configure(text="Stop Mobility")
+        self.apply_mobility_associations()
+        self.renderer.move_devices(self.mobile_devices.xy, np.arange(len(self.mobile_devices)), self.device_line_coords)
+        self.refresh_scene()
+        self.mobility_frame = self.root.after(MOBILITY_FRAME_MS, self.step_mobility)
+
+    def step_mobility(self):
+        """Advance the devices one step; only devices that may have changed antenna are re-associated."""
+        previous = self.mobile_devices.xy.copy()
+        devices, _, _ = self.mobility.tick(MOBILITY_STEP)
+        self.handovers += len(devices)
+        moved = np.flatnonzero(np.any(self.mobile_devices.xy != previous, axis=1))
+        if len(devices):
+            self.apply_mobility_associations()
+        self.renderer.move_devices(self.mobile_devices.xy, moved, self.device_line_coords)
+        self.refresh_scene()
+        minutes = int(self.mobility.time // 60)
+        self.mobility_status.set(f"{minutes // 60}:{minutes % 60:02d} h, {self.handovers} handovers")
+        self.mobility_frame = self.root.after(MOBILITY_FRAME_MS, self.step_mobility)
+
+    def antennas_changed(self):
+        if self.mobility is not None:
+            self.mobility.set_antennas(self.antennas.xy, self.antennas.range_radius)
+            self.apply_mobility_associations()
+
+    def apply_mobility_associations(self):
+        """While devices move, each one is connected to its nearest antenna in range."""
+        rows = self.mobility.antenna
+        self.mobile_devices.antenna[:] = rows
+        served = np.flatnonzero(rows >= 0)
+        self.device_links.replace(np.asarray(self.antennas.ids, dtype=np.int64)[rows[served]], served)
+
+    def path_loss_model(self):
+        return make_model(self.model_name.get(), self.frequency.get())
+
+    def toggle_signal_map(self):
+        """Show or hide the best-server SINR map."""
+        self.signal_visible = not self.signal_visible
+        if self.signal_visible:
+            self.refresh_signal_map()
+        else:
+            self.signal_overlay.clear()
+
+    def refresh_signal_map(self):
+        if self.signal_visible:
+            self.signal.set_model(self.path_loss_model())
+            self.signal_overlay.show_sinr(self.signal.grid, self.signal.sinr_db())
+
+    def apply_connections(self, result):
+        """Install freshly computed connections, skipping antennas deleted in the meantime."""
+        pair_ids, device_idx, link_first, link_second, load = result
+        current_ids = np.asarray(self.antennas.ids, dtype=np.int64)
+        keep = np.isin(pair_ids, current_ids)
+        pair_ids, device_idx = pair_ids[keep], device_idx[keep]
+        keep = np.isin(link_first, current_ids) & np.isin(link_second, current_ids)
+        link_first, link_second = link_first[keep], link_second[keep]
+
+        # Connect mobile devices to antennas; each device keeps the last antenna covering it
+        device_antenna = self.mobile_devices.antenna
+        device_antenna[:] = -1
+        device_antenna[device_idx] = self.antennas.rows_of(pair_ids)
+        self.device_links.replace(pair_ids, device_idx)
 
         # Connect antennas to each other
-        for i, antenna1 in enumerate(self.antennas):
-            for antenna2 in self.antennas[i+1:]:
-                if antenna1.is_antenna_within_range(antenna2):
-                    antenna1.connect_antenna(antenna2)
-                    x1, y1 = antenna1.position
-                    x2, y2 = antenna2.position
-                    # Draw a line between connected antennas
-                    self.canvas.create_line(x1, y1, x2, y2, fill="red", dash=(4, 2), tags="connection")
+        for linked in self.antennas.links:
+            linked.clear()
+        for i, j in zip(self.antennas.rows_of(link_first).tolist(), self.antennas.rows_of(link_second).tolist()):
+            self.antennas[i].attach_antenna(self.antennas[j])
+        self.antenna_links.replace(link_first, link_second)
+
+        self.show_load(load)
+        self.refresh_scene()
+
+    def show_load(self, load):
+        """Outline full antennas and report how many devices found no room."""
+        subscribers = np.bincount(self.mobile_devices.antenna[self.mobile_devices.antenna >= 0], minlength=len(self.antennas))
+        for antenna, count in zip(self.antennas, subscribers.tolist()):
+            full = load is not None and count >= load.max_devices[0]
+            self.canvas.itemconfig(antenna.name, outline="black", width=3 if full else 1)
+        if load is None:
+            self.load_status.set("")
+            return
+        full = np.count_nonzero(subscribers >= load.max_devices[0])
+        self.load_status.set(f"{len(load.dropped)} devices dropped, {full}/{len(self.antennas)} antennas full")
+
+    def refresh_scene(self):
+        """Bring the canvas in line with the devices and associations; only changes touch the canvas."""
+        _, covered_idx = self.device_links.pairs()
+        covered = np.zeros(len(self.mobile_devices), dtype=bool)
+        covered[covered_idx] = True
+        # Connected devices are green, the rest blue
+        self.renderer.update_devices(self.mobile_devices.xy, covered, self.mobile_devices.name)
+        self.renderer.sync_device_lines(self.device_links.keys, self.device_line_coords)
+        self.renderer.sync_antenna_lines(self.antenna_links.keys, self.antenna_line_coords)
+
+    def device_line_coords(self, keys):
+        antenna_ids, device_idx = split_keys(keys)
+        return np.hstack([self.antennas.xy[self.antennas.rows_of(antenna_ids)], self.mobile_devices.xy[device_idx]])
+
+    def antenna_line_coords(self, keys):
+        first, second = split_keys(keys)
+        return np.hstack([self.antennas.xy[self.antennas.rows_of(first)], self.antennas.xy[self.antennas.rows_of(second)]])
 
     def is_within_city_border(self, position):
         """Check if the position is within the predefined city border."""
-        x, y = position
-        return CITY_BORDER["x_min"] <= x <= CITY_BORDER["x_max"] and CITY_BORDER["y_min"] <= y <= CITY_BORDER["y_max"]
+        return within_city_border(position)
 
 if __name__ == "__main__":
+    telemetry.configure(sink="console")
     root = tk.Tk()
     app = NetworkSimulationApp(root)
     root.mainloop()
\ No newline at end of file
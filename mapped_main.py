@@ -1,68 +1,62 @@
+import os
+import tempfile
 import tkinter as tk
 from tkinter import ttk
-import random
-import math
-import json
-from shapely.geometry import Point, Polygon
+import numpy as np
+from association import AssociationSet, split_keys
+from background import BackgroundRunner
+from capacity import assign_with_capacity
+from coverage import compute_connections
+from entities import AntennaStore, DeviceStore
+from geometry import ProvinceIndex
+from mobility import ClusterEvacuation, MobilityEngine, RandomWaypoint, RoadNetwork, grid_roads
+from placement import grid_sites, kmeans_sites, place_antennas
+from propagation import MODELS, RasterGrid, SignalMap, make_model
+from rendering import RasterOverlay, SceneRenderer
+from tiles import TiledSignalMap
+import telemetry
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 # Fixed GeoJSON file path
 GEOJSON_FILE_PATH = "data/turkey-admin-level-4.geojson"
-
-class Antenna:
-    def __init__(self, name, position, range_radius, antenna_range):
-        self.name = name
-        self.position = position
-        self.range_radius = range_radius  # Mobile device range
-        self.antenna_range = antenna_range  # Antenna-to-antenna range
-        self.connected_devices = []
-        self.connected_antennas = []
-
-    def is_within_range(self, device):
-        x1, y1 = self.position
-        x2, y2 = device.position
-        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        return distance <= self.range_radius
-
-    def is_antenna_within_range(self, other_antenna):
-        x1, y1 = self.position
-        x2, y2 = other_antenna.position
-        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        return distance <= self.antenna_range
-
-    def connect_device(self, device):
-        if self.is_within_range(device):
-            self.connected_devices.append(device)
-            device.connected_antenna = self
-
-    def connect_antenna(self, other_antenna):
-        if self.is_antenna_within_range(other_antenna):
-            self.connected_antennas.append(other_antenna)
-
-class MobileDevice:
-    def __init__(self, name, position):
-        self.name = name
-        self.position = position
-        self.connected_antenna = None
+CITY_NAME = "Ankara"  # Change to your desired city name
+SIGNAL_CELL_SIZE = 4  # Canvas units per signal raster cell
+MOBILITY_MODELS = ("random_waypoint", "evacuation", "roads")
+MOBILITY_STEP = 60  # Simulated seconds per animation frame
+MOBILITY_FRAME_MS = 100
+WALKING_SPEED = (0.8, 1.6)  # Metres per second
+COUNTRY_BOUNDS = (25.6, 35.8, 44.9, 42.2)  # Turkey as (min lon, min lat, max lon, max lat)
+COUNTRY_CELL_M = 25  # Finest cell of the country-wide raster
+COUNTRY_TILE_DIR = os.path.join(tempfile.gettempdir(), "network-simulation-tiles")  # Each map takes a subdirectory
+COUNTRY_VIEW_SIZE = (800, 500)
 
 class NetworkSimulationApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Network Simulation")
-        self.antennas = []
-        self.mobile_devices = []
+        self.antennas = AntennaStore()
+        self.mobile_devices = DeviceStore(self.antennas)
         self.city_polygon = None
+        self.city_geometry = None
+        self.provinces = None  # ProvinceIndex over every province in the GeoJSON
+        self.device_links = AssociationSet()  # (antenna id, device index) pairs
         self.create_widgets()
+        self.renderer = SceneRenderer(self.canvas)
+        self.signal = None  # SignalMap over the city, built once the border is loaded
+        self.signal_overlay = RasterOverlay(self.canvas)
+        self.signal_visible = False
+        self.country_signal = None  # TiledSignalMap over the whole country, created on first use
+        self.country_window = None
+        self.mobility = None
+        self.mobility_frame = None
+        self.handovers = 0
+        self.runner = BackgroundRunner(self.root, progressbar=self.progress)
         self.load_city_border()
     
-    def get_city_names(geojson_data):
-        """Extract and sort city names from GeoJSON data."""
-        return sorted(
-            feature["properties"]["name"]
-            for feature in geojson_data.get("features", [])
-            if "name" in feature["properties"]
-    )
+    def get_city_names(self):
+        """Sorted names of every province in the GeoJSON (empty until it has loaded)."""
+        return self.provinces.sorted_names if self.provinces is not None else []
     
     def create_widgets(self):
         control_frame = ttk.Frame(self.root, padding="10")
@@ -78,6 +72,41 @@ class NetworkSimulationApp:
 
         ttk.Button(control_frame, text="Add Mobile Devices", command=self.add_mobile_devices).grid(row=2, column=0, columnspan=2)
         ttk.Button(control_frame, text="Show Connections", command=self.show_connections).grid(row=3, column=0, columnspan=2)
+        self.progress = ttk.Progressbar(control_frame, length=200, maximum=100)
+        self.progress.grid(row=4, column=0, columnspan=2)
+
+        self.use_path_loss = tk.BooleanVar(value=False)  # Off: coverage stays the range disk set by "Antenna Range"
+        ttk.Checkbutton(control_frame, text="Path-loss coverage", variable=self.use_path_loss).grid(row=0, column=2, columnspan=2, sticky=tk.W, padx=(20, 0))
+        ttk.Label(control_frame, text="Model:").grid(row=1, column=2, sticky=tk.W, padx=(20, 0))
+        self.model_name = tk.StringVar(value="okumura_hata")
+        ttk.Combobox(control_frame, textvariable=self.model_name, values=list(MODELS), state="readonly").grid(row=1, column=3, sticky=(tk.W, tk.E))
+        ttk.Label(control_frame, text="Power (dBm):").grid(row=2, column=2, sticky=tk.W, padx=(20, 0))
+        self.antenna_power = tk.DoubleVar(value=43)
+        ttk.Entry(control_frame, textvariable=self.antenna_power).grid(row=2, column=3, sticky=(tk.W, tk.E))
+        ttk.Label(control_frame, text="Frequency (MHz):").grid(row=3, column=2, sticky=tk.W, padx=(20, 0))
+        self.frequency = tk.DoubleVar(value=900)
+        ttk.Entry(control_frame, textvariable=self.frequency).grid(row=3, column=3, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Signal Map", command=self.toggle_signal_map).grid(row=4, column=2)
+        ttk.Button(control_frame, text="Country Map", command=self.open_country_map).grid(row=4, column=3)
+
+        ttk.Label(control_frame, text="Antennas to Place:").grid(row=5, column=0, sticky=tk.W)
+        self.antennas_to_place = tk.IntVar(value=5)
+        ttk.Entry(control_frame, textvariable=self.antennas_to_place).grid(row=5, column=1, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Optimize Placement", command=self.optimize_placement).grid(row=6, column=0, columnspan=2)
+
+        ttk.Label(control_frame, text="Mobility:").grid(row=5, column=2, sticky=tk.W, padx=(20, 0))
+        self.mobility_model = tk.StringVar(value="random_waypoint")
+        ttk.Combobox(control_frame, textvariable=self.mobility_model, values=MOBILITY_MODELS, state="readonly").grid(row=5, column=3, sticky=(tk.W, tk.E))
+        self.mobility_button = ttk.Button(control_frame, text="Start Mobility", command=self.toggle_mobility)
+        self.mobility_button.grid(row=6, column=2)
+        self.mobility_status = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.mobility_status).grid(row=6, column=3, sticky=tk.W)
+
+        ttk.Label(control_frame, text="Max Devices / Antenna:").grid(row=7, column=0, sticky=tk.W)
+        self.max_devices = tk.IntVar(value=0)  # 0 admits every device in range
+        ttk.Entry(control_frame, textvariable=self.max_devices).grid(row=7, column=1, sticky=(tk.W, tk.E))
+        self.load_status = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.load_status).grid(row=7, column=2, columnspan=2, sticky=tk.W, padx=(20, 0))
 
         self.canvas = tk.Canvas(self.root, width=800, height=600, bg="white")
         self.canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -86,135 +115,373 @@ class NetworkSimulationApp:
         self.canvas.bind("<Button-3>", self.delete_antenna_on_click)
 
     def load_city_border(self):
-        try:
-            with open(GEOJSON_FILE_PATH, 'r', encoding='utf-8') as f:
-                geojson_data = json.load(f)
-            for feature in geojson_data["features"]:
-                if feature["properties"]["name"] == "Ankara":  # Change to your desired city name
-                    coordinates = feature["geometry"]["coordinates"][0]
-                    self.city_polygon = Polygon(coordinates)
-                    self.draw_city_border(coordinates)
-                    break
-        except FileNotFoundError:
+        # Parsing the GeoJSON and indexing the provinces can take a while the first time,
+        # so it runs in the background
+        self.runner.submit(
+            "city", lambda job: ProvinceIndex.load(GEOJSON_FILE_PATH), self.on_city_loaded,
+            on_error=self.on_city_load_error,
+        )
+
+    def on_city_load_error(self, error):
+        if isinstance(error, FileNotFoundError):
             print(f"Error: GeoJSON file not found at {GEOJSON_FILE_PATH}")
+        else:
+            print(f"Error: could not load city border: {error}")
+
+    def on_city_loaded(self, provinces):
+        self.provinces = provinces
+        self.city_geometry = provinces.city(CITY_NAME)
+        if self.city_geometry:
+            self.city_polygon = self.city_geometry.polygon
+            self.draw_city_border()
+            self.build_signal_map()
+            self.canvas.bind("<Configure>", self.on_canvas_resize)
+
+    def on_canvas_resize(self, event):
+        # The geo <-> canvas transform only changes when the canvas does
+        try:
+            transform = self.city_geometry.transform
+            if transform is not self.city_geometry.fit_canvas(event.width, event.height):
+                self.build_signal_map()
+        except ValueError as e:
+            print(f"Error: {e}")
+
+    def build_signal_map(self):
+        """Lay a raster over the city's canvas bounding box; cells outside the polygon are masked."""
+        transform = self.city_geometry.transform
+        if transform is None:
+            return
+        grid = RasterGrid(*self.city_canvas_box(), SIGNAL_CELL_SIZE, transform.metres_per_unit,
+                          contains=self.city_geometry.contains_canvas_points)
+        if self.signal is None:
+            self.signal = SignalMap(grid, self.path_loss_model())
+        else:
+            self.signal.set_grid(grid)
+        self.refresh_signal_map()
+
+    def city_canvas_box(self):
+        """The city's bounding box on the canvas as (x_min, y_min, x_max, y_max)."""
+        min_lon, min_lat, max_lon, max_lat = self.city_geometry.bounds
+        x_min, y_max = self.city_geometry.transform.to_canvas(min_lon, min_lat)
+        x_max, y_min = self.city_geometry.transform.to_canvas(max_lon, max_lat)
+        return x_min, y_min, x_max, y_max
+
+    def path_loss_model(self):
+        return make_model(self.model_name.get(), self.frequency.get())
+
+    def toggle_signal_map(self):
+        self.signal_visible = not self.signal_visible
+        if self.signal_visible:
+            self.refresh_signal_map()
+        else:
+            self.signal_overlay.clear()
+
+    def refresh_signal_map(self):
+        if self.signal_visible and self.signal is not None:
+            self.signal.set_model(self.path_loss_model())
+            self.signal_overlay.show_sinr(self.signal.grid, self.signal.sinr_db())
+
+    def open_country_map(self):
+        """Show coverage over the whole country in its own window; the mouse wheel zooms and dragging pans.
+
+        The raster is tiled and cached on disk, so only the tiles under the
+        view are computed, at the level of detail matching the zoom.
+        """
+        if self.country_window is not None:
+            self.country_window.lift()
+            return
+        if self.country_signal is None:
+            # Cells outside every province (sea, neighbouring countries) get no signal
+            contains = (lambda lons, lats: self.provinces.locate(lons, lats) >= 0) if self.provinces else None
+            self.country_signal = TiledSignalMap(COUNTRY_BOUNDS, self.path_loss_model(), COUNTRY_TILE_DIR,
+                                                 COUNTRY_CELL_M, contains=contains)
+            if self.city_geometry is not None and self.city_geometry.transform is not None:
+                lons, lats = self.city_geometry.transform.to_geo(self.antennas.xy[:, 0], self.antennas.xy[:, 1])
+                for antenna_id, lon, lat in zip(self.antennas.ids, lons.tolist(), lats.tolist()):
+                    self.country_signal.set_antenna(antenna_id, lon, lat, self.antenna_power.get())
+
+        width, height = COUNTRY_VIEW_SIZE
+        self.country_window = tk.Toplevel(self.root)
+        self.country_window.protocol("WM_DELETE_WINDOW", self.close_country_map)
+        self.country_canvas = tk.Canvas(self.country_window, width=width, height=height, bg="white")
+        self.country_canvas.grid(row=0, column=0)
+        self.country_overlay = RasterOverlay(self.country_canvas)
+        self.country_canvas.bind("<MouseWheel>", lambda event: self.zoom_country_map(event, 0.5 if event.delta > 0 else 2))
+        self.country_canvas.bind("<Button-4>", lambda event: self.zoom_country_map(event, 0.5))
+        self.country_canvas.bind("<Button-5>", lambda event: self.zoom_country_map(event, 2))
+        self.country_canvas.bind("<ButtonPress-1>", self.start_country_pan)
+        self.country_canvas.bind("<B1-Motion>", self.pan_country_map)
+
+        # The view is a centre in projected metres and a scale, so pixels stay square
+        tiled = self.country_signal
+        self.country_view = [tiled.width_m / 2, tiled.height_m / 2, max(tiled.width_m / width, tiled.height_m / height)]
+        self.refresh_country_map()
+
+    def close_country_map(self):
+        self.country_window.destroy()
+        self.country_window = None
+        # The tiles are cheap to recompute, so free their scratch files rather than keep them for next time
+        self.runner.cancel("country_map")
+        self.country_signal.close()
+        self.country_signal = None
+
+    def zoom_country_map(self, event, factor):
+        """Zoom by `factor` (metres per pixel), keeping the point under the cursor in place."""
+        width, height = COUNTRY_VIEW_SIZE
+        x, y, scale = self.country_view
+        cursor_x = x + (event.x - width / 2) * scale
+        cursor_y = y + (event.y - height / 2) * scale
+        self.country_view = [cursor_x + (x - cursor_x) * factor, cursor_y + (y - cursor_y) * factor, scale * factor]
+        self.refresh_country_map()
+
+    def start_country_pan(self, event):
+        self.country_pan = (event.x, event.y)
+
+    def pan_country_map(self, event):
+        x, y, scale = self.country_view
+        self.country_view = [x - (event.x - self.country_pan[0]) * scale, y - (event.y - self.country_pan[1]) * scale, scale]
+        self.country_pan = (event.x, event.y)
+        self.refresh_country_map()
+
+    def refresh_country_map(self):
+        if self.country_window is None:
+            return
+        self.country_signal.set_model(self.path_loss_model())
+        width, height = COUNTRY_VIEW_SIZE
+        x, y, scale = self.country_view
+        min_lon, max_lat = self.country_signal.unproject(x - width / 2 * scale, y - height / 2 * scale)
+        max_lon, min_lat = self.country_signal.unproject(x + width / 2 * scale, y + height / 2 * scale)
+        tiled = self.country_signal
+        self.runner.submit(
+            "country_map", lambda job: tiled.viewport(min_lon, min_lat, max_lon, max_lat, width, height),
+            self.show_country_map,
+        )
 
-    def draw_city_border(self, coordinates):
-        lons, lats = zip(*coordinates)
+    def show_country_map(self, result):
+        if self.country_window is None:
+            return
+        level, _, sinr, _ = result
+        width, height = COUNTRY_VIEW_SIZE
+        self.country_overlay.show_sinr(RasterGrid(0, 0, width, height, 1), sinr)
+        cell_m = self.country_signal.levels[level].cell_m
+        self.country_window.title(f"Coverage - {self.country_view[2]:.0f} m per pixel, {cell_m:.0f} m cells")
 
+    def draw_city_border(self):
         # Get the canvas dimensions
         self.canvas.update()  # Ensure the canvas dimensions are updated
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
 
-        # Calculate the bounding box of the city's coordinates
-        min_lon, max_lon = min(lons), max(lons)
-        min_lat, max_lat = min(lats), max(lats)
-
-        # Calculate scaling factors for the map to fit within the canvas
-        lon_range = max_lon - min_lon
-        lat_range = max_lat - min_lat
-
-        if lon_range == 0 or lat_range == 0:
-            print("Error: Invalid city boundary coordinates.")
+        try:
+            self.city_geometry.fit_canvas(canvas_width, canvas_height)
+        except ValueError as e:
+            print(f"Error: {e}")
             return
 
-        scale_factor = min(
-            (canvas_width - 20) / lon_range,  # 20 pixels padding on width
-            (canvas_height - 20) / lat_range  # 20 pixels padding on height
-        )
-
-        # Calculate offsets to center the map on the canvas
-        x_offset = (canvas_width - lon_range * scale_factor) / 2
-        y_offset = (canvas_height - lat_range * scale_factor) / 2
-
-        # Transform and scale the coordinates to fit on the canvas
-        scaled_coords = [
-            (
-                (lon - min_lon) * scale_factor + x_offset,
-                canvas_height - ((lat - min_lat) * scale_factor + y_offset)
-            )
-            for lon, lat in coordinates
-        ]
-
         # Draw the city border
-        self.canvas.create_polygon(scaled_coords, outline="blue", fill="", width=2)
-
-        # Debugging: print scaled coordinates to check values
-        print(f"Scaled coordinates: {scaled_coords}")
-        print(f"Canvas size: {canvas_width}x{canvas_height}")
-        print(f"Scale factor: {scale_factor}, Offsets: ({x_offset}, {y_offset})")
-
+        self.canvas.create_polygon(self.city_geometry.canvas_coordinates(), outline="blue", fill="", width=2)
 
     def is_within_city_border(self, position):
-        if self.city_polygon:
-            # Transform canvas coordinates back to original longitude/latitude
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-
-            lons, lats = zip(*list(self.city_polygon.exterior.coords))
-            min_lon, max_lon = min(lons), max(lons)
-            min_lat, max_lat = min(lats), max(lats)
-
-            lon_range = max_lon - min_lon
-            lat_range = max_lat - min_lat
-
-            scale_factor = min(
-                (canvas_width - 20) / lon_range,  # 20 pixels padding on width
-                (canvas_height - 20) / lat_range  # 20 pixels padding on height
-            )
-
-            x_offset = (canvas_width - lon_range * scale_factor) / 2
-            y_offset = (canvas_height - lat_range * scale_factor) / 2
-
-            # Reverse transformation from canvas to geo-coordinates
-            geo_x = (position[0] - x_offset) / scale_factor + min_lon
-            geo_y = (canvas_height - position[1] - y_offset) / scale_factor + min_lat
-
-            # Check if the point is inside the polygon
-            point = Point(geo_x, geo_y)
-            return self.city_polygon.contains(point)
+        if self.city_geometry and self.city_geometry.transform:
+            return self.city_geometry.contains_canvas_point(position[0], position[1])
 
         return False
 
-
     def add_antenna_on_click(self, event):
-        position = (event.x, event.y)
+        self.add_antenna_at((event.x, event.y))
+
+    def add_antenna_at(self, position):
         if self.is_within_city_border(position):
+            x, y = position
             antenna_name = f"Antenna-{len(self.antennas) + 1}"
-            antenna = Antenna(antenna_name, position, self.antenna_range.get(), self.antenna_to_antenna_range.get())
-            self.antennas.append(antenna)
-            self.canvas.create_oval(event.x - 10, event.y - 10, event.x + 10, event.y + 10, fill="red", tags=antenna_name)
-            self.canvas.create_text(event.x, event.y + 20, text=antenna_name)
+            antenna = self.antennas.add(antenna_name, position, self.antenna_range.get(), self.antenna_to_antenna_range.get())
+            self.signal.set_antenna(antenna.id, position, self.antenna_power.get())
+            if self.country_signal is not None:
+                self.country_signal.set_antenna(antenna.id, *self.city_geometry.transform.to_geo(x, y), self.antenna_power.get())
+                self.refresh_country_map()
+            self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="red", tags=antenna_name)
+            self.canvas.create_text(x, y + 20, text=antenna_name)
+            self.antennas_changed()
+            self.refresh_signal_map()
 
     def delete_antenna_on_click(self, event):
         for antenna in self.antennas:
             x, y = antenna.position
             if (x - 10 <= event.x <= x + 10) and (y - 10 <= event.y <= y + 10):
+                antenna_id, antenna_name = antenna.id, antenna.name  # The view cannot be read once removed
                 self.antennas.remove(antenna)
-                self.canvas.delete(antenna.name)
+                self.canvas.delete(antenna_name)
+                self.signal.remove_antenna(antenna_id)
+                if self.country_signal is not None:
+                    self.country_signal.remove_antenna(antenna_id)
+                    self.refresh_country_map()
+                self.device_links.discard(antenna_id)
+                self.antennas_changed()
+                self.refresh_scene()
+                self.refresh_signal_map()
                 break
 
     def add_mobile_devices(self):
-        for _ in range(30):
-            x = random.randint(50, 750)
-            y = random.randint(50, 550)
-            if self.is_within_city_border((x, y)):
-                device_name = f"Device-{len(self.mobile_devices) + 1}"
-                device = MobileDevice(device_name, (x, y))
-                self.mobile_devices.append(device)
-                self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="blue", tags=device_name)
+        if not (self.city_geometry and self.city_geometry.transform):
+            return
+        num_devices = 30
+        self.runner.submit(
+            None, lambda job: self.city_geometry.sample_canvas_points(num_devices, box=(50, 50, 750, 550)),
+            self.add_devices_at,
+        )
+
+    def add_devices_at(self, points):
+        self.mobile_devices.add_many(points)
+        if self.mobility is not None:
+            self.mobility.set_devices(self.mobile_devices.xy)
+            self.apply_mobility_associations()
+        self.refresh_scene()
+
+    def toggle_mobility(self):
+        if self.mobility is not None:
+            self.root.after_cancel(self.mobility_frame)
+            self.mobility = None
+            self.mobility_button.configure(text="Start Mobility")
+            return
+        if not (self.city_geometry and self.city_geometry.transform):
+            return
+        bounds = self.city_canvas_box()
+        speed = tuple(v / self.city_geometry.transform.metres_per_unit for v in WALKING_SPEED)
+        name = self.mobility_model.get()
+        if name == "evacuation":
+            # Shelters at random spots inside the city
+            model = ClusterEvacuation(self.city_geometry.sample_canvas_points(5), speed=speed)
+        elif name == "roads":
+            model = RoadNetwork(*grid_roads(bounds, 20), speed=speed)
+        else:
+            model = RandomWaypoint(bounds, speed=speed, sample_targets=self.city_geometry.sample_canvas_points)
+        self.mobility = MobilityEngine(model, self.mobile_devices.xy, self.antennas.xy, self.antennas.range_radius, bounds, cell_size=10)
+        self.handovers = 0
+        self.mobility_button.configure(text="Stop Mobility")
+        self.apply_mobility_associations()
+        self.renderer.move_devices(self.mobile_devices.xy, np.arange(len(self.mobile_devices)), self.device_line_coords)
+        self.refresh_scene()
+        self.mobility_frame = self.root.after(MOBILITY_FRAME_MS, self.step_mobility)
+
+    def step_mobility(self):
+        previous = self.mobile_devices.xy.copy()
+        devices, _, _ = self.mobility.tick(MOBILITY_STEP)
+        self.handovers += len(devices)
+        moved = np.flatnonzero(np.any(self.mobile_devices.xy != previous, axis=1))
+        if len(devices):
+            self.apply_mobility_associations()
+        self.renderer.move_devices(self.mobile_devices.xy, moved, self.device_line_coords)
+        self.refresh_scene()
+        minutes = int(self.mobility.time // 60)
+        self.mobility_status.set(f"{minutes // 60}:{minutes % 60:02d} h, {self.handovers} handovers")
+        self.mobility_frame = self.root.after(MOBILITY_FRAME_MS, self.step_mobility)
+
+    def antennas_changed(self):
+        if self.mobility is not None:
+            self.mobility.set_antennas(self.antennas.xy, self.antennas.range_radius)
+            self.apply_mobility_associations()
+
+    def apply_mobility_associations(self):
+        # While devices move, each one is connected to its nearest antenna in range
+        rows = self.mobility.antenna
+        self.mobile_devices.antenna[:] = rows
+        served = np.flatnonzero(rows >= 0)
+        self.device_links.replace(np.asarray(self.antennas.ids, dtype=np.int64)[rows[served]], served)
+
+    def optimize_placement(self):
+        if not (self.city_geometry and self.city_geometry.transform):
+            return
+        self.runner.submit(
+            "placement", self.compute_placement, self.apply_placement,
+            self.mobile_devices.xy.copy(), self.antennas.xy.copy(), self.antennas_to_place.get(),
+            self.antenna_range.get(), self.antenna_to_antenna_range.get(),
+        )
+
+    def compute_placement(self, job, device_xy, existing_xy, count, range_radius, link_range):
+        # Candidates: a lattice over the city polygon plus k-means centres of the devices
+        candidates = np.concatenate([
+            grid_sites(*self.city_canvas_box(), range_radius / 2, contains=self.city_geometry.contains_canvas_points),
+            kmeans_sites(device_xy, 4 * count, seed=0),
+        ])
+        job.check()
+        positions, _ = place_antennas(device_xy, count, range_radius, link_range, candidates, existing_xy, job.report)
+        return positions
+
+    def apply_placement(self, positions):
+        for x, y in positions.tolist():
+            self.add_antenna_at((x, y))
+        self.show_connections()
 
     def show_connections(self):
-        self.canvas.delete("connection")
-        for antenna in self.antennas:
-            for device in self.mobile_devices:
-                if antenna.is_within_range(device):
-                    antenna.connect_device(device)
-                    x1, y1 = antenna.position
-                    x2, y2 = device.position
-                    self.canvas.create_line(x1, y1, x2, y2, fill="green", tags="connection")
+        signal = None
+        if self.use_path_loss.get() and self.signal is not None:
+            self.signal.set_model(self.path_loss_model())
+            signal = self.signal.snapshot()
+        self.runner.submit(
+            "connections", self.compute_connections, self.apply_connections,
+            np.asarray(self.antennas.ids, dtype=np.int64), self.antennas.xy.copy(),
+            self.antennas.range_radius.copy(), self.mobile_devices.xy.copy(), signal, self.max_devices.get(),
+        )
+
+    @staticmethod
+    def compute_connections(job, antenna_ids, antenna_xy, ranges, device_xy, signal=None, max_devices=0):
+        # With a signal map each device attaches to its best server, otherwise to every antenna in range
+        if signal is not None and not max_devices:
+            return signal.serving(device_xy) + (None,)
+        if signal is not None:
+            pair_ids, device_idx, score = signal.candidates(device_xy)
+            sorter = np.argsort(antenna_ids)
+            antenna_idx = sorter[np.searchsorted(antenna_ids, pair_ids, sorter=sorter)]
+        else:
+            antenna_idx, device_idx, _, _ = compute_connections(antenna_xy, ranges, None, device_xy, job.report)
+            if not max_devices:
+                return antenna_ids[antenna_idx], device_idx, None
+            delta = antenna_xy[antenna_idx] - device_xy[device_idx]
+            score = -np.einsum("ij,ij->i", delta, delta)
+        # Full antennas pass their weakest devices on to the next-best antenna
+        job.check()
+        load = assign_with_capacity(antenna_idx, device_idx, score, len(antenna_ids), len(device_xy), max_devices=max_devices)
+        antenna_idx, device_idx = load.pairs()
+        return antenna_ids[antenna_idx], device_idx, load
+
+    def apply_connections(self, result):
+        pair_ids, device_idx, load = result
+        keep = np.isin(pair_ids, np.asarray(self.antennas.ids, dtype=np.int64))
+        pair_ids, device_idx = pair_ids[keep], device_idx[keep]
+        device_antenna = self.mobile_devices.antenna
+        device_antenna[:] = -1
+        device_antenna[device_idx] = self.antennas.rows_of(pair_ids)
+        self.device_links.replace(pair_ids, device_idx)
+        self.show_load(load)
+        self.refresh_scene()
+
+    def show_load(self, load):
+        """Outline full antennas and report how many devices found no room."""
+        subscribers = np.bincount(self.mobile_devices.antenna[self.mobile_devices.antenna >= 0], minlength=len(self.antennas))
+        for antenna, count in zip(self.antennas, subscribers.tolist()):
+            full = load is not None and count >= load.max_devices[0]
+            self.canvas.itemconfig(antenna.name, outline="black", width=3 if full else 1)
+        if load is None:
+            self.load_status.set("")
+            return
+        full = np.count_nonzero(subscribers >= load.max_devices[0])
+        self.load_status.set(f"{len(load.dropped)} devices dropped, {full}/{len(self.antennas)} antennas full")
+
+    def refresh_scene(self):
+        _, covered_idx = self.device_links.pairs()
+        covered = np.zeros(len(self.mobile_devices), dtype=bool)
+        covered[covered_idx] = True
+        self.renderer.update_devices(self.mobile_devices.xy, covered, self.mobile_devices.name)
+        self.renderer.sync_device_lines(self.device_links.keys, self.device_line_coords)
+
+    def device_line_coords(self, keys):
+        antenna_ids, device_idx = split_keys(keys)
+        return np.hstack([self.antennas.xy[self.antennas.rows_of(antenna_ids)], self.mobile_devices.xy[device_idx]])
 
 if __name__ == "__main__":
+    telemetry.configure(sink="console")
     root = tk.Tk()
     app = NetworkSimulationApp(root)
     root.mainloop()
+    if app.country_signal is not None:
+        app.country_signal.close()
@@ -0,0 +1,375 @@
+import math
+
+import numpy as np
+
+from coverage import CoverageEngine
+
+
+def _nearest(points, targets, chunk=16384):
+    """Index of the nearest target for each point, computed in chunks of points."""
+    nearest = np.empty(len(points), dtype=np.intp)
+    for start in range(0, len(points), chunk):
+        delta = points[start:start + chunk, None, :] - targets[None, :, :]
+        nearest[start:start + chunk] = np.einsum("ijk,ijk->ij", delta, delta).argmin(axis=1)
+    return nearest
+
+
+def _advance(xy, target, travel):
+    """Move points towards their targets by `travel`; return the mask of points that arrived."""
+    delta = target - xy
+    dist = np.hypot(delta[:, 0], delta[:, 1])
+    arrived = travel >= dist
+    step = np.divide(travel, dist, out=np.zeros_like(dist), where=dist > 0)
+    xy += delta * step[:, None]
+    xy[arrived] = target[arrived]
+    return arrived
+
+
+class RandomWaypoint:
+    """Each device walks to a random target at a random speed, pauses, and picks a new target.
+
+    Targets are uniform in `bounds` = (x_min, y_min, x_max, y_max) unless
+    `sample_targets(count, rng)` is given, e.g. to keep them inside a city
+    polygon. Speeds are in units per second.
+    """
+
+    def __init__(self, bounds, speed=(0.5, 1.5), pause=(0.0, 60.0), sample_targets=None, seed=None):
+        self.bounds = bounds
+        self.speed_range = speed
+        self.pause_range = pause
+        self.sample_targets = sample_targets
+        self.rng = np.random.default_rng(seed)
+
+    def _targets(self, count):
+        if self.sample_targets is not None:
+            return np.asarray(self.sample_targets(count, self.rng), dtype=np.float64).reshape(-1, 2)
+        x_min, y_min, x_max, y_max = self.bounds
+        return self.rng.uniform((x_min, y_min), (x_max, y_max), size=(count, 2))
+
+    def start(self, xy):
+        count = len(xy)
+        self.target = self._targets(count)
+        self.speed = self.rng.uniform(*self.speed_range, size=count)
+        self.pause = np.zeros(count)
+
+    def step(self, xy, dt):
+        paused = self.pause > 0
+        self.pause[paused] -= dt
+        moving = np.flatnonzero(~paused)
+        moved = xy[moving]
+        arrived = moving[_advance(moved, self.target[moving], self.speed[moving] * dt)]
+        xy[moving] = moved
+        if len(arrived):
+            self.pause[arrived] = self.rng.uniform(*self.pause_range, size=len(arrived))
+            self.target[arrived] = self._targets(len(arrived))
+            self.speed[arrived] = self.rng.uniform(*self.speed_range, size=len(arrived))
+
+
+class ClusterEvacuation:
+    """Devices leave for the nearest shelter after a random delay and settle around it.
+
+    Each device picks the shelter closest to where it starts and a spot
+    within `spread` of it, leaves after a delay drawn from `departure`
+    (seconds) and stays once it arrives.
+    """
+
+    def __init__(self, shelters, speed=(0.8, 1.6), spread=20.0, departure=(0.0, 600.0), seed=None):
+        self.shelters = np.asarray(shelters, dtype=np.float64).reshape(-1, 2)
+        self.speed_range = speed
+        self.spread = spread
+        self.departure_range = departure
+        self.rng = np.random.default_rng(seed)
+
+    def start(self, xy):
+        count = len(xy)
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        radius = self.spread * np.sqrt(self.rng.uniform(0, 1, count))
+        self.target = self.shelters[_nearest(xy, self.shelters)] + np.column_stack([np.cos(angle), np.sin(angle)]) * radius[:, None]
+        self.speed = self.rng.uniform(*self.speed_range, size=count)
+        self.delay = self.rng.uniform(*self.departure_range, size=count)
+        self.walking = np.ones(count, dtype=bool)
+
+    def step(self, xy, dt):
+        self.delay -= dt
+        moving = np.flatnonzero(self.walking & (self.delay <= 0))
+        moved = xy[moving]
+        arrived = _advance(moved, self.target[moving], self.speed[moving] * dt)
+        xy[moving] = moved
+        self.walking[moving[arrived]] = False
+
+
+class RoadNetwork:
+    """Devices follow roads: they walk along edges and turn onto a random road at every junction.
+
+    `nodes` is an (N, 2) array of junction positions and `edges` a list or
+    (E, 2) array of node index pairs; roads are two-way. Devices start at
+    the junction nearest to them.
+    """
+
+    def __init__(self, nodes, edges, speed=(0.8, 1.6), seed=None):
+        self.nodes = np.asarray(nodes, dtype=np.float64).reshape(-1, 2)
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        both = np.concatenate([edges, edges[:, ::-1]])
+        both = both[np.lexsort((both[:, 1], both[:, 0]))]
+        self.neighbours = both[:, 1]  # Adjacency in CSR form
+        self.offsets = np.searchsorted(both[:, 0], np.arange(len(self.nodes) + 1))
+        self.degree = np.diff(self.offsets)
+        self.speed_range = speed
+        self.rng = np.random.default_rng(seed)
+
+    def _turn(self, at):
+        """Pick a random road out of each junction in `at`; dead ends without roads stay put."""
+        degree = self.degree[at]
+        pick = (self.rng.uniform(0, 1, len(at)) * degree).astype(np.intp)
+        nxt = at.copy()
+        has_road = degree > 0
+        nxt[has_road] = self.neighbours[self.offsets[at[has_road]] + pick[has_road]]
+        return nxt
+
+    def start(self, xy):
+        count = len(xy)
+        self.origin = _nearest(xy, self.nodes)
+        self.destination = self._turn(self.origin)
+        self.travelled = np.zeros(count)
+        self.speed = self.rng.uniform(*self.speed_range, size=count)
+        xy[:] = self.nodes[self.origin]
+
+    def step(self, xy, dt):
+        self.travelled += self.speed * dt
+        length = np.hypot(*(self.nodes[self.destination] - self.nodes[self.origin]).T)
+        # Carry the leftover distance over the junction, possibly across several short roads
+        done = np.flatnonzero((self.travelled >= length) & (self.origin != self.destination))
+        while len(done):
+            self.travelled[done] -= length[done]
+            self.origin[done] = self.destination[done]
+            self.destination[done] = self._turn(self.origin[done])
+            length[done] = np.hypot(*(self.nodes[self.destination[done]] - self.nodes[self.origin[done]]).T)
+            done = done[(self.travelled[done] >= length[done]) & (self.origin[done] != self.destination[done])]
+        stuck = self.origin == self.destination
+        self.travelled[stuck] = 0
+        fraction = np.divide(self.travelled, length, out=np.zeros_like(length), where=length > 0)
+        start = self.nodes[self.origin]
+        xy[:] = start + (self.nodes[self.destination] - start) * fraction[:, None]
+
+
+def grid_roads(bounds, spacing):
+    """A Manhattan street grid over `bounds`: returns (nodes, edges) for RoadNetwork."""
+    x_min, y_min, x_max, y_max = bounds
+    xs = np.arange(x_min, x_max + 1e-9, spacing)
+    ys = np.arange(y_min, y_max + 1e-9, spacing)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    nodes = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+    ids = np.arange(len(nodes)).reshape(len(ys), len(xs))
+    edges = np.concatenate([
+        np.column_stack([ids[:, :-1].ravel(), ids[:, 1:].ravel()]),
+        np.column_stack([ids[:-1, :].ravel(), ids[1:, :].ravel()]),
+    ])
+    return nodes, edges
+
+
+class MobilityEngine:
+    """Moves devices with a mobility model and keeps their antenna association up to date.
+
+    Devices attach to the nearest antenna whose range covers them (-1 if
+    none), like CoverageEngine.nearest_antenna. The area is divided into
+    square cells, and each cell is classified once per antenna layout:
+    in cells that no antenna reaches, or that one antenna covers entirely
+    while being nearer than any other antenna reaching them, the
+    association is the same everywhere. A device in such a cell is only
+    re-associated when it enters another cell. All other cells lie on a
+    coverage or nearest-antenna boundary, and devices in them are
+    re-checked every tick, but only against the antennas that reach that
+    cell.
+
+    `xy` is updated in place, so it can be a view of a DeviceStore's
+    positions. `tick` returns the handovers of that tick as (devices, old
+    antenna, new antenna) arrays.
+    """
+
+    def __init__(self, model, xy, antenna_xy, ranges, bounds, cell_size=25.0):
+        self.model = model
+        self.bounds = bounds
+        self.cell_size = float(cell_size)
+        x_min, y_min, x_max, y_max = bounds
+        self.cols = max(int(math.ceil((x_max - x_min) / self.cell_size)), 1)
+        self.rows = max(int(math.ceil((y_max - y_min) / self.cell_size)), 1)
+        self.time = 0.0
+        self.checked = 0  # Devices re-associated in the last tick
+        self.set_antennas(antenna_xy, ranges, reassociate=False)
+        self.set_devices(xy)
+
+    def set_devices(self, xy):
+        """Start moving a new device array; all devices are associated from scratch."""
+        self.xy = xy
+        self.model.start(xy)
+        self.cell = self._cells(xy)
+        self.antenna = self._associate_all()
+
+    def set_antennas(self, antenna_xy, ranges, reassociate=True):
+        """Replace the antennas, reclassify the cells and (by default) re-associate every device.
+
+        Returns the handovers caused by the change.
+        """
+        self.antenna_xy = np.asarray(antenna_xy, dtype=np.float64).reshape(-1, 2)
+        self.ranges = np.broadcast_to(np.asarray(ranges, dtype=np.float64), (len(self.antenna_xy),)).copy()
+        self._classify_cells()
+        if not reassociate:
+            return self._no_handovers()
+        old = self.antenna
+        self.antenna = self._associate_all()
+        changed = np.flatnonzero(old != self.antenna)
+        return changed, old[changed], self.antenna[changed]
+
+    def tick(self, dt):
+        """Advance every device by `dt` seconds and re-associate those that may have changed antenna."""
+        self.model.step(self.xy, dt)
+        self.time += dt
+        cell = self._cells(self.xy)
+        entered = cell != self.cell
+        self.cell = cell
+
+        # Devices that entered a cell with a fixed association just take it
+        fixed = np.flatnonzero(entered & ~self.boundary[cell])
+        new_antenna = self.antenna.copy()
+        new_antenna[fixed] = self.cell_antenna[cell[fixed]]
+
+        # Devices in boundary cells (or off the grid) are checked against the antennas reaching their cell
+        boundary = np.flatnonzero(self.boundary[cell])
+        new_antenna[boundary] = self._associate(boundary)
+        self.checked = len(fixed) + len(boundary)
+
+        changed = np.flatnonzero(new_antenna != self.antenna)
+        old = self.antenna[changed]
+        self.antenna = new_antenna
+        return changed, old, new_antenna[changed]
+
+    def run(self, duration, dt, on_tick=None):
+        """Tick until `duration` seconds have passed; `on_tick(engine, handovers)` is called after each tick.
+
+        Returns the total number of handovers.
+        """
+        handovers = 0
+        for _ in range(int(math.ceil(duration / dt))):
+            changes = self.tick(dt)
+            handovers += len(changes[0])
+            if on_tick is not None:
+                on_tick(self, changes)
+        return handovers
+
+    def _no_handovers(self):
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, empty
+
+    def _cells(self, xy):
+        """Cell id of each point; points off the grid map to the extra cell `rows * cols`."""
+        x_min, y_min, _, _ = self.bounds
+        col = np.floor((xy[:, 0] - x_min) / self.cell_size).astype(np.intp)
+        row = np.floor((xy[:, 1] - y_min) / self.cell_size).astype(np.intp)
+        cell = row * self.cols + col
+        cell[(col < 0) | (col >= self.cols) | (row < 0) | (row >= self.rows)] = self.rows * self.cols
+        return cell
+
+    def _classify_cells(self):
+        """Find, per cell, the antennas reaching it and whether its association is fixed.
+
+        A cell's association is fixed when no antenna reaches it, or when one
+        antenna covers the whole cell and its farthest point is still closer
+        to that antenna than the nearest point is to any other antenna
+        reaching the cell.
+        """
+        x_min, y_min, _, _ = self.bounds
+        size = self.cell_size
+        num_cells = self.rows * self.cols
+        parts = []  # (cells, antenna, nearest d2, farthest d2) per antenna
+        for i, ((ax, ay), r) in enumerate(zip(self.antenna_xy.tolist(), self.ranges.tolist())):
+            c0 = max(int(math.floor((ax - r - x_min) / size)), 0)
+            c1 = min(int(math.floor((ax + r - x_min) / size)), self.cols - 1)
+            r0 = max(int(math.floor((ay - r - y_min) / size)), 0)
+            r1 = min(int(math.floor((ay + r - y_min) / size)), self.rows - 1)
+            if c0 > c1 or r0 > r1:
+                continue
+            cols = np.arange(c0, c1 + 1)
+            rows = np.arange(r0, r1 + 1)
+            left = x_min + cols * size
+            top = y_min + rows * size
+            near_x = np.clip(ax, left, left + size) - ax
+            near_y = np.clip(ay, top, top + size) - ay
+            far_x = np.maximum(np.abs(left - ax), np.abs(left + size - ax))
+            far_y = np.maximum(np.abs(top - ay), np.abs(top + size - ay))
+            near2 = near_y[:, None] ** 2 + near_x[None, :] ** 2
+            far2 = far_y[:, None] ** 2 + far_x[None, :] ** 2
+            reaches = near2 <= r * r
+            cell_ids = rows[:, None] * self.cols + cols[None, :]
+            parts.append((cell_ids[reaches], np.full(int(reaches.sum()), i, dtype=np.intp), near2[reaches], far2[reaches]))
+
+        if parts:
+            cells, antennas, near2, far2 = (np.concatenate(column) for column in zip(*parts))
+        else:
+            cells = antennas = np.empty(0, dtype=np.intp)
+            near2 = far2 = np.empty(0)
+        order = np.argsort(cells, kind="stable")
+        cells, antennas, near2, far2 = cells[order], antennas[order], near2[order], far2[order]
+        self.reach_antennas = antennas  # Antennas reaching each cell, in CSR form
+        self.reach_offsets = np.searchsorted(cells, np.arange(num_cells + 2))
+        reach_count = np.diff(self.reach_offsets)
+
+        # Candidate per cell: the covering antenna whose farthest point is closest
+        candidate = np.full(num_cells + 1, -1, dtype=np.intp)
+        candidate_far2 = np.full(num_cells + 1, np.inf)
+        covering = np.flatnonzero(far2 <= self.ranges[antennas] ** 2)
+        covering = covering[np.lexsort((far2[covering], cells[covering]))[::-1]]
+        candidate[cells[covering]] = antennas[covering]  # The last write per cell wins: the smallest far d2
+        candidate_far2[cells[covering]] = far2[covering]
+
+        others = antennas != candidate[cells]
+        other_near2 = np.full(num_cells + 1, np.inf)
+        np.minimum.at(other_near2, cells[others], near2[others])
+
+        # The extra last cell stands for "off the grid" and is always a boundary cell
+        fixed = (reach_count == 0) | ((candidate >= 0) & (candidate_far2 < other_near2))
+        fixed[num_cells] = False
+        self.boundary = ~fixed
+        self.cell_antenna = np.where(fixed, candidate, -1)
+
+    def _associate_all(self):
+        engine = CoverageEngine()
+        engine.set_antennas(self.antenna_xy, self.ranges)
+        engine.set_devices(self.xy)
+        return engine.nearest_antenna()
+
+    def _associate(self, devices):
+        """Nearest in-range antenna for the given devices, checking only the antennas reaching their cell."""
+        if not len(devices):
+            return np.empty(0, dtype=np.intp)
+        cell = self.cell[devices]
+        best = np.full(len(devices), -1, dtype=np.intp)
+
+        off_grid = cell == self.rows * self.cols
+        if off_grid.any():
+            engine = CoverageEngine()
+            engine.set_antennas(self.antenna_xy, self.ranges)
+            engine.set_devices(self.xy[devices[off_grid]])
+            best[off_grid] = engine.nearest_antenna()
+
+        on_grid = np.flatnonzero(~off_grid)
+        counts = self.reach_offsets[cell[on_grid] + 1] - self.reach_offsets[cell[on_grid]]
+        # One row per (device, antenna reaching its cell) pair
+        owner = np.repeat(np.arange(len(on_grid)), counts)
+        starts = np.repeat(self.reach_offsets[cell[on_grid]] - np.cumsum(counts) + counts, counts)
+        antennas = self.reach_antennas[starts + np.arange(len(owner))]
+        delta = self.xy[devices[on_grid[owner]]] - self.antenna_xy[antennas]
+        d2 = np.einsum("ij,ij->i", delta, delta)
+        d2[d2 > self.ranges[antennas] ** 2] = np.inf
+
+        # Pairs are grouped by device with antennas ascending, so the first pair at the
+        # group minimum is the nearest in-range antenna (ties go to the lower index)
+        reaching = np.flatnonzero(counts)
+        if not len(reaching):
+            return best
+        group_start = (np.cumsum(counts) - counts)[reaching]
+        nearest_d2 = np.minimum.reduceat(d2, group_start)
+        hit = np.flatnonzero((d2 == np.repeat(nearest_d2, counts[reaching])) & np.isfinite(d2))
+        first = np.ones(len(hit), dtype=bool)
+        first[1:] = owner[hit[1:]] != owner[hit[:-1]]
+        best[on_grid[owner[hit[first]]]] = antennas[hit[first]]
+        return best
@@ -0,0 +1,154 @@
+import heapq
+
+import numpy as np
+
+from coverage import CoverageEngine
+
+# Bits set per byte value, for NumPy versions without np.bitwise_count
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_bitwise_count = getattr(np, "bitwise_count", None)
+
+
+def popcount(bits, axis=-1):
+    """Number of set bits in a packed uint8 array, summed along `axis`."""
+    counts = _bitwise_count(bits) if _bitwise_count is not None else _POPCOUNT[bits]
+    return counts.sum(axis=axis, dtype=np.int64)
+
+
+def grid_sites(x_min, y_min, x_max, y_max, spacing, contains=None):
+    """Candidate sites on a square lattice, optionally kept only where `contains(xs, ys)` is True."""
+    xs = np.arange(x_min + spacing / 2, x_max, spacing)
+    ys = np.arange(y_min + spacing / 2, y_max, spacing)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    sites = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+    if contains is not None and len(sites):
+        sites = sites[np.asarray(contains(sites[:, 0], sites[:, 1]), dtype=bool)]
+    return sites
+
+
+def kmeans_sites(device_xy, k, iterations=10, seed=None, sample=20000, chunk=16384):
+    """Candidate sites at the centroids of k-means clusters of the devices.
+
+    The clusters are fitted on a random sample of at most `sample` devices;
+    candidate sites only need to be roughly central. Squared distances are expanded as |x|^2 - 2 x.c + |c|^2 so each chunk
+    of devices is one matrix product. Empty clusters keep their previous
+    centroid.
+    """
+    device_xy = np.asarray(device_xy, dtype=np.float64).reshape(-1, 2)
+    if not len(device_xy) or k <= 0:
+        return np.empty((0, 2), dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    if len(device_xy) > sample:
+        device_xy = device_xy[rng.choice(len(device_xy), sample, replace=False)]
+    k = min(k, len(device_xy))
+    centroids = device_xy[rng.choice(len(device_xy), k, replace=False)].copy()
+    labels = np.empty(len(device_xy), dtype=np.intp)
+    for _ in range(iterations):
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        for start in range(0, len(device_xy), chunk):
+            part = device_xy[start:start + chunk]
+            # |x|^2 is the same for every centroid, so it does not change the argmin
+            labels[start:start + chunk] = (centroid_norms - 2 * part @ centroids.T).argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.column_stack([np.bincount(labels, weights=device_xy[:, axis], minlength=k) for axis in (0, 1)])
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def coverage_bitsets(sites, device_xy, range_radius, progress=None):
+    """Return a (sites, ceil(devices / 8)) uint8 array: bit j of row i is set if site i covers device j."""
+    sites = np.asarray(sites, dtype=np.float64).reshape(-1, 2)
+    device_xy = np.asarray(device_xy, dtype=np.float64).reshape(-1, 2)
+    bits = np.zeros((len(sites), (len(device_xy) + 7) // 8), dtype=np.uint8)
+    if not len(sites) or not len(device_xy):
+        return bits
+    engine = CoverageEngine()
+    engine.set_antennas(sites, range_radius)
+    engine.set_devices(device_xy)
+    site_idx, device_idx = engine.in_range_pairs(progress)
+
+    # Pairs come grouped by site, so each site's devices are one contiguous run
+    bounds = np.searchsorted(site_idx, np.arange(len(sites) + 1))
+    row = np.zeros(len(device_xy), dtype=bool)
+    for i in range(len(sites)):
+        hits = device_idx[bounds[i]:bounds[i + 1]]
+        if len(hits):
+            row[hits] = True
+            bits[i] = np.packbits(row)
+            row[hits] = False
+    return bits
+
+
+def place_antennas(device_xy, count, range_radius, link_range, candidates, existing=None, progress=None):
+    """Choose up to `count` candidate sites that cover the most devices with a connected backbone.
+
+    This is greedy maximum coverage with lazy evaluation: each candidate's
+    gain (newly covered devices, counted on coverage bitsets) only ever
+    shrinks, so stale gains kept in a heap are upper bounds, and only the
+    top candidate is re-evaluated each time. After the first site, only
+    candidates within `link_range` of a chosen or `existing` site are
+    eligible, which keeps the antennas connected. Devices covered by
+    `existing` antennas do not count. Stops early once no eligible
+    candidate would cover another device.
+
+    Returns (positions, covered) where `covered[i]` is the number of covered
+    devices after placing the first i + 1 sites.
+    """
+    candidates = np.asarray(candidates, dtype=np.float64).reshape(-1, 2)
+    device_xy = np.asarray(device_xy, dtype=np.float64).reshape(-1, 2)
+    existing = np.empty((0, 2)) if existing is None else np.asarray(existing, dtype=np.float64).reshape(-1, 2)
+    report = progress or (lambda fraction: None)
+
+    bits = coverage_bitsets(candidates, device_xy, range_radius, lambda fraction: report(0.5 * fraction))
+    covered = np.bitwise_or.reduce(coverage_bitsets(existing, device_xy, range_radius), axis=0)
+
+    link2 = link_range ** 2
+
+    def linked_to(position):
+        delta = candidates - position
+        return np.einsum("ij,ij->i", delta, delta) <= link2
+
+    # Anything goes until there is a backbone to connect to
+    eligible = np.ones(len(candidates), dtype=bool)
+    if len(existing):
+        eligible[:] = False
+        for position in existing:
+            eligible |= linked_to(position)
+
+    gains = popcount(bits & ~covered)
+    heap = [(-gain, i) for i, gain in enumerate(gains.tolist())]
+    heapq.heapify(heap)
+
+    chosen = []
+    covered_counts = []
+    total = int(popcount(covered))
+    while len(chosen) < count:
+        report(0.5 + 0.5 * len(chosen) / count)
+        deferred = []
+        pick = None
+        while heap:
+            bound, i = heapq.heappop(heap)
+            if not eligible[i]:
+                deferred.append((bound, i))  # Still an upper bound once it becomes reachable
+                continue
+            gain = int(popcount(bits[i] & ~covered))
+            if gain == -bound:
+                pick = i
+                break
+            heapq.heappush(heap, (-gain, i))
+        for item in deferred:
+            heapq.heappush(heap, item)
+        if pick is None or gain == 0:
+            break
+
+        chosen.append(pick)
+        covered |= bits[pick]
+        total += gain
+        covered_counts.append(total)
+        if len(chosen) == 1 and not len(existing):
+            eligible = linked_to(candidates[pick])
+        else:
+            eligible |= linked_to(candidates[pick])
+    report(1.0)
+    return candidates[chosen], np.array(covered_counts, dtype=np.int64)
@@ -0,0 +1,394 @@
+import math
+
+import numpy as np
+
+# Distances below this are clamped so the models stay finite at the antenna itself
+MIN_DISTANCE_M = 1.0
+
+
+class PathLossModel:
+    """Base class for path-loss models: `loss(distance_m)` returns the loss in dB for an array of distances."""
+
+    shadowing_db = 0.0  # Standard deviation of log-normal shadowing, 0 for none
+
+    def loss(self, distance_m):
+        raise NotImplementedError
+
+    def reach(self, max_loss_db):
+        """Return the distance in metres at which the loss first exceeds `max_loss_db`."""
+        distances = np.geomspace(MIN_DISTANCE_M, 1e7, 2048)
+        beyond = np.flatnonzero(self.loss(distances) > max_loss_db)
+        return distances[beyond[0]] if len(beyond) else distances[-1]
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __hash__(self):
+        return hash((type(self), tuple(sorted(vars(self).items()))))
+
+    def __repr__(self):
+        params = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({params})"
+
+
+class FreeSpace(PathLossModel):
+    """Friis free-space loss."""
+
+    def __init__(self, frequency_mhz):
+        self.frequency_mhz = frequency_mhz
+
+    def loss(self, distance_m):
+        distance_m = np.maximum(distance_m, MIN_DISTANCE_M)
+        return 20 * np.log10(distance_m) + 20 * math.log10(self.frequency_mhz) - 27.55
+
+
+class OkumuraHata(PathLossModel):
+    """Okumura-Hata loss for 150-1500 MHz macro cells.
+
+    `environment` is "urban", "large_city", "suburban" or "open". The model
+    is fitted for 1-20 km; closer distances are extrapolated.
+    """
+
+    ENVIRONMENTS = ("urban", "large_city", "suburban", "open")
+
+    def __init__(self, frequency_mhz, base_height=30.0, mobile_height=1.5, environment="urban"):
+        if environment not in self.ENVIRONMENTS:
+            raise ValueError(f"unknown environment '{environment}', expected one of {', '.join(self.ENVIRONMENTS)}")
+        self.frequency_mhz = frequency_mhz
+        self.base_height = base_height
+        self.mobile_height = mobile_height
+        self.environment = environment
+
+    def loss(self, distance_m):
+        log_f = math.log10(self.frequency_mhz)
+        log_hb = math.log10(self.base_height)
+        hm = self.mobile_height
+        if self.environment == "large_city":
+            if self.frequency_mhz >= 300:
+                mobile_correction = 3.2 * math.log10(11.75 * hm) ** 2 - 4.97
+            else:
+                mobile_correction = 8.29 * math.log10(1.54 * hm) ** 2 - 1.1
+        else:
+            mobile_correction = (1.1 * log_f - 0.7) * hm - (1.56 * log_f - 0.8)
+
+        distance_km = np.maximum(distance_m, MIN_DISTANCE_M) / 1000
+        loss = 69.55 + 26.16 * log_f - 13.82 * log_hb - mobile_correction + (44.9 - 6.55 * log_hb) * np.log10(distance_km)
+        if self.environment == "suburban":
+            loss = loss - 2 * math.log10(self.frequency_mhz / 28) ** 2 - 5.4
+        elif self.environment == "open":
+            loss = loss - 4.78 * log_f ** 2 + 18.33 * log_f - 40.94
+        return loss
+
+
+class LogDistance(PathLossModel):
+    """Log-distance loss: free space up to `reference_m`, then 10 * exponent dB per decade.
+
+    With `shadowing_db` > 0 the signal map adds log-normal shadowing, drawn
+    per raster cell from a generator seeded by `seed` and the antenna key,
+    so a cached tile always gets the same shadowing.
+    """
+
+    def __init__(self, frequency_mhz, exponent=3.5, reference_m=1.0, shadowing_db=0.0, seed=0):
+        self.frequency_mhz = frequency_mhz
+        self.exponent = exponent
+        self.reference_m = reference_m
+        self.shadowing_db = shadowing_db
+        self.seed = seed
+
+    def loss(self, distance_m):
+        reference_loss = FreeSpace(self.frequency_mhz).loss(self.reference_m)
+        distance_m = np.maximum(distance_m, self.reference_m)
+        return reference_loss + 10 * self.exponent * np.log10(distance_m / self.reference_m)
+
+
+MODELS = {
+    "free_space": FreeSpace,
+    "okumura_hata": OkumuraHata,
+    "log_distance": LogDistance,
+}
+
+
+def make_model(name, frequency_mhz, **params):
+    """Build a path-loss model by name (see MODELS)."""
+    try:
+        model_class = MODELS[name]
+    except KeyError:
+        raise ValueError(f"unknown path-loss model '{name}', expected one of {', '.join(MODELS)}") from None
+    return model_class(frequency_mhz, **params)
+
+
+def dbm_to_mw(dbm):
+    return np.power(10.0, np.asarray(dbm, dtype=np.float64) / 10)
+
+
+def mw_to_dbm(mw):
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(mw)
+
+
+class RasterGrid:
+    """A regular grid of square cells over (x_min, y_min)-(x_max, y_max) in canvas units.
+
+    `contains(xs, ys)`, if given, is a vectorized point-in-area test used
+    to mask out cells whose centre lies outside the area (e.g. a city
+    polygon); masked cells never receive signal.
+    """
+
+    def __init__(self, x_min, y_min, x_max, y_max, cell_size, metres_per_unit=1.0, contains=None):
+        self.x_min = x_min
+        self.y_min = y_min
+        self.cell_size = cell_size
+        self.metres_per_unit = metres_per_unit
+        self.cols = max(int(math.ceil((x_max - x_min) / cell_size)), 1)
+        self.rows = max(int(math.ceil((y_max - y_min) / cell_size)), 1)
+        self.xs = x_min + (np.arange(self.cols) + 0.5) * cell_size  # Cell centres
+        self.ys = y_min + (np.arange(self.rows) + 0.5) * cell_size
+        if contains is None:
+            self.mask = np.ones((self.rows, self.cols), dtype=bool)
+        else:
+            grid_x, grid_y = np.meshgrid(self.xs, self.ys)
+            self.mask = np.asarray(contains(grid_x.ravel(), grid_y.ravel()), dtype=bool).reshape(self.rows, self.cols)
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def window(self, x, y, radius):
+        """Return (row slice, col slice) of the cells whose centre may lie within `radius` of (x, y)."""
+        size = self.cell_size
+        c0 = max(int(math.floor((x - radius - self.x_min) / size)), 0)
+        c1 = min(int(math.ceil((x + radius - self.x_min) / size)) + 1, self.cols)
+        r0 = max(int(math.floor((y - radius - self.y_min) / size)), 0)
+        r1 = min(int(math.ceil((y + radius - self.y_min) / size)) + 1, self.rows)
+        return slice(r0, max(r1, r0)), slice(c0, max(c1, c0))
+
+    def cells_of(self, xy):
+        """Return (rows, cols) of the cells containing each point; both are -1 for points off the grid."""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        cols = np.floor((xy[:, 0] - self.x_min) / self.cell_size).astype(np.intp)
+        rows = np.floor((xy[:, 1] - self.y_min) / self.cell_size).astype(np.intp)
+        outside = (cols < 0) | (cols >= self.cols) | (rows < 0) | (rows >= self.rows)
+        cols[outside] = -1
+        rows[outside] = -1
+        return rows, cols
+
+
+class SignalTile:
+    """One antenna's received power (mW, float32) over a window of the grid."""
+
+    __slots__ = ("rows", "cols", "mw")
+
+    def __init__(self, rows, cols, mw):
+        self.rows = rows
+        self.cols = cols
+        self.mw = mw
+
+    def overlap(self, rows, cols):
+        """Return the (grid rows, grid cols, tile rows, tile cols) slices shared with a window, or None."""
+        r0, r1 = max(self.rows.start, rows.start), min(self.rows.stop, rows.stop)
+        c0, c1 = max(self.cols.start, cols.start), min(self.cols.stop, cols.stop)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        return (
+            slice(r0, r1), slice(c0, c1),
+            slice(r0 - self.rows.start, r1 - self.rows.start), slice(c0 - self.cols.start, c1 - self.cols.start),
+        )
+
+
+class SignalMap:
+    """Received signal strength, best server and SINR over a raster grid.
+
+    Each antenna's contribution is computed once into a SignalTile that
+    only spans the cells where it can rise above `floor_dbm`, and is kept
+    until that antenna moves or changes power. The map keeps two running
+    reductions over all tiles: the total received power and the strongest
+    server per cell. Adding an antenna therefore costs one tile plus a
+    max/sum over its window; removing one subtracts its tile and re-reduces
+    the best server only inside its window.
+    """
+
+    def __init__(self, grid, model, noise_dbm=-104.0, floor_dbm=-120.0, sensitivity_dbm=-100.0, min_sinr_db=-6.0):
+        self.grid = grid
+        self.model = model
+        self.noise_dbm = noise_dbm
+        self.floor_dbm = floor_dbm
+        self.sensitivity_dbm = sensitivity_dbm  # Weakest usable best-server signal
+        self.min_sinr_db = min_sinr_db  # Weakest usable best-server SINR
+        self.sources = {}  # key -> (x, y, power_dbm)
+        self.tiles = {}  # key -> SignalTile
+        self._reset_maps()
+
+    def _reset_maps(self):
+        self.total_mw = np.zeros(self.grid.shape, dtype=np.float64)
+        self.best_mw = np.zeros(self.grid.shape, dtype=np.float32)
+        self.best_key = np.full(self.grid.shape, -1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __contains__(self, key):
+        return key in self.sources
+
+    def set_antenna(self, key, position, power_dbm):
+        """Add an antenna under an integer key, or move it / change its power."""
+        source = (float(position[0]), float(position[1]), float(power_dbm))
+        if self.sources.get(key) == source:
+            return
+        if key in self.sources:
+            self.remove_antenna(key)
+        self.sources[key] = source
+        tile = self._compute_tile(key, *source)
+        self.tiles[key] = tile
+
+        window = self.total_mw[tile.rows, tile.cols]
+        window += tile.mw
+        best = self.best_mw[tile.rows, tile.cols]
+        stronger = tile.mw > best
+        best[stronger] = tile.mw[stronger]
+        self.best_key[tile.rows, tile.cols][stronger] = key
+
+    def remove_antenna(self, key):
+        """Drop an antenna's tile; unknown keys are ignored."""
+        if self.sources.pop(key, None) is None:
+            return
+        tile = self.tiles.pop(key)
+        window = self.total_mw[tile.rows, tile.cols]
+        window -= tile.mw
+        np.maximum(window, 0, out=window)  # Rounding can leave tiny negatives
+        if not self.tiles:
+            window[:] = 0
+        if np.any(self.best_key[tile.rows, tile.cols] == key):
+            self._reduce_best(tile.rows, tile.cols)
+
+    def set_model(self, model):
+        """Switch path-loss model; every tile is recomputed."""
+        if model == self.model:
+            return
+        self.model = model
+        self.rebuild()
+
+    def set_grid(self, grid):
+        """Switch to another grid (e.g. after a resize); every tile is recomputed."""
+        self.grid = grid
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute every tile and both reductions from scratch."""
+        sources = self.sources
+        self.sources = {}
+        self.tiles = {}
+        self._reset_maps()
+        for key, (x, y, power_dbm) in sources.items():
+            self.set_antenna(key, (x, y), power_dbm)
+
+    def _compute_tile(self, key, x, y, power_dbm):
+        grid = self.grid
+        model = self.model
+        max_loss = power_dbm - self.floor_dbm + 3 * model.shadowing_db
+        radius = model.reach(max_loss) / grid.metres_per_unit
+        rows, cols = grid.window(x, y, radius)
+
+        dx = (grid.xs[cols] - x) * grid.metres_per_unit
+        dy = (grid.ys[rows] - y) * grid.metres_per_unit
+        rx_dbm = power_dbm - model.loss(np.hypot(dy[:, None], dx[None, :]))
+        if model.shadowing_db:
+            rng = np.random.default_rng((model.seed, key))
+            rx_dbm = rx_dbm + rng.normal(0.0, model.shadowing_db, rx_dbm.shape)
+        mw = dbm_to_mw(rx_dbm).astype(np.float32)
+        mw[(rx_dbm < self.floor_dbm) | ~grid.mask[rows, cols]] = 0
+        return SignalTile(rows, cols, mw)
+
+    def _reduce_best(self, rows, cols):
+        """Recompute the best server inside a window from the tiles overlapping it."""
+        best = np.zeros((rows.stop - rows.start, cols.stop - cols.start), dtype=np.float32)
+        best_key = np.full(best.shape, -1, dtype=np.int64)
+        for key, tile in self.tiles.items():
+            shared = tile.overlap(rows, cols)
+            if shared is None:
+                continue
+            grid_rows, grid_cols, tile_rows, tile_cols = shared
+            local = (slice(grid_rows.start - rows.start, grid_rows.stop - rows.start),
+                     slice(grid_cols.start - cols.start, grid_cols.stop - cols.start))
+            mw = tile.mw[tile_rows, tile_cols]
+            stronger = mw > best[local]
+            best[local][stronger] = mw[stronger]
+            best_key[local][stronger] = key
+        self.best_mw[rows, cols] = best
+        self.best_key[rows, cols] = best_key
+
+    def best_server_dbm(self):
+        """Strongest received power per cell in dBm (-inf where nothing is received)."""
+        return mw_to_dbm(self.best_mw.astype(np.float64))
+
+    def sinr_db(self):
+        """Best-server SINR per cell in dB: best / (all other servers + noise). -inf where nothing is received."""
+        best = self.best_mw.astype(np.float64)
+        interference = np.maximum(self.total_mw - best, 0) + dbm_to_mw(self.noise_dbm)
+        return mw_to_dbm(best / interference)
+
+    def snapshot(self):
+        """Return a copy that another thread can read while this map keeps changing.
+
+        Tiles are never modified once computed, so they are shared; only the
+        reductions are copied.
+        """
+        copy = SignalMap.__new__(SignalMap)
+        copy.__dict__.update(self.__dict__)
+        copy.sources = dict(self.sources)
+        copy.tiles = dict(self.tiles)
+        copy.total_mw = self.total_mw.copy()
+        copy.best_mw = self.best_mw.copy()
+        copy.best_key = self.best_key.copy()
+        return copy
+
+    def sample(self, xy):
+        """Return (best server key, best-server dBm, SINR dB) for each point; key -1 off the grid or without signal."""
+        rows, cols = self.grid.cells_of(xy)
+        off_grid = rows < 0
+        best = self.best_mw[rows, cols].astype(np.float64)
+        total = self.total_mw[rows, cols]
+        keys = self.best_key[rows, cols]
+        best[off_grid] = 0
+        keys[off_grid] = -1
+        interference = np.maximum(total - best, 0) + dbm_to_mw(self.noise_dbm)
+        return keys, mw_to_dbm(best), mw_to_dbm(best / interference)
+
+    def serving(self, xy):
+        """Return (antenna keys, point indices) attaching each point to its best server, where usable.
+
+        A point is served when its best server reaches `sensitivity_dbm` and
+        its SINR reaches `min_sinr_db`.
+        """
+        keys, rx_dbm, sinr = self.sample(xy)
+        served = np.flatnonzero((keys >= 0) & (rx_dbm >= self.sensitivity_dbm) & (sinr >= self.min_sinr_db))
+        return keys[served], served
+
+    def candidates(self, xy):
+        """Return (antenna keys, point indices, dBm) for every antenna that could serve each point.
+
+        Unlike `serving` this lists all usable servers, not just the best,
+        so a full antenna can hand a point to the next one. Each candidate
+        must reach `sensitivity_dbm` and `min_sinr_db` with every other
+        antenna counted as interference.
+        """
+        rows, cols = self.grid.cells_of(xy)
+        on_grid = np.flatnonzero(rows >= 0)
+        # Points sorted by row, so each tile's rows are one contiguous run
+        on_grid = on_grid[np.argsort(rows[on_grid], kind="stable")]
+        sorted_rows = rows[on_grid]
+        noise_mw = dbm_to_mw(self.noise_dbm)
+        keys, points, rx = [], [], []
+        for key, tile in self.tiles.items():
+            start, stop = np.searchsorted(sorted_rows, [tile.rows.start, tile.rows.stop])
+            inside = on_grid[start:stop]
+            inside = inside[(cols[inside] >= tile.cols.start) & (cols[inside] < tile.cols.stop)]
+            mw = tile.mw[rows[inside] - tile.rows.start, cols[inside] - tile.cols.start].astype(np.float64)
+            interference = np.maximum(self.total_mw[rows[inside], cols[inside]] - mw, 0) + noise_mw
+            rx_dbm = mw_to_dbm(mw)
+            usable = (rx_dbm >= self.sensitivity_dbm) & (mw_to_dbm(mw / interference) >= self.min_sinr_db)
+            keys.append(np.full(np.count_nonzero(usable), key, dtype=np.int64))
+            points.append(inside[usable])
+            rx.append(rx_dbm[usable])
+        if not keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.intp), np.empty(0)
+        return np.concatenate(keys), np.concatenate(points), np.concatenate(rx)
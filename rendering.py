@@ -0,0 +1,232 @@
+import tkinter as tk
+
+import numpy as np
+
+from association import AssociationSet
+
+DEVICE_RADIUS = 5
+
+# Tile shading: uncovered devices are blue, covered ones green, faded towards white when sparse
+UNCOVERED_RGB = np.array([0, 0, 255])
+COVERED_RGB = np.array([0, 160, 0])
+WHITE_RGB = np.array([255, 255, 255])
+SHADE_LEVELS = 8
+
+
+def _tile_palette():
+    """Fill colors indexed by covered share level * (SHADE_LEVELS + 1) + device count level."""
+    share = np.repeat(np.arange(SHADE_LEVELS + 1), SHADE_LEVELS + 1) / SHADE_LEVELS
+    density = np.tile(np.arange(SHADE_LEVELS + 1), SHADE_LEVELS + 1) / SHADE_LEVELS
+    base = UNCOVERED_RGB + (COVERED_RGB - UNCOVERED_RGB) * share[:, None]
+    rgb = np.rint(WHITE_RGB + (base - WHITE_RGB) * density[:, None]).astype(np.int64)
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in rgb.tolist()]
+
+
+TILE_PALETTE = _tile_palette()
+
+# Signal overlay: SINR bands from red (poor) to green (good); cells without signal stay white
+SINR_BANDS_DB = np.arange(-5, 26, 5)
+SINR_PALETTE = np.array(["#ffffff", "#d7191c", "#ef6c33", "#fdae61", "#fee08b", "#d9ef8b", "#91cf60", "#1a9850", "#006837"])
+
+
+class LinePool:
+    """Canvas lines keyed by association key; only added and removed keys touch the canvas."""
+
+    def __init__(self, canvas, tag="connection", **options):
+        self.canvas = canvas
+        self.tag = tag
+        self.options = options
+        self.drawn = AssociationSet()
+        self.items = {}  # key -> canvas item
+
+    def __len__(self):
+        return len(self.items)
+
+    def sync(self, keys, coords_of):
+        """Draw exactly `keys`. `coords_of(keys)` returns an (N, 4) array of x1, y1, x2, y2 for new keys."""
+        added, removed = self.drawn.replace_keys(keys)
+        for key in removed.tolist():
+            self.canvas.delete(self.items.pop(key))
+        if len(added):
+            create_line = self.canvas.create_line
+            options = self.options
+            tag = self.tag
+            items = self.items
+            for key, (x1, y1, x2, y2) in zip(added.tolist(), coords_of(added).tolist()):
+                items[key] = create_line(x1, y1, x2, y2, tags=tag, **options)
+
+    def move(self, coords_of):
+        """Update the coordinates of every drawn line, e.g. after their endpoints moved."""
+        keys = self.drawn.keys
+        if not len(keys):
+            return
+        coords = self.canvas.coords
+        items = self.items
+        for key, xy in zip(keys.tolist(), coords_of(keys).tolist()):
+            coords(items[key], *xy)
+
+    def clear(self):
+        self.canvas.delete(*self.items.values())
+        self.items = {}
+        self.drawn.clear()
+
+
+class SceneRenderer:
+    """Draws devices and their connections on a Tk canvas.
+
+    Items are created once and afterwards only recolored, and only when
+    their state changes. Up to `detail_limit` devices are drawn as one oval
+    each with one line per device connection. Above that the scene switches
+    to a coarser level of detail: devices and coverage are drawn as
+    `cell_size` tiles shaded by device count and covered share, and
+    device lines are dropped.
+    """
+
+    def __init__(self, canvas, detail_limit=5000, cell_size=10):
+        self.canvas = canvas
+        self.detail_limit = detail_limit
+        self.cell_size = cell_size
+        self.detailed = True
+        self.device_items = []  # device index -> oval, detailed mode only
+        self.drawn_covered = np.zeros(0, dtype=bool)
+        self.tile_items = {}  # cell key -> rectangle, aggregated mode only
+        self.tile_codes = {}  # cell key -> palette index currently shown
+        self._binning = None
+        # One pool per association set: (antenna id, device index) and (antenna id, antenna id)
+        # keys share the same int64 space, so antenna 0 covering device 1 and link 0-1 are both key 1
+        self.device_lines = LinePool(canvas, fill="green")
+        self.antenna_lines = LinePool(canvas, fill="red", dash=(4, 2))
+
+    def update_devices(self, xy, covered, name_of):
+        """Show the devices at `xy` (N, 2), colored by the `covered` mask; `name_of(i)` gives oval tags."""
+        detailed = len(xy) <= self.detail_limit
+        if detailed != self.detailed:
+            self.clear_devices()
+            self.detailed = detailed
+        if detailed:
+            self._update_ovals(xy, covered, name_of)
+        else:
+            self._update_tiles(xy, covered)
+
+    def sync_device_lines(self, keys, coords_of):
+        """Draw one line per device association, in detailed mode only."""
+        self.device_lines.sync(keys if self.detailed else keys[:0], coords_of)
+
+    def sync_antenna_lines(self, keys, coords_of):
+        self.antenna_lines.sync(keys, coords_of)
+
+    def move_devices(self, xy, moved, line_coords_of):
+        """Follow devices that moved: `moved` holds their indices; call before update_devices."""
+        if not self.detailed:
+            self._binning = None  # Tiles are re-binned on the next update
+            return
+        r = DEVICE_RADIUS
+        coords = self.canvas.coords
+        items = self.device_items
+        moved = moved[moved < len(items)]
+        for j, (x, y) in zip(moved.tolist(), xy[moved].tolist()):
+            coords(items[j], x - r, y - r, x + r, y + r)
+        self.device_lines.move(line_coords_of)
+
+    def _update_ovals(self, xy, covered, name_of):
+        canvas = self.canvas
+        previous = np.zeros(len(covered), dtype=bool)
+        previous[:len(self.drawn_covered)] = self.drawn_covered
+        first_new = len(self.device_items)
+
+        # Existing devices whose coverage flipped are recolored in place
+        for j in np.flatnonzero(covered[:first_new] != previous[:first_new]).tolist():
+            canvas.itemconfig(self.device_items[j], fill="green" if covered[j] else "blue")
+
+        # New devices are created in one pass
+        r = DEVICE_RADIUS
+        create_oval = canvas.create_oval
+        for j, (x, y) in enumerate(xy[first_new:].tolist(), start=first_new):
+            fill = "green" if covered[j] else "blue"
+            self.device_items.append(create_oval(x - r, y - r, x + r, y + r, fill=fill, tags=("device", name_of(j))))
+        if len(xy) > first_new:
+            canvas.tag_lower("device")  # Keep antennas and lines on top
+        self.drawn_covered = covered.copy()
+
+    def _tile_binning(self, xy):
+        """Bin devices into tiles; only redone when devices are added."""
+        if self._binning is not None and self._binning[0] == len(xy):
+            return self._binning[1:]
+        cell = np.floor(xy / self.cell_size).astype(np.int64)
+        keys = cell[:, 0] << 32 | (cell[:, 1] & 0xFFFFFFFF)
+        cells, inverse = np.unique(keys, return_inverse=True)
+        live = set(cells.tolist())
+        for key in [key for key in self.tile_items if key not in live]:
+            self.canvas.delete(self.tile_items.pop(key))
+            del self.tile_codes[key]
+        shown = np.array([self.tile_codes.get(key, -1) for key in cells.tolist()], dtype=np.int64)
+        self._binning = (len(xy), cells, inverse, np.bincount(inverse), shown)
+        return self._binning[1:]
+
+    def _update_tiles(self, xy, covered):
+        cells, inverse, counts, shown = self._tile_binning(xy)
+        covered_counts = np.bincount(inverse, weights=covered, minlength=len(cells))
+
+        # Shades are quantized, so small changes in a busy tile don't cause a redraw
+        share = np.rint(covered_counts / counts * SHADE_LEVELS).astype(np.int64)
+        density = np.minimum(counts, SHADE_LEVELS)
+        codes = share * (SHADE_LEVELS + 1) + density
+        changed = np.flatnonzero(codes != shown)
+        if not len(changed):
+            return
+
+        canvas = self.canvas
+        size = self.cell_size
+        for index, key, code in zip(changed.tolist(), cells[changed].tolist(), codes[changed].tolist()):
+            color = TILE_PALETTE[code]
+            if shown[index] < 0:
+                cx, cy = key >> 32, (key & 0xFFFFFFFF) - ((key & 0x80000000) << 1)
+                self.tile_items[key] = canvas.create_rectangle(
+                    cx * size, cy * size, (cx + 1) * size, (cy + 1) * size, fill=color, outline="", tags="device_tile"
+                )
+            else:
+                canvas.itemconfig(self.tile_items[key], fill=color)
+            self.tile_codes[key] = code
+        shown[changed] = codes[changed]
+        canvas.tag_lower("device_tile")
+
+    def clear_devices(self):
+        """Delete every device oval, tile and device line."""
+        self.canvas.delete("device", "device_tile")
+        self.device_items = []
+        self.drawn_covered = np.zeros(0, dtype=bool)
+        self.tile_items = {}
+        self.tile_codes = {}
+        self._binning = None
+        self.device_lines.clear()
+
+
+class RasterOverlay:
+    """Shows a raster (e.g. a SINR map) as one zoomed image at the bottom of the canvas."""
+
+    def __init__(self, canvas, tag="raster"):
+        self.canvas = canvas
+        self.tag = tag
+        self.image = None  # Keep a reference, Tk does not
+
+    def show(self, grid, colors):
+        """Draw `colors`, a (rows, cols) array of "#rrggbb" strings, over the grid cells."""
+        rows = ["{" + " ".join(row) + "}" for row in colors.tolist()]
+        image = tk.PhotoImage(master=self.canvas, width=grid.cols, height=grid.rows)
+        image.put(" ".join(rows))
+        if grid.cell_size > 1:
+            image = image.zoom(int(grid.cell_size))
+        self.canvas.delete(self.tag)
+        self.canvas.create_image(grid.x_min, grid.y_min, image=image, anchor=tk.NW, tags=self.tag)
+        self.canvas.tag_lower(self.tag)
+        self.image = image
+
+    def show_sinr(self, grid, sinr_db):
+        """Draw a SINR map in bands of SINR_BANDS_DB; cells with no signal or outside the grid mask are white."""
+        codes = np.searchsorted(SINR_BANDS_DB, sinr_db, side="right") + 1
+        codes[~np.isfinite(sinr_db) | ~grid.mask] = 0
+        self.show(grid, SINR_PALETTE[codes])
+
+    def clear(self):
+        self.canvas.delete(self.tag)
+        self.image = None
@@ -0,0 +1,147 @@
+import heapq
+
+
+def shortest_path_tree(network, src, dst=None):
+    """Dijkstra over the network's active links, weighted by link delay.
+
+    Returns (dist, previous) where previous maps each reached node to
+    (previous node, link id). Stops early once `dst` is settled, if given.
+    """
+    topology = network.topology
+    dist = {src: 0.0}
+    previous = {}
+    heap = [(0.0, src)]
+    done = set()
+    while heap:
+        d, node = heapq.heappop(heap)
+        if node in done:
+            continue
+        done.add(node)
+        if node == dst:
+            break
+        for link_id in topology.links_of(node):
+            if not network.is_link_active(link_id):
+                continue
+            other = topology.other_end(link_id, node)
+            nd = d + topology.link_properties(link_id)[1]
+            if nd < dist.get(other, float("inf")):
+                dist[other] = nd
+                previous[other] = (node, link_id)
+                heapq.heappush(heap, (nd, other))
+    return dist, previous
+
+
+def _trace(previous, src, dst):
+    nodes = [dst]
+    link_ids = []
+    while nodes[-1] != src:
+        node, link_id = previous[nodes[-1]]
+        nodes.append(node)
+        link_ids.append(link_id)
+    nodes.reverse()
+    link_ids.reverse()
+    return nodes, link_ids
+
+
+def shortest_path(network, src, dst):
+    """Delay-weighted shortest path over the network's active links.
+
+    Returns (nodes, link_ids, total_delay) or None if dst is unreachable.
+    Parallel links are handled naturally: the lowest-delay active one wins.
+    """
+    dist, previous = shortest_path_tree(network, src, dst)
+    if dst not in dist:
+        return None
+    nodes, link_ids = _trace(previous, src, dst)
+    return nodes, link_ids, dist[dst]
+
+
+class RoutingTable:
+    """Cached per-source shortest-path trees with incremental invalidation.
+
+    The table listens to link changes on the network and its topology. A
+    link going down only invalidates the sources whose tree uses it; a link
+    coming up only invalidates the sources it would give a shorter path to.
+    Trees are recomputed lazily on the next query.
+    """
+
+    def __init__(self, network):
+        self.network = network
+        self.trees = {}  # source -> (dist, previous)
+        self.link_users = {}  # link id -> set of sources whose tree uses it
+        self.pending = {}  # source -> host delays before invalidation, for change reports
+        network.add_listener(self)
+        network.topology.add_listener(self)
+
+    def tree(self, src):
+        """Return (dist, previous) for a source, computing it if needed."""
+        tree = self.trees.get(src)
+        if tree is None:
+            tree = shortest_path_tree(self.network, src)
+            self.trees[src] = tree
+            for _, link_id in tree[1].values():
+                self.link_users.setdefault(link_id, set()).add(src)
+        return tree
+
+    def path(self, src, dst):
+        """Return (nodes, link_ids, total_delay) or None if dst is unreachable."""
+        dist, previous = self.tree(src)
+        if dst not in dist:
+            return None
+        nodes, link_ids = _trace(previous, src, dst)
+        return nodes, link_ids, dist[dst]
+
+    def delay(self, src, dst):
+        """Return the path delay in seconds, or None if dst is unreachable."""
+        return self.tree(src)[0].get(dst)
+
+    def invalidate(self, src):
+        """Drop a source's cached tree."""
+        tree = self.trees.pop(src, None)
+        if tree is None:
+            return
+        if src not in self.pending:
+            hosts = self.network.topology.hosts
+            self.pending[src] = {host: tree[0].get(host) for host in hosts}
+        for _, link_id in tree[1].values():
+            users = self.link_users.get(link_id)
+            if users:
+                users.discard(src)
+                if not users:
+                    del self.link_users[link_id]
+
+    def link_state_changed(self, link_id, active):
+        """Invalidate only the trees a link change can affect."""
+        if not active:
+            for src in list(self.link_users.get(link_id, ())):
+                self.invalidate(src)
+            return
+
+        topology = self.network.topology
+        if not topology.has_link(link_id) or not self.network.is_link_active(link_id):
+            return
+        node1, node2 = topology.link_nodes(link_id)
+        delay = topology.link_properties(link_id)[1]
+        inf = float("inf")
+        for src, (dist, _) in list(self.trees.items()):
+            d1 = dist.get(node1, inf)
+            d2 = dist.get(node2, inf)
+            if d1 + delay < d2 or d2 + delay < d1:
+                self.invalidate(src)
+
+    def host_pair_changes(self):
+        """Recompute invalidated trees and return [(src, dst, old_delay, new_delay)] for host pairs that changed.
+
+        A delay of None means the pair is disconnected.
+        """
+        changes = []
+        for src, old in self.pending.items():
+            dist = self.tree(src)[0]
+            for dst, old_delay in old.items():
+                if dst == src:
+                    continue
+                new_delay = dist.get(dst)
+                if new_delay != old_delay:
+                    changes.append((src, dst, old_delay, new_delay))
+        self.pending = {}
+        return changes
@@ -0,0 +1,134 @@
+import json
+
+import numpy as np
+
+from entities import AntennaStore, DeviceStore
+from sim import Topology
+
+# File layout: MAGIC, header length (uint64 little-endian), JSON header, then
+# each array's raw bytes at an ALIGN-aligned offset listed in the header
+MAGIC = b"NETSCN\x00\x01"
+ALIGN = 64
+SUFFIX = ".scn"
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+class Scenario:
+    """A saved simulation state: named NumPy arrays plus JSON metadata.
+
+    Everything large (positions, ranges, links) goes in `arrays`, and small
+    things (names, seeds, parameters) in `meta`. Arrays are stored raw in
+    one file, so `load` maps them straight from disk instead of parsing
+    anything; a 1M-device scenario opens in about the time it takes to
+    read its header.
+    """
+
+    def __init__(self, arrays=None, meta=None):
+        self.arrays = dict(arrays or {})
+        self.meta = dict(meta or {})
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __setitem__(self, name, array):
+        self.arrays[name] = array
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    def save(self, path):
+        """Write the scenario to `path`. Object arrays are rejected; use strings of fixed width instead."""
+        arrays = {name: np.ascontiguousarray(array) for name, array in self.arrays.items()}
+        entries = {}
+        for name, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f"scenario array {name!r} has object dtype")
+            entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+
+        # Offsets depend on the header length, which depends on the offsets; pad the header to settle it
+        header_size = ALIGN
+        while True:
+            offset = _aligned(len(MAGIC) + 8 + header_size)
+            for name, array in arrays.items():
+                entries[name]["offset"] = offset
+                offset = _aligned(offset + array.nbytes)
+            header = json.dumps({"meta": self.meta, "arrays": entries}).encode("utf-8")
+            if len(header) <= header_size:
+                break
+            header_size = _aligned(len(header))
+        header = header.ljust(header_size)
+
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, array in arrays.items():
+                f.write(b"\x00" * (entries[name]["offset"] - f.tell()))
+                f.write(array.reshape(-1).view(np.uint8))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Read a scenario. With `mmap` the arrays are read-only views of the file, paged in on use."""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a scenario file")
+            header = json.loads(f.read(int.from_bytes(f.read(8), "little")))
+        data = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+        arrays = {}
+        for name, entry in header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(entry["shape"])
+            start = entry["offset"]
+            stop = start + dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+            arrays[name] = data[start:stop].view(dtype).reshape(shape)
+        return cls(arrays, header["meta"])
+
+    def put_stores(self, antennas, devices):
+        """Record an AntennaStore and DeviceStore (positions, ranges, ids, names and connections)."""
+        self["antennas/ids"] = np.asarray(antennas.ids, dtype=np.int64)
+        self["antennas/xy"] = antennas.xy
+        self["antennas/range_radius"] = antennas.range_radius
+        self["antennas/antenna_range"] = antennas.antenna_range
+        self["antennas/links"] = np.array([(i, j) for i, linked in enumerate(antennas.links) for j in sorted(linked)],
+                                          dtype=np.int64).reshape(-1, 2)
+        self["devices/xy"] = devices.xy
+        self["devices/antenna"] = devices.antenna
+        self.meta["antennas"] = {"names": list(antennas.names), "next_id": antennas.next_id}
+        self.meta["devices"] = {
+            "name_prefix": devices.name_prefix,
+            "custom_names": {str(index): name for index, name in devices.custom_names.items()},
+        }
+
+    def stores(self):
+        """Rebuild the (AntennaStore, DeviceStore) recorded by put_stores. The columns are copied."""
+        antennas = AntennaStore()
+        columns = zip(self.meta["antennas"]["names"], self["antennas/xy"].tolist(),
+                      self["antennas/range_radius"].tolist(), self["antennas/antenna_range"].tolist())
+        for name, position, range_radius, antenna_range in columns:
+            antennas.add(name, position, range_radius, antenna_range)
+        antennas.ids = self["antennas/ids"].tolist()
+        antennas.next_id = self.meta["antennas"]["next_id"]
+        for i, j in self["antennas/links"].tolist():
+            antennas.links[i].add(j)
+
+        devices = DeviceStore(antennas, self.meta["devices"]["name_prefix"])
+        devices.add_many(self["devices/xy"])
+        devices.antenna[:] = self["devices/antenna"]
+        devices.custom_names = {int(index): name for index, name in self.meta["devices"]["custom_names"].items()}
+        return antennas, devices
+
+    def put_topology(self, topology):
+        """Record a sim.Topology: node names, host and switch lists, links with their ids and params."""
+        arrays, meta = topology.to_arrays()
+        for name, array in arrays.items():
+            self[f"topology/{name}"] = array
+        self.meta["topology"] = meta
+
+    def topology(self):
+        """Rebuild the Topology recorded by put_topology; node and link ids are preserved."""
+        prefix = "topology/"
+        arrays = {name[len(prefix):]: array for name, array in self.arrays.items() if name.startswith(prefix)}
+        return Topology.from_arrays(arrays, self.meta["topology"])
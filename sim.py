@@ -1,25 +1,344 @@
+import contextlib
+import gc
+import re
+
+import numpy as np
+
+from routing import RoutingTable
+from telemetry import DEBUG, INFO, WARNING, event_type, log
+from traffic import Flow, TrafficSimulator
+
+
+def _format_route_change(src, dst, old, new):
+    before = f"{old * 1000:g}ms" if old is not None else "unreachable"
+    after = f"{new * 1000:g}ms" if new is not None else "unreachable"
+    return f"Route '{src}' -> '{dst}': {before} -> {after}"
+
+
+# Event types recorded by the simulation (see telemetry.py)
+HOST_ADDED = event_type("host_added", DEBUG, "Host '{0}' added.")
+SWITCH_ADDED = event_type("switch_added", DEBUG, "Switch '{0}' added.")
+LINK_ADDED = event_type("link_added", DEBUG, "Link added between '{0}' and '{1}' with params: {2}")
+HOSTS_ADDED = event_type("hosts_added", DEBUG, "{0} hosts added.")
+SWITCHES_ADDED = event_type("switches_added", DEBUG, "{0} switches added.")
+LINKS_ADDED = event_type("links_added", DEBUG, "{0} links added with params: {1}")
+NETWORK_STATUS = event_type("network_status", INFO, "{0}")
+LINK_DOWN = event_type("link_down", INFO, "Simulating failure: Link between '{0}' and '{1}' is down.")
+LINK_DOWN_MISSING = event_type("link_down_missing", WARNING, "No active link found between '{0}' and '{1}'.")
+LINK_UP = event_type("link_up", INFO, "Restoring link: Link between '{0}' and '{1}' is up.")
+LINK_UP_MISSING = event_type("link_up_missing", WARNING, "No link found between '{0}' and '{1}' to restore.")
+DRONE_FLYING = event_type("drone_flying", INFO, "Drone '{0}' flying to location of link between '{1}' and '{2}'...")
+DRONE_REPAIRING = event_type("drone_repairing", INFO, "Drone '{0}' repairing link between '{1}' and '{2}'...")
+DRONE_NOTHING_TO_REPAIR = event_type(
+    "drone_nothing_to_repair", WARNING,
+    "Drone '{0}': Link between '{1}' and '{2}' is already active or does not exist."
+)
+DRONE_RETURNING = event_type("drone_returning", INFO, "Drone '{0}' returning to base...")
+DRONE_ASSIGNED = event_type("drone_assigned", INFO, "Assigning '{0}' for the repair task.")
+DRONE_UNAVAILABLE = event_type("drone_unavailable", WARNING, "No drones are currently available.")
+DEVICE_ADDED = event_type("device_added", DEBUG, "Mobile device '{0}' added to the simulation.")
+DEVICE_CONNECTING = event_type("device_connecting", DEBUG, "Mobile device '{0}' connecting to network through '{1}'...")
+DEVICE_DISCONNECTING = event_type("device_disconnecting", DEBUG, "Mobile device '{0}' disconnecting from network...")
+DEVICE_MOVING = event_type("device_moving", DEBUG, "Mobile device '{0}' moving from '{1}' to '{2}'...")
+DEVICE_NOT_FOUND = event_type("device_not_found", WARNING, "No mobile device named '{0}' found.")
+SIMULATION_STATUS = event_type("simulation_status", INFO, "{0}")
+FAILURE_INJECTED = event_type("failure_injected", INFO, "Simulating network failure...")
+DRONE_DEPLOYING = event_type("drone_deploying", INFO, "Deploying drone to restore network after failure...")
+RESTORE_NO_DRONE = event_type("restore_no_drone", WARNING, "No available drones for restoration.")
+ROUTE_CHANGED = event_type("route_changed", INFO, _format_route_change)
+FLOW_REPORT = event_type("flow_report", INFO, "{0}")
+
+_DELAY_UNITS = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+
+
+def parse_delay(value):
+    """Parse a delay such as '5ms' or '1.5s' (or a number of seconds) into seconds."""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*([0-9.]+)\s*(s|ms|us|ns)?\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid delay: {value!r}")
+    return float(match.group(1)) * _DELAY_UNITS[match.group(2) or "s"]
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while building large acyclic structures."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class Topology:
-    """A generic topology class for network simulation."""
+    """A generic topology class for network simulation.
+
+    Nodes are kept as integer ids with a name table. Links have integer ids
+    and are indexed by their unordered node pair and by node. The public
+    methods take and return node names.
+    """
 
     def __init__(self):
         self.hosts = []
         self.switches = []
-        self.links = []
+        self.node_names = []  # node id -> name
+        self.node_ids = {}  # name -> node id
+        self.node_links = []  # node id -> set of link ids
+        self.link_ends = {}  # link id -> (node id, node id)
+        self.link_params = {}  # link id -> params tuple (shared by links added together)
+        self.pair_index = {}  # unordered node id pair key -> list of link ids (parallel links allowed)
+        self.link_properties_cache = {}  # link id -> (bandwidth bit/s, delay s, loss probability)
+        self.next_link_id = 0
+        self.listeners = []  # Objects with link_state_changed(link_id, active)
+
+    def add_listener(self, listener):
+        """Notify `listener.link_state_changed(link_id, active)` when links are added or removed."""
+        self.listeners.append(listener)
+
+    def node_id(self, name):
+        """Return the integer id of a node, registering the name if it is new."""
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = len(self.node_names)
+            self.node_ids[name] = node_id
+            self.node_names.append(name)
+            self.node_links.append(set())
+        return node_id
+
+    @staticmethod
+    def pair_key(id1, id2):
+        """Key for an unordered pair of node ids."""
+        return (id1 << 32 | id2) if id1 <= id2 else (id2 << 32 | id1)
+
+    def link_list(self):
+        """A new list of all links as (node1, node2, params_tuple), in insertion order.
+
+        Links live in link_ends and link_params; use add_link and remove_link to change them.
+        """
+        names = self.node_names
+        params = self.link_params
+        return [(names[u], names[v], params[link_id]) for link_id, (u, v) in self.link_ends.items()]
+
+    def link_table(self):
+        """A new dict of all links as {link id: (node1, node2, params_tuple)}."""
+        return dict(zip(self.link_ends, self.link_list()))
+
+    def link_ids(self):
+        return self.link_ends.keys()
+
+    def has_link(self, link_id):
+        return link_id in self.link_ends
+
+    def link_nodes(self, link_id):
+        """Return the (node1, node2) names of a link."""
+        u, v = self.link_ends[link_id]
+        return self.node_names[u], self.node_names[v]
 
     def add_host(self, host_name):
+        self.node_id(host_name)
         self.hosts.append(host_name)
-        print(f"Host '{host_name}' added.")
+        log.record(HOST_ADDED, host_name)
         return host_name
 
     def add_switch(self, switch_name):
+        self.node_id(switch_name)
         self.switches.append(switch_name)
-        print(f"Switch '{switch_name}' added.")
+        log.record(SWITCH_ADDED, switch_name)
         return switch_name
 
+    def _add_nodes(self, names):
+        """Register many node names at once, skipping ones that already exist."""
+        node_ids = self.node_ids
+        with _gc_paused():
+            new_names = list(dict.fromkeys(name for name in names if name not in node_ids))
+            first = len(self.node_names)
+            node_ids.update(zip(new_names, range(first, first + len(new_names))))
+            self.node_names.extend(new_names)
+            self.node_links.extend(set() for _ in new_names)
+
+    def add_hosts(self, names):
+        """Add many hosts at once and return their names."""
+        names = list(names)
+        self._add_nodes(names)
+        self.hosts.extend(names)
+        log.record(HOSTS_ADDED, len(names))
+        return names
+
+    def add_switches(self, names):
+        """Add many switches at once and return their names."""
+        names = list(names)
+        self._add_nodes(names)
+        self.switches.extend(names)
+        log.record(SWITCHES_ADDED, len(names))
+        return names
+
     def add_link(self, node1, node2, **params):
+        """Add a link and return its integer id."""
         params_tuple = tuple(params.items())  # Convert params to a tuple of key-value pairs
-        self.links.append((node1, node2, params_tuple))
-        print(f"Link added between '{node1}' and '{node2}' with params: {params}")
+        link_id = self._insert_link(self.node_id(node1), self.node_id(node2), params_tuple)
+        log.record(LINK_ADDED, node1, node2, params)
+        for listener in self.listeners:
+            listener.link_state_changed(link_id, True)
+        return link_id
+
+    def add_links(self, pairs, **params):
+        """Add many links sharing the same params and return their ids.
+
+        `pairs` is a sequence of (node1, node2) names, or an integer NumPy
+        array of shape (N, 2) holding node ids.
+        """
+        params_tuple = tuple(params.items())
+        if hasattr(pairs, "dtype") and pairs.dtype.kind in "iu":
+            ends = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+            if len(ends) and (ends.min() < 0 or ends.max() >= len(self.node_names)):
+                raise ValueError("add_links: node id out of range")
+        else:
+            pairs = list(pairs)
+            self._add_nodes(name for pair in pairs for name in pair)
+            node_ids = self.node_ids
+            ends = np.array([(node_ids[node1], node_ids[node2]) for node1, node2 in pairs], dtype=np.int64).reshape(-1, 2)
+
+        with _gc_paused():
+            first = self.next_link_id
+            link_ids = range(first, first + len(ends))
+            self.next_link_id = link_ids.stop
+            us = ends[:, 0].tolist()
+            vs = ends[:, 1].tolist()
+            self.link_ends.update(zip(link_ids, zip(us, vs)))
+            self.link_params.update(dict.fromkeys(link_ids, params_tuple))
+
+            keys = (np.minimum(ends[:, 0], ends[:, 1]) << 32 | np.maximum(ends[:, 0], ends[:, 1])).tolist()
+            pair_index = self.pair_index
+            if len(set(keys)) == len(keys) and pair_index.keys().isdisjoint(keys):
+                pair_index.update(zip(keys, ([link_id] for link_id in link_ids)))
+            else:
+                for key, link_id in zip(keys, link_ids):
+                    pair_index.setdefault(key, []).append(link_id)
+            node_links = self.node_links
+            for u, v, link_id in zip(us, vs, link_ids):
+                node_links[u].add(link_id)
+                node_links[v].add(link_id)
+
+        log.record(LINKS_ADDED, len(link_ids), params)
+        for listener in self.listeners:
+            for link_id in link_ids:
+                listener.link_state_changed(link_id, True)
+        return link_ids
+
+    def _insert_link(self, u, v, params_tuple):
+        link_id = self.next_link_id
+        self.next_link_id += 1
+        self.link_ends[link_id] = (u, v)
+        self.link_params[link_id] = params_tuple
+        self.pair_index.setdefault(self.pair_key(u, v), []).append(link_id)
+        self.node_links[u].add(link_id)
+        self.node_links[v].add(link_id)
+        return link_id
+
+    def link_properties(self, link_id):
+        """Return (bandwidth in bit/s, delay in seconds, loss probability) for a link.
+
+        Parameters follow Mininet's conventions: `bw` in Mbit/s (unlimited if
+        missing), `delay` as a string like '5ms', and `loss` as a percentage.
+        """
+        properties = self.link_properties_cache.get(link_id)
+        if properties is None:
+            params = dict(self.link_params[link_id])
+            bw = params.get("bw")
+            properties = (
+                float(bw) * 1e6 if bw else float("inf"),
+                parse_delay(params.get("delay")),
+                float(params.get("loss", 0)) / 100.0,
+            )
+            self.link_properties_cache[link_id] = properties
+        return properties
+
+    def other_end(self, link_id, node):
+        """Return the node at the other end of a link."""
+        u, v = self.link_ends[link_id]
+        return self.node_names[v] if self.node_ids[node] == u else self.node_names[u]
+
+    def links_between(self, node1, node2):
+        """Return the ids of all links between two nodes, in either direction."""
+        id1 = self.node_ids.get(node1)
+        id2 = self.node_ids.get(node2)
+        if id1 is None or id2 is None:
+            return []
+        return self.pair_index.get(self.pair_key(id1, id2), [])
+
+    def links_of(self, node):
+        """Return the ids of all links attached to a node."""
+        node_id = self.node_ids.get(node)
+        return self.node_links[node_id] if node_id is not None else frozenset()
+
+    def remove_link(self, link_id):
+        """Remove a link by id."""
+        u, v = self.link_ends.pop(link_id)
+        del self.link_params[link_id]
+        self.link_properties_cache.pop(link_id, None)
+        key = self.pair_key(u, v)
+        parallel = self.pair_index[key]
+        parallel.remove(link_id)
+        if not parallel:
+            del self.pair_index[key]
+        self.node_links[u].discard(link_id)
+        self.node_links[v].discard(link_id)
+        for listener in self.listeners:
+            listener.link_state_changed(link_id, False)
+
+    def remove_node_links(self, node):
+        """Remove every link attached to a node and return their ids."""
+        link_ids = list(self.links_of(node))
+        for link_id in link_ids:
+            self.remove_link(link_id)
+        return link_ids
+
+    def to_arrays(self):
+        """Return (arrays, meta) describing the topology, for saving it; see from_arrays.
+
+        Names are fixed-width string arrays and links are node id pairs.
+        Link params are stored once per distinct params tuple in `meta`,
+        with `link_params` indexing into them.
+        """
+        params = list(dict.fromkeys(self.link_params.values()))
+        params_index = {params_tuple: i for i, params_tuple in enumerate(params)}
+        node_ids = self.node_ids
+        arrays = {
+            "node_names": np.array(self.node_names, dtype=str),
+            "hosts": np.array([node_ids[name] for name in self.hosts], dtype=np.int64),
+            "switches": np.array([node_ids[name] for name in self.switches], dtype=np.int64),
+            "link_ids": np.fromiter(self.link_ends.keys(), dtype=np.int64, count=len(self.link_ends)),
+            "link_ends": np.array(list(self.link_ends.values()), dtype=np.int64).reshape(-1, 2),
+            "link_params": np.array([params_index[p] for p in self.link_params.values()], dtype=np.int32),
+        }
+        meta = {"params": [list(map(list, params_tuple)) for params_tuple in params], "next_link_id": self.next_link_id}
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        """Rebuild a topology saved with to_arrays, keeping node and link ids."""
+        topology = cls()
+        names = arrays["node_names"].tolist()
+        topology._add_nodes(names)
+        topology.hosts = [names[i] for i in arrays["hosts"].tolist()]
+        topology.switches = [names[i] for i in arrays["switches"].tolist()]
+
+        # add_links numbers links consecutively, so feed it runs of consecutive ids that share params
+        link_ids = arrays["link_ids"]
+        which = arrays["link_params"]
+        params = [dict(map(tuple, params_tuple)) for params_tuple in meta["params"]]
+        breaks = np.flatnonzero((np.diff(link_ids) != 1) | (np.diff(which) != 0)) + 1
+        for run in np.split(np.arange(len(link_ids)), breaks):
+            if len(run):
+                topology.next_link_id = int(link_ids[run[0]])
+                topology.add_links(np.asarray(arrays["link_ends"][run]), **params[which[run[0]]])
+        topology.next_link_id = meta["next_link_id"]
+        return topology
 
 
 class Network:
@@ -28,37 +347,79 @@ class Network:
     def __init__(self, topology):
         self.topology = topology
         self.status = "Initialized"
-        self.active_links = {link: True for link in self.topology.links}
+        self.active_links = dict.fromkeys(self.topology.link_ids(), True)
+        self.listeners = []  # Objects with link_state_changed(link_id, active)
 
     def start(self):
         """Start the network simulation."""
         self.status = "Network simulation started"
-        print(self.status)
+        log.record(NETWORK_STATUS, self.status)
+
+    def add_listener(self, listener):
+        """Notify `listener.link_state_changed(link_id, active)` when a link goes down or up."""
+        self.listeners.append(listener)
+
+    def _set_link_state(self, link_id, active):
+        if self.is_link_active(link_id) == active:
+            self.active_links[link_id] = active
+            return
+        self.active_links[link_id] = active
+        for listener in self.listeners:
+            listener.link_state_changed(link_id, active)
+
+    def is_link_active(self, link_id):
+        """Links added after the network was created start out active."""
+        return self.active_links.get(link_id, True)
+
+    def fail_link(self, link_id):
+        """Take a link down by id."""
+        self._set_link_state(link_id, False)
+
+    def recover_link(self, link_id):
+        """Bring a link back up by id."""
+        self._set_link_state(link_id, True)
+
+    def fail_links(self, link_ids):
+        """Take many links down at once."""
+        if not self.listeners:
+            self.active_links.update(dict.fromkeys(link_ids, False))
+            return
+        for link_id in link_ids:
+            self._set_link_state(link_id, False)
+
+    def find_link(self, node1, node2, active):
+        """Return the first link between two nodes in the given state, or None."""
+        for link_id in self.topology.links_between(node1, node2):
+            if self.is_link_active(link_id) == active:
+                return link_id
+        return None
 
     def simulate_failure(self, node1, node2):
         """Simulate a failure between two nodes."""
-        for link in self.topology.links:
-            if (node1, node2) == link[:2]:
-                self.active_links[link] = False
-                print(f"Simulating failure: Link between '{node1}' and '{node2}' is down.")
-                self.status = f"Link between '{node1}' and '{node2}' disabled"
-                return
-        print(f"No active link found between '{node1}' and '{node2}'.")
+        link_id = self.find_link(node1, node2, active=True)
+        if link_id is not None:
+            self.fail_link(link_id)
+            log.record(LINK_DOWN, node1, node2)
+            self.status = f"Link between '{node1}' and '{node2}' disabled"
+            return
+        log.record(LINK_DOWN_MISSING, node1, node2)
 
     def restore_link(self, node1, node2):
         """Restore the link between two nodes."""
-        for link in self.topology.links:
-            if (node1, node2) == link[:2]:
-                self.active_links[link] = True
-                print(f"Restoring link: Link between '{node1}' and '{node2}' is up.")
-                self.status = f"Link between '{node1}' and '{node2}' restored."
-                return
-        print(f"No link found between '{node1}' and '{node2}' to restore.")
+        link_ids = self.topology.links_between(node1, node2)
+        if link_ids:
+            # Prefer a link that is actually down when parallel links exist
+            link_id = self.find_link(node1, node2, active=False)
+            self.recover_link(link_id if link_id is not None else link_ids[0])
+            log.record(LINK_UP, node1, node2)
+            self.status = f"Link between '{node1}' and '{node2}' restored."
+            return
+        log.record(LINK_UP_MISSING, node1, node2)
 
     def stop(self):
         """Stop the network simulation."""
         self.status = "Network simulation stopped"
-        print(self.status)
+        log.record(NETWORK_STATUS, self.status)
 
     def get_status(self):
         """Get the current status of the network."""
@@ -74,22 +435,21 @@ class Drone:
 
     def fly_to_location(self, node1, node2):
         """Simulate the drone flying to the location of the broken link."""
-        print(f"Drone '{self.name}' flying to location of link between '{node1}' and '{node2}'...")
+        log.record(DRONE_FLYING, self.name, node1, node2)
         self.status = "In Transit"
 
     def repair_link(self, network, node1, node2):
         """Simulate the drone repairing the broken link."""
-        for link in network.topology.links:
-            if (node1, node2) == link[:2] and not network.active_links[link]:
-                print(f"Drone '{self.name}' repairing link between '{node1}' and '{node2}'...")
-                network.restore_link(node1, node2)
-                self.status = "Repair Completed"
-                return
-        print(f"Drone '{self.name}': Link between '{node1}' and '{node2}' is already active or does not exist.")
+        if network.find_link(node1, node2, active=False) is not None:
+            log.record(DRONE_REPAIRING, self.name, node1, node2)
+            network.restore_link(node1, node2)
+            self.status = "Repair Completed"
+            return
+        log.record(DRONE_NOTHING_TO_REPAIR, self.name, node1, node2)
 
     def return_to_base(self):
         """Simulate the drone returning to base."""
-        print(f"Drone '{self.name}' returning to base...")
+        log.record(DRONE_RETURNING, self.name)
         self.status = "Ready"
 
 
@@ -103,21 +463,20 @@ class MobileDevice:
 
     def connect_to_network(self, network, node):
         """Connect the mobile device to the network via a node."""
-        print(f"Mobile device '{self.name}' connecting to network through '{node}'...")
+        log.record(DEVICE_CONNECTING, self.name, node)
         self.status = "Connected"
         network.topology.add_link(self.name, node, bw=10, delay="1ms", loss=0)
 
     def disconnect_from_network(self, network):
         """Disconnect the mobile device from the network."""
-        print(f"Mobile device '{self.name}' disconnecting from network...")
+        log.record(DEVICE_DISCONNECTING, self.name)
         self.status = "Disconnected"
-        network.topology.links = [
-            link for link in network.topology.links if self.name not in link[:2]
-        ]
+        for link_id in network.topology.remove_node_links(self.name):
+            network.active_links.pop(link_id, None)
 
     def move(self, new_position):
         """Simulate the mobile device moving to a new position."""
-        print(f"Mobile device '{self.name}' moving from '{self.position}' to '{new_position}'...")
+        log.record(DEVICE_MOVING, self.name, self.position, new_position)
         self.position = new_position
 
 
@@ -126,40 +485,47 @@ class SimulationManager:
 
     def __init__(self):
         self.network = None
+        self.routing = None
         self.simulation_status = "Initialized"
         self.drones = [Drone(f"Drone-{i}") for i in range(1, 3)]
         self.mobile_devices = []
 
-    def start_simulation(self):
-        """Starts the network simulation."""
-        topology = self.build_topology()
+    def start_simulation(self, topology=None):
+        """Starts the network simulation, on the built-in topology unless one is given."""
+        if topology is None:
+            topology = self.build_topology()
         self.network = Network(topology)
+        self.routing = RoutingTable(self.network)
+        for host in topology.hosts:
+            self.routing.tree(host)
         self.network.start()
         self.simulation_status = "Simulation started"
-        print(self.simulation_status)
+        log.record(SIMULATION_STATUS, self.simulation_status)
 
     def simulate_failure(self):
         """Simulates a network failure."""
-        print("Simulating network failure...")
+        log.record(FAILURE_INJECTED)
         self.network.simulate_failure("s1", "s2")
+        self.report_route_changes()
 
     def restore_network_with_drone(self):
         """Restores the network after failure using a drone."""
-        print("Deploying drone to restore network after failure...")
+        log.record(DRONE_DEPLOYING)
         drone = self.assign_drone()
         if drone:
             drone.fly_to_location("s1", "s2")
             drone.repair_link(self.network, "s1", "s2")
+            self.report_route_changes()
             drone.return_to_base()
         else:
-            print("No available drones for restoration.")
+            log.record(RESTORE_NO_DRONE)
 
     def stop_simulation(self):
         """Stops the network simulation."""
         if self.network:
             self.network.stop()
         self.simulation_status = "Simulation stopped"
-        print(self.simulation_status)
+        log.record(SIMULATION_STATUS, self.simulation_status)
 
     def build_topology(self):
         """Builds the generic network topology."""
@@ -176,20 +542,40 @@ class SimulationManager:
         topo.add_link(s1, s2, bw=100, delay="20ms", loss=0)  # Backup link
         return topo
 
+    def report_route_changes(self):
+        """Record and return the host pairs whose path delay changed or that lost connectivity."""
+        changes = self.routing.host_pair_changes()
+        for src, dst, old, new in changes:
+            log.record(ROUTE_CHANGED, src, dst, old, new)
+        return changes
+
+    def measure_traffic(self, rate=10.0, duration=1.0, seed=None):
+        """Send constant-rate traffic between every pair of hosts and report per-flow latency and throughput."""
+        simulator = TrafficSimulator(self.network, seed=seed, routing=self.routing)
+        hosts = self.network.topology.hosts
+        for src in hosts:
+            for dst in hosts:
+                if src != dst:
+                    simulator.add_flow(Flow(src, dst, rate=rate, duration=duration))
+        results = simulator.run()
+        for flow_stats in results.values():
+            log.record(FLOW_REPORT, flow_stats)
+        return results
+
     def assign_drone(self):
         """Assigns an available drone for the task."""
         for drone in self.drones:
             if drone.status == "Ready":
-                print(f"Assigning '{drone.name}' for the repair task.")
+                log.record(DRONE_ASSIGNED, drone.name)
                 return drone
-        print("No drones are currently available.")
+        log.record(DRONE_UNAVAILABLE)
         return None
 
     def add_mobile_device(self, name, position=None):
         """Adds a mobile device to the simulation."""
         device = MobileDevice(name, position)
         self.mobile_devices.append(device)
-        print(f"Mobile device '{name}' added to the simulation.")
+        log.record(DEVICE_ADDED, name)
         return device
 
     def simulate_mobile_device_connection(self, device_name, node_name):
@@ -198,7 +584,7 @@ class SimulationManager:
         if device:
             device.connect_to_network(self.network, node_name)
         else:
-            print(f"No mobile device named '{device_name}' found.")
+            log.record(DEVICE_NOT_FOUND, device_name)
 
     def simulate_mobile_device_disconnection(self, device_name):
         """Simulate a mobile device disconnecting from the network."""
@@ -206,7 +592,7 @@ class SimulationManager:
         if device:
             device.disconnect_from_network(self.network)
         else:
-            print(f"No mobile device named '{device_name}' found.")
+            log.record(DEVICE_NOT_FOUND, device_name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+import math
+
+
+class GridIndex:
+    """A uniform grid over 2D points, used to find nearby items without scanning them all.
+
+    Suited to incremental lookups on individual items (gui.py, connectivity
+    and bridging). Bulk device association in main.py goes through
+    coverage.CoverageEngine instead, which works on position arrays.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = max(float(cell_size), 1.0)
+        self.cells = {}  # (cx, cy) -> list of (item, x, y)
+        self.size = 0
+
+    def cell_of(self, position):
+        """Return the grid cell that contains the given (x, y) position."""
+        x, y = position
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def insert(self, item, position):
+        """Add an item at the given position."""
+        x, y = position
+        self.cells.setdefault(self.cell_of(position), []).append((item, x, y))
+        self.size += 1
+
+    def remove(self, item, position):
+        """Remove an item previously inserted at the given position."""
+        cell = self.cell_of(position)
+        bucket = self.cells.get(cell)
+        if not bucket:
+            return False
+        for i, entry in enumerate(bucket):
+            if entry[0] is item:
+                bucket.pop(i)
+                if not bucket:
+                    del self.cells[cell]
+                self.size -= 1
+                return True
+        return False
+
+    def clear(self):
+        """Remove every item from the index."""
+        self.cells = {}
+        self.size = 0
+
+    def rebuild(self, cell_size):
+        """Re-bucket all items using a new cell size."""
+        entries = [entry for bucket in self.cells.values() for entry in bucket]
+        self.cell_size = max(float(cell_size), 1.0)
+        self.clear()
+        for item, x, y in entries:
+            self.insert(item, (x, y))
+
+    def query_radius(self, position, radius):
+        """Return all items within `radius` of the position (inclusive)."""
+        x, y = position
+        r2 = radius * radius
+        cx0, cy0 = self.cell_of((x - radius, y - radius))
+        cx1, cy1 = self.cell_of((x + radius, y + radius))
+        found = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for item, px, py in bucket:
+                    dx = px - x
+                    dy = py - y
+                    if dx * dx + dy * dy <= r2:
+                        found.append(item)
+        return found
+
+    def __len__(self):
+        return self.size
+
+
+class KDTree:
+    """A static 2D k-d tree over a list of (x, y) points.
+
+    Nodes are stored in flat lists in pre-order, so children always come after
+    their parent. Each node keeps its bounding box, which is what the nearest
+    neighbour searches prune on.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, points):
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.order = list(range(len(self.points)))  # point indices, grouped by node
+        self.lo = []
+        self.hi = []
+        self.left = []
+        self.right = []
+        self.split_dim = []
+        self.split_value = []
+        self.bbox = []  # (min_x, min_y, max_x, max_y)
+        if self.points:
+            self._build()
+
+    def _new_node(self, lo, hi):
+        coords = [self.points[i] for i in self.order[lo:hi]]
+        xs = [p[0] for p in coords]
+        ys = [p[1] for p in coords]
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.split_dim.append(0)
+        self.split_value.append(0.0)
+        self.bbox.append((min(xs), min(ys), max(xs), max(ys)))
+        return len(self.lo) - 1
+
+    def _build(self):
+        stack = [self._new_node(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            lo, hi = self.lo[node], self.hi[node]
+            if hi - lo <= self.LEAF_SIZE:
+                continue
+            min_x, min_y, max_x, max_y = self.bbox[node]
+            dim = 0 if max_x - min_x >= max_y - min_y else 1
+            self.order[lo:hi] = sorted(self.order[lo:hi], key=lambda i: self.points[i][dim])
+            mid = (lo + hi) // 2
+            self.split_dim[node] = dim
+            self.split_value[node] = self.points[self.order[mid]][dim]
+            self.left[node] = self._new_node(lo, mid)
+            self.right[node] = self._new_node(mid, hi)
+            stack.append(self.left[node])
+            stack.append(self.right[node])
+
+    def node_labels(self, labels):
+        """Return, per node, the label shared by all its points, or None if they differ."""
+        result = [None] * len(self.lo)
+        for node in range(len(self.lo) - 1, -1, -1):
+            if self.left[node] < 0:
+                members = self.order[self.lo[node]:self.hi[node]]
+                first = labels[members[0]]
+                if all(labels[i] == first for i in members):
+                    result[node] = first
+            else:
+                left_label = result[self.left[node]]
+                if left_label is not None and left_label == result[self.right[node]]:
+                    result[node] = left_label
+        return result
+
+    def nearest_with_other_label(self, index, labels, node_labels, bound=float('inf')):
+        """Find the closest point whose label differs from point `index`'s label.
+
+        `node_labels` comes from `node_labels(labels)` and lets whole subtrees of
+        the same label be skipped. Only points closer than `bound` (a squared
+        distance) are considered. Returns (squared distance, point index), with
+        index -1 if nothing closer than the bound was found.
+        """
+        x, y = self.points[index]
+        own = labels[index]
+        best, best_index = bound, -1
+        points, order, bbox = self.points, self.order, self.bbox
+        stack = [0] if self.lo else []
+        while stack:
+            node = stack.pop()
+            if node_labels[node] == own:
+                continue
+            min_x, min_y, max_x, max_y = bbox[node]
+            dx = min_x - x if x < min_x else (x - max_x if x > max_x else 0.0)
+            dy = min_y - y if y < min_y else (y - max_y if y > max_y else 0.0)
+            if dx * dx + dy * dy >= best:
+                continue
+            left = self.left[node]
+            if left < 0:
+                for k in range(self.lo[node], self.hi[node]):
+                    j = order[k]
+                    if labels[j] != own:
+                        px, py = points[j]
+                        d2 = (px - x) * (px - x) + (py - y) * (py - y)
+                        if d2 < best:
+                            best, best_index = d2, j
+            else:
+                right = self.right[node]
+                coord = x if self.split_dim[node] == 0 else y
+                # Visit the child on the query's side first (pushed last)
+                if coord < self.split_value[node]:
+                    stack.append(right)
+                    stack.append(left)
+                else:
+                    stack.append(left)
+                    stack.append(right)
+        return best, best_index
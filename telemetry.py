@@ -0,0 +1,211 @@
+import atexit
+import json
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Registered event types, indexed by their integer code
+_names = []
+_levels = []
+_formats = []
+
+
+def event_type(name, level, template):
+    """Register an event type and return its integer code.
+
+    `template` is a str.format template applied to the event's arguments, or
+    a callable taking the arguments and returning the message. Either way it
+    only runs when someone reads or prints the event.
+    """
+    _names.append(name)
+    _levels.append(level)
+    _formats.append(template)
+    return len(_names) - 1
+
+
+def format_event(code, args):
+    """Build the human-readable message for an event."""
+    template = _formats[code]
+    if callable(template):
+        return template(*args)
+    return template.format(*args)
+
+
+class Event:
+    """A recorded event, formatted on demand."""
+
+    __slots__ = ("time", "code", "args")
+
+    def __init__(self, time, code, args):
+        self.time = time
+        self.code = code
+        self.args = args
+
+    @property
+    def name(self):
+        return _names[self.code]
+
+    @property
+    def level(self):
+        return _levels[self.code]
+
+    @property
+    def message(self):
+        return format_event(self.code, self.args)
+
+    def to_dict(self):
+        return {
+            "time": self.time,
+            "event": self.name,
+            "level": LEVEL_NAMES.get(self.level, self.level),
+            "args": list(self.args),
+            "message": self.message,
+        }
+
+    def __repr__(self):
+        return f"Event({self.name}: {self.message})"
+
+
+class ConsoleSink:
+    """Print each event's message as it is recorded."""
+
+    def emit(self, timestamp, code, args):
+        print(format_event(code, args))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """Append events to a JSON Lines file, formatting and writing them in batches.
+
+    The last partial batch is only written by flush() or close(). The
+    process-wide log closes its sink at exit; close other sinks yourself.
+    """
+
+    def __init__(self, path, batch_size=4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.file = open(path, "a", encoding="utf-8")
+
+    def emit(self, timestamp, code, args):
+        self.pending.append((timestamp, code, args))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        lines = [json.dumps(Event(*entry).to_dict(), default=str) for entry in self.pending]
+        self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class EventLog:
+    """Typed events in a preallocated ring buffer, with an optional sink.
+
+    Recording an event stores its code, arguments and timestamp in the ring;
+    no string is built unless a sink or reader asks for it. Events below
+    `level` are dropped before being stored.
+    """
+
+    def __init__(self, capacity=65536, level=INFO, sink=None):
+        self.capacity = capacity
+        self.level = level
+        self.sink = sink
+        self.times = [0.0] * capacity
+        self.codes = [0] * capacity
+        self.args = [()] * capacity
+        self.count = 0  # Total events recorded, including overwritten ones
+
+    def record(self, code, *args):
+        """Record an event of the given type."""
+        if _levels[code] < self.level:
+            return
+        timestamp = time.time()
+        slot = self.count % self.capacity
+        self.times[slot] = timestamp
+        self.codes[slot] = code
+        self.args[slot] = args
+        self.count += 1
+        if self.sink is not None:
+            self.sink.emit(timestamp, code, args)
+
+    def enabled(self, code):
+        """Return True if events of this type are currently recorded."""
+        return _levels[code] >= self.level
+
+    def events(self):
+        """Return the buffered events, oldest first."""
+        start = max(0, self.count - self.capacity)
+        return [
+            Event(self.times[i % self.capacity], self.codes[i % self.capacity], self.args[i % self.capacity])
+            for i in range(start, self.count)
+        ]
+
+    def messages(self):
+        """Return the formatted messages of the buffered events."""
+        return [event.message for event in self.events()]
+
+    def clear(self):
+        self.count = 0
+
+    def resize(self, capacity):
+        """Reallocate the ring buffer with a new capacity, dropping buffered events."""
+        self.capacity = capacity
+        self.times = [0.0] * capacity
+        self.codes = [0] * capacity
+        self.args = [()] * capacity
+        self.count = 0
+
+    def set_sink(self, sink):
+        """Replace the sink, closing the previous one."""
+        if self.sink is not None:
+            self.sink.close()
+        self.sink = sink
+
+    def flush(self):
+        if self.sink is not None:
+            self.sink.flush()
+
+
+# Process-wide log used by the simulation modules
+log = EventLog()
+
+
+def _close_sink():
+    log.set_sink(None)  # Writes out the sink's last partial batch
+
+
+atexit.register(_close_sink)
+
+
+def configure(level=None, sink=None, capacity=None):
+    """Adjust the process-wide log. `sink` may be "none", "console", a .jsonl path, or a sink object."""
+    if capacity is not None and capacity != log.capacity:
+        log.resize(capacity)
+    if level is not None:
+        log.level = level
+    if sink is not None:
+        if sink == "none":
+            sink = None
+        elif sink == "console":
+            sink = ConsoleSink()
+        elif isinstance(sink, str):
+            sink = JsonlSink(sink)
+        log.set_sink(sink)
+    return log
@@ -0,0 +1,329 @@
+import math
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from propagation import dbm_to_mw, mw_to_dbm
+
+METRES_PER_DEGREE = 111320.0
+TILE_SIZE = 256
+# Per-cell layers stored for every tile
+LAYERS = (("best_mw", np.float32), ("total_mw", np.float32), ("best_key", np.int32))
+TILE_DTYPE = np.dtype(list(LAYERS))
+
+
+class RasterTile:
+    """One tile's layers: strongest received power and total power (mW) and the strongest antenna's key (-1 if none)."""
+
+    __slots__ = ("best_mw", "total_mw", "best_key")
+
+    def __init__(self, best_mw, total_mw, best_key):
+        self.best_mw = best_mw
+        self.total_mw = total_mw
+        self.best_key = best_key
+
+
+class TileLevel:
+    """One level of the pyramid: `tiles_y` x `tiles_x` tiles of `cell_m` cells, stored on disk.
+
+    Each computed tile is its own small .npy file holding the layers as one
+    structured array, memory-mapped when read back, so disk use grows with
+    the tiles actually viewed rather than the size of the level. Files only
+    count where `valid` is set.
+    """
+
+    def __init__(self, directory, index, cell_m, tiles_y, tiles_x, tile_size):
+        self.directory = directory
+        self.index = index
+        self.cell_m = cell_m
+        self.tiles_y = tiles_y
+        self.tiles_x = tiles_x
+        self.tile_size = tile_size
+        self.valid = np.zeros((tiles_y, tiles_x), dtype=bool)
+
+    def _path(self, ty, tx):
+        return os.path.join(self.directory, f"level{self.index}-{ty}-{tx}.npy")
+
+    def read(self, ty, tx):
+        """Map a stored tile read-only; its pages are read from disk as they are used."""
+        data = np.load(self._path(ty, tx), mmap_mode="r")
+        return RasterTile(*(data[name] for name, _ in LAYERS))
+
+    def write(self, ty, tx, tile):
+        data = np.empty((self.tile_size, self.tile_size), dtype=TILE_DTYPE)
+        for name, _ in LAYERS:
+            data[name] = getattr(tile, name)
+        # Write beside and swap in, so maps of an older version of the tile stay valid
+        path = self._path(ty, tx)
+        np.save(path + ".tmp.npy", data)
+        os.replace(path + ".tmp.npy", path)
+        self.valid[ty, tx] = True
+
+    def tile_range(self, x_min, y_min, x_max, y_max):
+        """(row slice, col slice) of the tiles overlapping a box in projected metres."""
+        span = self.cell_m * self.tile_size
+        tx0 = min(max(int(x_min // span), 0), self.tiles_x)
+        tx1 = min(max(int(x_max // span) + 1, 0), self.tiles_x)
+        ty0 = min(max(int(y_min // span), 0), self.tiles_y)
+        ty1 = min(max(int(y_max // span) + 1, 0), self.tiles_y)
+        return slice(ty0, ty1), slice(tx0, tx1)
+
+
+class TiledSignalMap:
+    """Best-server signal and SINR over a whole country, computed lazily as fixed-size tiles.
+
+    The area is covered by a pyramid of levels: level L has cells 2**L times
+    `cell_m`, up to a level that fits in one tile, so a national view reads
+    a few coarse tiles and a street view a few fine ones. Tiles are kept
+    as files in a scratch directory of their own under `directory`, removed
+    by `close`; a tile is computed the first time it is requested and
+    read back from disk afterwards. The last `cache_tiles` tiles used are
+    also held in memory. Adding, moving or removing an antenna invalidates
+    only the tiles within its reach, on every level.
+
+    Positions are (lon, lat) and distances use a local equirectangular
+    projection, which is accurate enough at country scale. Methods may be
+    called from several threads.
+    """
+
+    def __init__(self, bounds, model, directory, cell_m=100.0, tile_size=TILE_SIZE, cache_tiles=128,
+                 noise_dbm=-104.0, floor_dbm=-120.0, contains=None):
+        min_lon, min_lat, max_lon, max_lat = bounds
+        self.bounds = bounds
+        self.model = model
+        self.tile_size = tile_size
+        self.cache_tiles = cache_tiles
+        self.noise_dbm = noise_dbm
+        self.floor_dbm = floor_dbm
+        self.contains = contains  # Vectorized contains(lons, lats); cells outside get no signal
+        # Projected metres: x east from min_lon, y south from max_lat, so rows run like image rows
+        self.metres_per_lon = METRES_PER_DEGREE * math.cos(math.radians((min_lat + max_lat) / 2))
+        self.width_m = (max_lon - min_lon) * self.metres_per_lon
+        self.height_m = (max_lat - min_lat) * METRES_PER_DEGREE
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="tiles-", dir=directory)
+        self.levels = []
+        while True:
+            cell = cell_m * 2 ** len(self.levels)
+            span = cell * tile_size
+            tiles_y, tiles_x = max(math.ceil(self.height_m / span), 1), max(math.ceil(self.width_m / span), 1)
+            self.levels.append(TileLevel(self.directory, len(self.levels), cell, tiles_y, tiles_x, tile_size))
+            if tiles_y == tiles_x == 1:
+                break
+
+        self.sources = {}  # key -> (x, y, power_dbm, reach) in projected metres
+        self._columns = None  # Sources as arrays, rebuilt after changes
+        self.cache = OrderedDict()  # (level, ty, tx) -> RasterTile, least recently used first
+        self.lock = threading.RLock()
+        self.computed = 0
+        self.loaded = 0
+        self.hits = 0
+        self.invalidated = 0
+
+    def project(self, lon, lat):
+        """(lon, lat) -> projected (x, y) metres; works on scalars and arrays."""
+        return (lon - self.bounds[0]) * self.metres_per_lon, (self.bounds[3] - lat) * METRES_PER_DEGREE
+
+    def unproject(self, x, y):
+        return x / self.metres_per_lon + self.bounds[0], self.bounds[3] - y / METRES_PER_DEGREE
+
+    def _reach(self, power_dbm):
+        return self.model.reach(power_dbm - self.floor_dbm + 3 * self.model.shadowing_db)
+
+    def set_antenna(self, key, lon, lat, power_dbm):
+        """Add an antenna under an integer key, or move it / change its power."""
+        x, y = self.project(float(lon), float(lat))
+        with self.lock:
+            old = self.sources.get(key)
+            if old is not None and old[:3] == (x, y, float(power_dbm)):
+                return
+            if old is not None:
+                self._invalidate(*old)
+            source = (x, y, float(power_dbm), self._reach(power_dbm))
+            self.sources[key] = source
+            self._columns = None
+            self._invalidate(*source)
+
+    def remove_antenna(self, key):
+        """Drop an antenna; unknown keys are ignored."""
+        with self.lock:
+            old = self.sources.pop(key, None)
+            if old is not None:
+                self._columns = None
+                self._invalidate(*old)
+
+    def set_model(self, model):
+        """Switch path-loss model; every tile is invalidated."""
+        with self.lock:
+            if model == self.model:
+                return
+            self.model = model
+            self.sources = {key: (x, y, power, self._reach(power)) for key, (x, y, power, _) in self.sources.items()}
+            self._columns = None
+            for level in self.levels:
+                self.invalidated += int(level.valid.sum())
+                level.valid[:] = False
+            self.cache.clear()
+
+    def _invalidate(self, x, y, power_dbm, reach):
+        for level in self.levels:
+            rows, cols = level.tile_range(x - reach, y - reach, x + reach, y + reach)
+            self.invalidated += int(level.valid[rows, cols].sum())
+            level.valid[rows, cols] = False
+            for key in [key for key in self.cache if key[0] == level.index
+                        and rows.start <= key[1] < rows.stop and cols.start <= key[2] < cols.stop]:
+                del self.cache[key]
+
+    def tile(self, level, ty, tx):
+        """Return the RasterTile at (ty, tx) of a level, from the cache, the disk, or computed."""
+        with self.lock:
+            key = (level, ty, tx)
+            tile = self.cache.get(key)
+            if tile is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return tile
+            tile_level = self.levels[level]
+            if tile_level.valid[ty, tx]:
+                tile = tile_level.read(ty, tx)
+                self.loaded += 1
+            else:
+                tile = self._compute(tile_level, ty, tx)
+                tile_level.write(ty, tx, tile)
+                self.computed += 1
+            self.cache[key] = tile
+            if len(self.cache) > self.cache_tiles:
+                self.cache.popitem(last=False)
+            return tile
+
+    def _compute(self, level, ty, tx):
+        size = self.tile_size
+        cell = level.cell_m
+        x0, y0 = tx * size * cell, ty * size * cell
+        xs = x0 + (np.arange(size) + 0.5) * cell  # Cell centres
+        ys = y0 + (np.arange(size) + 0.5) * cell
+        best = np.zeros((size, size), dtype=np.float32)
+        total = np.zeros((size, size), dtype=np.float64)
+        best_key = np.full((size, size), -1, dtype=np.int32)
+
+        if self._columns is None:
+            keys = np.fromiter(self.sources, dtype=np.int64, count=len(self.sources))
+            values = np.array(list(self.sources.values()), dtype=np.float64).reshape(-1, 4)
+            self._columns = keys, values
+        keys, values = self._columns
+        ax, ay, reach = values[:, 0], values[:, 1], values[:, 3]
+        span = size * cell
+        near = np.flatnonzero((ax + reach >= x0) & (ax - reach <= x0 + span) & (ay + reach >= y0) & (ay - reach <= y0 + span))
+
+        model = self.model
+        for i in near.tolist():
+            x, y, power_dbm, radius = values[i]
+            # Only the cells within reach of the antenna
+            c0, c1 = max(int((x - radius - x0) // cell), 0), min(int((x + radius - x0) // cell) + 1, size)
+            r0, r1 = max(int((y - radius - y0) // cell), 0), min(int((y + radius - y0) // cell) + 1, size)
+            if c0 >= c1 or r0 >= r1:
+                continue
+            rx_dbm = power_dbm - model.loss(np.hypot(ys[r0:r1, None] - y, xs[None, c0:c1] - x))
+            if model.shadowing_db:
+                rng = np.random.default_rng((model.seed, int(keys[i]), level.index, ty, tx))
+                rx_dbm = rx_dbm + rng.normal(0.0, model.shadowing_db, rx_dbm.shape)
+            mw = dbm_to_mw(rx_dbm)
+            mw[rx_dbm < self.floor_dbm] = 0
+            total[r0:r1, c0:c1] += mw
+            window = best[r0:r1, c0:c1]
+            stronger = mw > window
+            window[stronger] = mw[stronger]
+            best_key[r0:r1, c0:c1][stronger] = keys[i]
+
+        if self.contains is not None and len(near):
+            grid_x, grid_y = np.meshgrid(xs, ys)
+            outside = ~np.asarray(self.contains(*self.unproject(grid_x.ravel(), grid_y.ravel())), dtype=bool).reshape(size, size)
+            best[outside] = 0
+            total[outside] = 0
+            best_key[outside] = -1
+        return RasterTile(best, total.astype(np.float32), best_key)
+
+    def _gather(self, level, rows, cols):
+        """Read cells (rows[i], cols[j]) of a level into (len(rows), len(cols)) layers; -1 indices stay empty."""
+        best = np.zeros((len(rows), len(cols)), dtype=np.float32)
+        total = np.zeros_like(best)
+        best_key = np.full(best.shape, -1, dtype=np.int32)
+        size = self.tile_size
+        row_tiles, col_tiles = np.where(rows >= 0, rows // size, -1), np.where(cols >= 0, cols // size, -1)
+        for ty in np.unique(row_tiles[row_tiles >= 0]).tolist():
+            in_rows = np.flatnonzero(row_tiles == ty)
+            for tx in np.unique(col_tiles[col_tiles >= 0]).tolist():
+                in_cols = np.flatnonzero(col_tiles == tx)
+                tile = self.tile(level, ty, tx)
+                cells = np.ix_(rows[in_rows] % size, cols[in_cols] % size)
+                target = np.ix_(in_rows, in_cols)
+                best[target] = tile.best_mw[cells]
+                total[target] = tile.total_mw[cells]
+                best_key[target] = tile.best_key[cells]
+        return best, total, best_key
+
+    def _cells(self, level, xs, ys):
+        """Level cell indices of projected coordinates, -1 outside the area."""
+        cell = self.levels[level].cell_m
+        cols = np.floor(xs / cell).astype(np.int64)
+        rows = np.floor(ys / cell).astype(np.int64)
+        cols[(xs < 0) | (xs >= self.width_m)] = -1
+        rows[(ys < 0) | (ys >= self.height_m)] = -1
+        return rows, cols
+
+    def level_for(self, metres_per_pixel):
+        """The coarsest level whose cells are no larger than a pixel (level 0 when zoomed in further)."""
+        ratio = metres_per_pixel / self.levels[0].cell_m
+        return min(max(int(math.floor(math.log2(ratio))) if ratio > 0 else 0, 0), len(self.levels) - 1)
+
+    def viewport(self, min_lon, min_lat, max_lon, max_lat, width, height):
+        """Render a (lon, lat) box at width x height pixels.
+
+        Returns (level, best-server dBm, SINR dB, best key), each a
+        (height, width) array with row 0 at the north edge. Only the tiles
+        under the viewport are touched, on the level matching its zoom.
+        """
+        x_min, y_max = self.project(min_lon, min_lat)
+        x_max, y_min = self.project(max_lon, max_lat)
+        level = self.level_for(min((x_max - x_min) / width, (y_max - y_min) / height))
+        xs = x_min + (np.arange(width) + 0.5) * (x_max - x_min) / width
+        ys = y_min + (np.arange(height) + 0.5) * (y_max - y_min) / height
+        rows, _ = self._cells(level, np.zeros_like(ys), ys)
+        _, cols = self._cells(level, xs, np.zeros_like(xs))
+        best, total, best_key = self._gather(level, rows, cols)
+        best = best.astype(np.float64)
+        interference = np.maximum(total - best, 0) + dbm_to_mw(self.noise_dbm)
+        return level, mw_to_dbm(best), mw_to_dbm(best / interference), best_key
+
+    def sample(self, lons, lats):
+        """Return (best key, best-server dBm, SINR dB) at points, read from the finest level."""
+        xs, ys = self.project(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        rows, cols = self._cells(0, np.atleast_1d(xs), np.atleast_1d(ys))
+        best = np.zeros(len(rows), dtype=np.float64)
+        total = np.zeros(len(rows), dtype=np.float64)
+        best_key = np.full(len(rows), -1, dtype=np.int64)
+        size = self.tile_size
+        inside = np.flatnonzero((rows >= 0) & (cols >= 0))
+        tile_ids = rows[inside] // size * self.levels[0].tiles_x + cols[inside] // size
+        order = np.argsort(tile_ids, kind="stable")
+        bounds = np.flatnonzero(np.diff(tile_ids[order], prepend=-1, append=-1) != 0)
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            points = inside[order[start:stop]]
+            tile = self.tile(0, int(rows[points[0]] // size), int(cols[points[0]] // size))
+            cells = rows[points] % size, cols[points] % size
+            best[points] = tile.best_mw[cells]
+            total[points] = tile.total_mw[cells]
+            best_key[points] = tile.best_key[cells]
+        interference = np.maximum(total - best, 0) + dbm_to_mw(self.noise_dbm)
+        return best_key, mw_to_dbm(best), mw_to_dbm(best / interference)
+
+    def close(self):
+        """Delete the tiles written to disk; the map must not be used afterwards."""
+        with self.lock:
+            self.cache.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
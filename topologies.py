@@ -0,0 +1,145 @@
+import numpy as np
+
+from sim import Topology
+
+
+def _switches_with_hosts(num_switches, hosts_per_switch, params, first_host_switch=0):
+    """Create a Topology with switches s0..s{n-1} and hosts_per_switch hosts on each.
+
+    Switch i gets node id i, so generators can build switch links directly
+    from id arrays. Hosts are named h0, h1, ... in switch order and only
+    attached from `first_host_switch` on.
+    """
+    topo = Topology()
+    topo.add_switches(f"s{i}" for i in range(num_switches))
+    num_hosts = (num_switches - first_host_switch) * hosts_per_switch
+    if num_hosts:
+        topo.add_hosts(f"h{i}" for i in range(num_hosts))
+        hosts = np.arange(num_hosts)
+        topo.add_links(np.column_stack([num_switches + hosts, first_host_switch + hosts // hosts_per_switch]), **params)
+    return topo
+
+
+def ring(n, hosts_per_switch=0, **params):
+    """A ring of n switches. Link params (bw, delay, loss) apply to every link."""
+    if n < 3:
+        raise ValueError("A ring needs at least 3 switches")
+    topo = _switches_with_hosts(n, hosts_per_switch, params)
+    ids = np.arange(n)
+    topo.add_links(np.column_stack([ids, (ids + 1) % n]), **params)
+    return topo
+
+
+def grid(rows, cols, hosts_per_switch=0, **params):
+    """A rows x cols mesh of switches; switch s{r * cols + c} sits at row r, column c."""
+    topo = _switches_with_hosts(rows * cols, hosts_per_switch, params)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    horizontal = np.column_stack([ids[:, :-1].ravel(), ids[:, 1:].ravel()])
+    vertical = np.column_stack([ids[:-1, :].ravel(), ids[1:, :].ravel()])
+    topo.add_links(np.concatenate([horizontal, vertical]), **params)
+    return topo
+
+
+def fat_tree(k, **params):
+    """A k-ary fat-tree: (k/2)^2 core switches, k pods of k/2 aggregation and k/2 edge switches, k^3/4 hosts.
+
+    Switches are numbered core first, then aggregation and edge switches pod
+    by pod; each edge switch has k/2 hosts.
+    """
+    if k < 2 or k % 2:
+        raise ValueError("fat_tree needs an even k >= 2")
+    half = k // 2
+    num_core = half * half
+    num_agg = k * half
+    num_switches = num_core + 2 * num_agg
+    topo = _switches_with_hosts(num_switches, half, params, first_host_switch=num_core + num_agg)
+
+    # Aggregation switch j of every pod links to core switches j*half .. j*half + half - 1
+    agg = num_core + np.arange(num_agg)
+    core = ((agg - num_core) % half)[:, None] * half + np.arange(half)
+    core_links = np.column_stack([np.repeat(agg, half), core.ravel()])
+    # Every aggregation switch links to every edge switch of its pod
+    pods = np.arange(k)
+    pod_agg = num_core + pods[:, None] * half + np.arange(half)
+    pod_edge = pod_agg + num_agg
+    pod_links = np.column_stack([
+        np.repeat(pod_agg, half, axis=1).ravel(),
+        np.tile(pod_edge, half).ravel(),
+    ])
+    topo.add_links(np.concatenate([core_links, pod_links]), **params)
+    return topo
+
+
+def random_geometric(n, radius, hosts_per_switch=0, seed=None, **params):
+    """n switches scattered uniformly in the unit square, linked when within `radius` of each other.
+
+    Points are binned into radius-sized cells; each cell is only compared
+    with itself and four of its neighbours, all with array operations.
+    """
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2))
+    topo = _switches_with_hosts(n, hosts_per_switch, params)
+    topo.add_links(_close_pairs(points, radius), **params)
+    return topo
+
+
+def _close_pairs(points, radius):
+    """Return an (M, 2) array of index pairs i < j closer than `radius`, via cell binning."""
+    cells_per_side = max(1, int(np.ceil(1.0 / radius)))
+    cell = np.minimum((points / radius).astype(np.int64), cells_per_side - 1)
+    keys = cell[:, 0] * cells_per_side + cell[:, 1]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    r2 = radius * radius
+
+    found = []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        nx = cell[:, 0] + dx
+        ny = cell[:, 1] + dy
+        valid = (nx < cells_per_side) & (ny >= 0) & (ny < cells_per_side)
+        src = np.nonzero(valid)[0]
+        target = nx[src] * cells_per_side + ny[src]
+        start = np.searchsorted(sorted_keys, target, side="left")
+        end = np.searchsorted(sorted_keys, target, side="right")
+        counts = end - start
+        total = int(counts.sum())
+        if not total:
+            continue
+        # Expand each point into its candidate range in the sorted order
+        i = np.repeat(src, counts)
+        run_start = np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(start, counts) + np.arange(total) - run_start]
+        keep = np.sum((points[i] - points[j]) ** 2, axis=1) <= r2
+        if dx == 0 and dy == 0:
+            keep &= i < j
+        found.append(np.column_stack([i[keep], j[keep]]))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(found)
+
+
+def scale_free(n, m=2, hosts_per_switch=0, seed=None, **params):
+    """A Barabasi-Albert preferential-attachment graph of n switches, each new one attaching to ~m others.
+
+    Uses the Batagelj-Brandes edge list construction: the random draws are
+    made in one batch and only the copy step runs in a loop. Self-loops and
+    duplicate edges are dropped, so low-degree nodes can end up with fewer
+    than m links.
+    """
+    rng = np.random.default_rng(seed)
+    total = n * m
+    slots = 2 * np.arange(total)
+    # Slot 2e holds the new node, slot 2e + 1 copies a uniformly chosen earlier slot
+    picks = (rng.random(total) * (slots + 1)).astype(np.int64).tolist()
+    ends = [0] * (2 * total)
+    for e in range(total):
+        ends[2 * e] = e // m
+        ends[2 * e + 1] = ends[picks[e]]
+    pairs = np.array(ends, dtype=np.int64).reshape(-1, 2)
+    pairs = np.sort(pairs[pairs[:, 0] != pairs[:, 1]], axis=1)
+    keys = np.unique(pairs[:, 0] << 32 | pairs[:, 1])
+    pairs = np.column_stack([keys >> 32, keys & 0xFFFFFFFF])
+
+    topo = _switches_with_hosts(n, hosts_per_switch, params)
+    topo.add_links(pairs, **params)
+    return topo
@@ -0,0 +1,338 @@
+import heapq
+import math
+import random
+
+import numpy as np
+
+from routing import shortest_path
+
+# Events are (time, packet_id << HOP_BITS | hop) tuples, so a plain int breaks time ties
+HOP_BITS = 10
+HOP_MASK = (1 << HOP_BITS) - 1
+
+
+class Flow:
+    """A constant-bit-rate packet flow between two nodes.
+
+    `rate` is in Mbit/s (like link `bw`), `packet_size` in bytes, and `start`
+    and `duration` in seconds.
+    """
+
+    def __init__(self, src, dst, rate=1.0, packet_size=1500, start=0.0, duration=1.0, name=None):
+        self.src = src
+        self.dst = dst
+        self.rate = rate
+        self.packet_size = packet_size
+        self.start = start
+        self.duration = duration
+        self.name = name or f"{src}->{dst}"
+
+    @property
+    def interval(self):
+        """Seconds between consecutive packets."""
+        return self.packet_size * 8 / (self.rate * 1e6)
+
+
+class FlowStats:
+    """Delivery, latency and throughput figures for one flow."""
+
+    def __init__(self, flow, path=None, path_delay=None):
+        self.flow = flow
+        self.path = path
+        self.path_delay = path_delay  # Propagation delay only, without queueing or transmission
+        self.sent = 0
+        self.delivered = 0
+        self.lost = 0
+        self.latency_sum = 0.0
+        self.latency_min = float("inf")
+        self.latency_max = 0.0
+        self.first_sent = None
+        self.last_delivered = None
+
+    @property
+    def mean_latency(self):
+        return self.latency_sum / self.delivered if self.delivered else None
+
+    @property
+    def loss_rate(self):
+        return (self.sent - self.delivered) / self.sent if self.sent else 0.0
+
+    @property
+    def throughput(self):
+        """Delivered bits per second over the span of the flow."""
+        if not self.delivered or self.last_delivered <= self.first_sent:
+            return 0.0
+        return self.delivered * self.flow.packet_size * 8 / (self.last_delivered - self.first_sent)
+
+    def __repr__(self):
+        latency = f"{self.mean_latency * 1000:.3f}ms" if self.delivered else "n/a"
+        return (f"FlowStats({self.flow.name}: sent={self.sent}, delivered={self.delivered}, "
+                f"loss={self.loss_rate:.2%}, mean latency={latency}, "
+                f"throughput={self.throughput / 1e6:.3f}Mbit/s)")
+
+
+class TrafficSimulator:
+    """Discrete-event packet simulation over a sim.Network.
+
+    Flows are routed once, along the delay-shortest path over active links.
+    Each link direction is a FIFO transmitter: a packet waits until the link
+    is free, takes `size / bw` to transmit, then `delay` to propagate, and is
+    dropped with the link's loss probability. Only packet arrivals at nodes
+    are events.
+
+    Time advances in windows as long as the shortest transmit plus delay of
+    any hop, so no arrival inside a window can cause another arrival inside
+    it. Every window's arrivals are therefore known up front and handled
+    together in NumPy: each link's FIFO departures are a running maximum
+    over its arrivals in time order. With a `queue_limit`, or a hop that
+    takes no time at all, packets go one at a time through a heap instead.
+    """
+
+    def __init__(self, network, seed=None, queue_limit=None, routing=None):
+        self.network = network
+        self.routing = routing  # Optional routing.RoutingTable to reuse cached paths
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.queue_limit = queue_limit  # Max packets waiting per link direction (None: unbounded)
+        self.flows = []
+        self.events_processed = 0
+
+    def add_flow(self, flow):
+        self.flows.append(flow)
+        return flow
+
+    def _route(self, flow, channels):
+        """Return the per-hop (channel, transmit time, delay, loss) list for a flow, or None."""
+        if self.routing is not None:
+            route = self.routing.path(flow.src, flow.dst)
+        else:
+            route = shortest_path(self.network, flow.src, flow.dst)
+        if route is None:
+            return None, None
+        nodes, link_ids, total_delay = route
+        if len(link_ids) > HOP_MASK:
+            raise ValueError(f"Path for flow {flow.name} is longer than {HOP_MASK} hops")
+        topology = self.network.topology
+        hops = []
+        for node, link_id in zip(nodes, link_ids):
+            bw, delay, loss = topology.link_properties(link_id)
+            direction = 0 if topology.link_nodes(link_id)[0] == node else 1
+            channel = channels.setdefault((link_id, direction), len(channels))
+            hops.append((channel, flow.packet_size * 8 / bw, delay, loss))
+        return hops, (nodes, total_delay)
+
+    def run(self, until=None):
+        """Run every flow to completion (or until `until` seconds) and return {name: FlowStats}."""
+        channels = {}
+        flow_hops = []
+        stats = []
+        for flow in self.flows:
+            hops, path = self._route(flow, channels)
+            stats.append(FlowStats(flow, *(path or (None, None))))
+            flow_hops.append(hops)
+
+        lookahead = min((transmit + delay for hops in flow_hops if hops for _, transmit, delay, _ in hops), default=math.inf)
+        horizon = math.inf if until is None else until
+        if self.queue_limit is None and lookahead > 0:
+            counters = self._run_windows(flow_hops, len(channels), lookahead, horizon)
+        else:
+            counters = self._run_heap(flow_hops, len(channels), horizon)
+
+        sent, delivered, latency_sum, latency_min, latency_max, last_delivered = counters
+        for f, flow_stats in enumerate(stats):
+            flow_stats.sent = sent[f]
+            flow_stats.delivered = delivered[f]
+            flow_stats.lost = sent[f] - delivered[f]
+            flow_stats.latency_sum = latency_sum[f]
+            flow_stats.latency_min = latency_min[f]
+            flow_stats.latency_max = latency_max[f]
+            flow_stats.first_sent = self.flows[f].start if sent[f] else None
+            flow_stats.last_delivered = last_delivered[f]
+        return {s.flow.name: s for s in stats}
+
+    def _packets(self, horizon):
+        """Send times and flows of every packet sent by `horizon`, in time order (ties by flow)."""
+        times, owners = [], []
+        for f, flow in enumerate(self.flows):
+            count = max(int(math.ceil(flow.duration / flow.interval)) + 1, 1)
+            sent = flow.start + np.arange(count) * flow.interval
+            sent = sent[(sent < flow.start + flow.duration) | (np.arange(count) == 0)]
+            times.append(sent[sent <= horizon])
+            owners.append(np.full(len(times[-1]), f, dtype=np.intp))
+        times = np.concatenate(times) if times else np.empty(0)
+        owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.intp)
+        order = np.argsort(times, kind="stable")
+        return times[order], owners[order]
+
+    def _run_windows(self, flow_hops, num_channels, lookahead, horizon):
+        """Process arrivals in lookahead-wide windows, vectorized per window; returns per-flow counters."""
+        count = len(self.flows)
+        lengths = np.array([len(hops) if hops else 0 for hops in flow_hops], dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.intp)
+        table = np.array([hop for hops in flow_hops if hops for hop in hops], dtype=np.float64).reshape(-1, 4)
+        hop_channel = table[:, 0].astype(np.intp)
+        hop_transmit, hop_delay, hop_loss = table[:, 1], table[:, 2], table[:, 3]
+        routed = np.array([hops is not None for hops in flow_hops], dtype=bool)
+        rng = np.random.default_rng(self.seed)
+
+        packet_sent, packet_flow = self._packets(horizon)
+        sent = np.bincount(packet_flow, minlength=count)
+        events = int(np.count_nonzero(~routed[packet_flow]))  # Unroutable packets only leave their source
+        fresh = np.flatnonzero(routed[packet_flow])  # Packet ids, in send order
+        fresh_time = packet_sent[fresh]
+        next_fresh = 0
+
+        # Packets on their way to their next node: id, hop index and arrival time
+        flight_packet = np.empty(0, dtype=np.intp)
+        flight_hop = np.empty(0, dtype=np.intp)
+        flight_time = np.empty(0, dtype=np.float64)
+        free_at = np.zeros(num_channels)
+        delivered = np.zeros(count, dtype=np.int64)
+        latency_sum = np.zeros(count)
+        latency_min = np.full(count, math.inf)
+        latency_max = np.zeros(count)
+        last_delivered = np.full(count, -math.inf)
+
+        while True:
+            start = min(fresh_time[next_fresh] if next_fresh < len(fresh) else math.inf,
+                        flight_time.min() if len(flight_time) else math.inf)
+            if start == math.inf or start > horizon:
+                break
+            end = start + lookahead
+            stop = int(np.searchsorted(fresh_time, end, side="left"))
+            due = (flight_time < end) & (flight_time <= horizon)
+            packet = np.concatenate([flight_packet[due], fresh[next_fresh:stop]])
+            hop = np.concatenate([flight_hop[due], np.zeros(stop - next_fresh, dtype=np.intp)])
+            t = np.concatenate([flight_time[due], fresh_time[next_fresh:stop]])
+            flight_packet, flight_hop, flight_time = flight_packet[~due], flight_hop[~due], flight_time[~due]
+            next_fresh = stop
+            events += len(packet)
+
+            f = packet_flow[packet]
+            done = hop == lengths[f]
+            if done.any():
+                f_done = f[done]
+                latency = t[done] - packet_sent[packet[done]]
+                delivered += np.bincount(f_done, minlength=count)
+                latency_sum += np.bincount(f_done, weights=latency, minlength=count)
+                np.minimum.at(latency_min, f_done, latency)
+                np.maximum.at(latency_max, f_done, latency)
+                np.maximum.at(last_delivered, f_done, t[done])
+                packet, hop, t, f = packet[~done], hop[~done], t[~done], f[~done]
+            if not len(packet):
+                continue
+
+            # Each channel serves its arrivals in time order (ties by packet, then hop):
+            # departure_k = max(arrival_k, departure_k-1) + transmit_k, solved as a running maximum
+            entry = offsets[f] + hop
+            channel = hop_channel[entry]
+            order = np.lexsort((hop, packet, t, channel))
+            packet, hop, t, entry, channel = packet[order], hop[order], t[order], entry[order], channel[order]
+            transmit = hop_transmit[entry]
+            first = np.flatnonzero(np.diff(channel, prepend=-1))
+            group = np.cumsum(np.diff(channel, prepend=-1) != 0) - 1
+            served = np.cumsum(transmit)
+            served -= (served - transmit)[first][group]  # Transmit time of the channel's batch so far
+            wait = t - (served - transmit)
+            spread = wait.max() - wait.min() + 1.0  # Keeps each channel's running maximum separate
+            wait = np.maximum.accumulate(wait + group * spread) - group * spread
+            departure = served + np.maximum(wait, free_at[channel])
+            free_at[channel[np.append(first[1:], len(channel)) - 1]] = departure[np.append(first[1:], len(channel)) - 1]
+
+            kept = rng.random(len(packet)) >= hop_loss[entry]
+            flight_packet = np.concatenate([flight_packet, packet[kept]])
+            flight_hop = np.concatenate([flight_hop, hop[kept] + 1])
+            flight_time = np.concatenate([flight_time, departure[kept] + hop_delay[entry[kept]]])
+
+        self.events_processed = events
+        last_delivered = [value if value > -math.inf else None for value in last_delivered.tolist()]
+        return (sent.tolist(), delivered.tolist(), latency_sum.tolist(), latency_min.tolist(),
+                latency_max.tolist(), last_delivered)
+
+    def _run_heap(self, flow_hops, num_channels, horizon):
+        """Process arrivals one at a time through a heap; returns per-flow counters.
+
+        When the next arrival of a packet comes before every queued event, it
+        is handled inline without going through the heap.
+        """
+        heap = []
+        packet_flow = []
+        packet_sent = []
+        for index, flow in enumerate(self.flows):
+            packet_flow.append(index)
+            packet_sent.append(flow.start)
+            heap.append((flow.start, (len(packet_flow) - 1) << HOP_BITS))
+        heapq.heapify(heap)
+
+        free_at = [0.0] * num_channels
+        end_times = [flow.start + flow.duration for flow in self.flows]
+        intervals = [flow.interval for flow in self.flows]
+        # Per-flow counters kept in flat lists; FlowStats are filled in at the end
+        count = len(self.flows)
+        sent = [0] * count
+        delivered = [0] * count
+        latency_sum = [0.0] * count
+        latency_min = [float("inf")] * count
+        latency_max = [0.0] * count
+        last_delivered = [None] * count
+        queue_limit = self.queue_limit
+        random_value = self.rng.random
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        events = 0
+
+        while heap:
+            t, key = heappop(heap)
+            if t > horizon:
+                break
+            packet = key >> HOP_BITS
+            hop = key & HOP_MASK
+            f = packet_flow[packet]
+
+            if hop == 0:
+                # Packet leaves its source; schedule the flow's next packet
+                sent[f] += 1
+                next_time = t + intervals[f]
+                if next_time < end_times[f]:
+                    packet_flow.append(f)
+                    packet_sent.append(next_time)
+                    heappush(heap, (next_time, len(packet_flow) - 1 << HOP_BITS))
+
+            hops = flow_hops[f]
+            if hops is None:
+                events += 1
+                continue
+
+            last = len(hops)
+            while True:
+                events += 1
+                if hop == last:
+                    latency = t - packet_sent[packet]
+                    delivered[f] += 1
+                    latency_sum[f] += latency
+                    if latency < latency_min[f]:
+                        latency_min[f] = latency
+                    if latency > latency_max[f]:
+                        latency_max[f] = latency
+                    last_delivered[f] = t
+                    break
+
+                channel, transmit, delay, loss = hops[hop]
+                start = free_at[channel]
+                if start < t:
+                    start = t
+                elif queue_limit is not None and transmit and (start - t) / transmit > queue_limit:
+                    break  # Tail drop on a full queue
+                free_at[channel] = start + transmit
+                if loss and random_value() < loss:
+                    break
+
+                t = start + transmit + delay
+                hop += 1
+                # Nothing else can happen before this arrival: handle it inline
+                if (heap and heap[0][0] <= t) or t > horizon:
+                    heappush(heap, (t, packet << HOP_BITS | hop))
+                    break
+
+        self.events_processed = events
+        return sent, delivered, latency_sum, latency_min, latency_max, last_delivered